@@ -1,54 +1,47 @@
 import discord
 from discord.ext import commands
-import json
-import asyncio
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from datetime import datetime
+from utils.message_pipeline import MessageContext, STAGE_ANTISPAM, get_message_pipeline
+from utils.rate_limit import RateLimiter
+from utils.raid_state import RaidStates
+from utils.json_store import get_json_store
 
 class AntiRaid(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.raid_detection = defaultdict(lambda: {
-            'joins': deque(maxlen=10),
-            'messages': defaultdict(lambda: deque(maxlen=50)),
-            'spam_warnings': defaultdict(int),
-            'banned_words': set(),
-            'raid_mode': False,
-            'raid_mode_expires': None,
-            'whitelist': set(),
-            'settings': {
-                'join_threshold': 5,  # X kişi
-                'join_interval': 10,  # Y saniye içinde
-                'message_threshold': 5,  # Z mesaj
-                'message_interval': 3,  # W saniye içinde
-                'punishment': 'kick',  # kick, ban, or mute
-                'raid_mode_duration': 30  # dakika
-            }
-        })
+        # Sunucu başına sabit boyutlu durum; süresi dolan uyarılar ve raid modları arka planda temizlenir
+        self.raid_detection = RaidStates()
+        self.raid_detection.on_raid_mode_expired = self.on_raid_mode_expired
+        # Kullanıcı başına mesaj hızı (sunucu ayarlarına göre)
+        self.message_limiter = RateLimiter(rate=5, per=3)
         self.load_config()
         
     def load_config(self):
-        try:
-            with open('config/antiraid.json', 'r') as f:
-                config = json.load(f)
-                for guild_id, settings in config.items():
-                    self.raid_detection[int(guild_id)]['settings'].update(settings)
-        except FileNotFoundError:
-            pass
+        config = get_json_store().load('config/antiraid.json', indent=4)
+        for guild_id, settings in config.items():
+            self.raid_detection[int(guild_id)].settings.update(settings)
+            self.apply_message_limit(int(guild_id))
+
+    def apply_message_limit(self, guild_id):
+        """Sunucunun mesaj limitini hız sınırlayıcıya uygula"""
+        settings = self.raid_detection[guild_id].settings
+        self.message_limiter.set_limit(
+            guild_id, settings['message_threshold'], settings['message_interval']
+        )
             
     def save_config(self):
         config = {}
         for guild_id, data in self.raid_detection.items():
-            config[str(guild_id)] = data['settings']
-        with open('config/antiraid.json', 'w') as f:
-            json.dump(config, f, indent=4)
+            config[str(guild_id)] = data.settings
+        get_json_store().save('config/antiraid.json', config)
 
     @commands.group(name="antiraid", invoke_without_command=True)
     @commands.has_permissions(administrator=True)
     async def antiraid(self, ctx):
         """Anti-raid ayarlarını göster ve yönet"""
-        settings = self.raid_detection[ctx.guild.id]['settings']
-        raid_mode = self.raid_detection[ctx.guild.id]['raid_mode']
+        guild_data = self.raid_detection[ctx.guild.id]
+        settings = guild_data.settings
+        raid_mode = guild_data.raid_mode
         
         embed = discord.Embed(
             title="🛡️ Anti-Raid Ayarları",
@@ -79,15 +72,13 @@ class AntiRaid(commands.Cog):
             inline=False
         )
         
-        if raid_mode and self.raid_detection[ctx.guild.id]['raid_mode_expires']:
-            expires = self.raid_detection[ctx.guild.id]['raid_mode_expires']
-            remaining = expires - datetime.now()
-            if remaining.total_seconds() > 0:
-                embed.add_field(
-                    name="Raid Modu Bitiş",
-                    value=f"{remaining.seconds // 60} dakika {remaining.seconds % 60} saniye",
-                    inline=False
-                )
+        remaining = int(guild_data.raid_mode_remaining())
+        if remaining > 0:
+            embed.add_field(
+                name="Raid Modu Bitiş",
+                value=f"{remaining // 60} dakika {remaining % 60} saniye",
+                inline=False
+            )
                 
         await ctx.send(embed=embed)
 
@@ -95,7 +86,7 @@ class AntiRaid(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_settings(self, ctx, setting: str, value: str):
         """Anti-raid ayarlarını değiştir"""
-        settings = self.raid_detection[ctx.guild.id]['settings']
+        settings = self.raid_detection[ctx.guild.id].settings
         
         if setting not in settings:
             await ctx.send("Geçersiz ayar! Kullanılabilir ayarlar: " + 
@@ -112,6 +103,7 @@ class AntiRaid(commands.Cog):
                     raise ValueError
                     
             settings[setting] = value
+            self.apply_message_limit(ctx.guild.id)
             self.save_config()
             
             await ctx.send(f"✅ {setting} ayarı {value} olarak güncellendi!")
@@ -126,22 +118,14 @@ class AntiRaid(commands.Cog):
         guild_data = self.raid_detection[ctx.guild.id]
         
         if duration is None:
-            duration = guild_data['settings']['raid_mode_duration']
+            duration = guild_data.settings['raid_mode_duration']
             
-        guild_data['raid_mode'] = not guild_data['raid_mode']
-        
-        if guild_data['raid_mode']:
-            guild_data['raid_mode_expires'] = datetime.now() + timedelta(minutes=duration)
+        if not guild_data.raid_mode:
+            # Otomatik kapatma arka plan temizliğinde yapılır ve bu kanala bildirilir
+            guild_data.enable_raid_mode(duration, channel_id=ctx.channel.id)
             await ctx.send(f"⚔️ Raid modu {duration} dakikalığına aktif edildi!")
-            
-            # Raid modu otomatik kapatma
-            await asyncio.sleep(duration * 60)
-            if guild_data['raid_mode']:
-                guild_data['raid_mode'] = False
-                guild_data['raid_mode_expires'] = None
-                await ctx.send("🛡️ Raid modu otomatik olarak deaktif edildi!")
         else:
-            guild_data['raid_mode_expires'] = None
+            guild_data.disable_raid_mode()
             await ctx.send("🛡️ Raid modu deaktif edildi!")
 
     @antiraid.command(name="whitelist")
@@ -151,10 +135,10 @@ class AntiRaid(commands.Cog):
         guild_data = self.raid_detection[ctx.guild.id]
         
         if action.lower() == "ekle":
-            guild_data['whitelist'].add(member.id)
+            guild_data.whitelist.add(member.id)
             await ctx.send(f"✅ {member.mention} whitelist'e eklendi!")
         elif action.lower() == "çıkar":
-            guild_data['whitelist'].discard(member.id)
+            guild_data.whitelist.discard(member.id)
             await ctx.send(f"✅ {member.mention} whitelist'ten çıkarıldı!")
         else:
             await ctx.send("Geçersiz işlem! Kullanım: !antiraid whitelist <ekle/çıkar> @kullanıcı")
@@ -163,81 +147,71 @@ class AntiRaid(commands.Cog):
     async def on_member_join(self, member):
         """Üye katılımlarını kontrol et"""
         guild_data = self.raid_detection[member.guild.id]
-        settings = guild_data['settings']
         
-        if member.id in guild_data['whitelist']:
+        if member.id in guild_data.whitelist:
             return
             
         # Katılım zamanını kaydet
-        guild_data['joins'].append(datetime.now())
+        guild_data.record_join()
         
         # Raid modu kontrolü
-        if guild_data['raid_mode']:
+        if guild_data.raid_mode:
             await self.handle_raid_punishment(member, "Raid modu aktif")
             return
             
-        # Son X katılımı kontrol et
-        recent_joins = list(guild_data['joins'])
-        if len(recent_joins) >= settings['join_threshold']:
-            time_diff = (recent_joins[-1] - recent_joins[0]).total_seconds()
-            
-            if time_diff <= settings['join_interval']:
-                # Raid tespit edildi
-                await self.enable_raid_mode(member.guild)
-                await self.handle_raid_punishment(member, "Hızlı katılım tespiti")
+        # Son X katılım Y saniye içinde mi?
+        if guild_data.join_burst():
+            # Raid tespit edildi
+            await self.enable_raid_mode(member.guild)
+            await self.handle_raid_punishment(member, "Hızlı katılım tespiti")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def cog_load(self):
+        get_message_pipeline(self.bot).register(
+            "antiraid.spam", STAGE_ANTISPAM + 10, self.check_message_spam, run_on_deleted=True
+        )
+        self.message_limiter.start_sweeper()
+        self.raid_detection.start_sweeper()
+
+    async def cog_unload(self):
+        get_message_pipeline(self.bot).unregister("antiraid.spam")
+        self.message_limiter.stop_sweeper()
+        self.raid_detection.stop_sweeper()
+
+    async def check_message_spam(self, ctx: MessageContext):
         """Spam kontrolü"""
-        if message.author.bot or isinstance(message.channel, discord.DMChannel):
-            return
-            
-        guild_data = self.raid_detection[message.guild.id]
-        settings = guild_data['settings']
+        message = ctx.message
+        guild_data = self.raid_detection[ctx.guild_id]
         
-        if message.author.id in guild_data['whitelist']:
+        if ctx.author_id in guild_data.whitelist:
             return
             
-        # Mesaj zamanını kaydet
-        guild_data['messages'][message.author.id].append(datetime.now())
-        
         # Spam kontrolü
-        recent_messages = list(guild_data['messages'][message.author.id])
-        if len(recent_messages) >= settings['message_threshold']:
-            time_diff = (recent_messages[-1] - recent_messages[0]).total_seconds()
+        if not self.message_limiter.hit((ctx.guild_id, ctx.author_id), ctx.guild_id, ctx.received_at).allowed:
+            # Eski uyarılar zamanla düşer
+            warnings = guild_data.add_spam_warning(ctx.author_id, ctx.received_at)
             
-            if time_diff <= settings['message_interval']:
-                guild_data['spam_warnings'][message.author.id] += 1
-                
-                if guild_data['spam_warnings'][message.author.id] >= 3:
-                    await self.handle_raid_punishment(
-                        message.author,
-                        "Aşırı spam"
-                    )
-                else:
-                    try:
-                        await message.delete()
-                    except discord.Forbidden:
-                        pass
-                        
-                    warning = await message.channel.send(
-                        f"{message.author.mention} spam yapmayı bırak! "
-                        f"Uyarı: {guild_data['spam_warnings'][message.author.id]}/3"
-                    )
-                    await asyncio.sleep(5)
-                    try:
-                        await warning.delete()
-                    except discord.NotFound:
-                        pass
+            if warnings >= 3:
+                await self.handle_raid_punishment(
+                    message.author,
+                    "Aşırı spam"
+                )
+                ctx.halt()
+            else:
+                await ctx.delete()
+                    
+                # Uyarı mesajı 5 saniye sonra silinir; sonraki aşamaları bekletmez
+                await message.channel.send(
+                    f"{message.author.mention} spam yapmayı bırak! "
+                    f"Uyarı: {warnings}/3",
+                    delete_after=5
+                )
 
     async def enable_raid_mode(self, guild):
         """Raid modunu aktif et"""
         guild_data = self.raid_detection[guild.id]
         
-        if not guild_data['raid_mode']:
-            guild_data['raid_mode'] = True
-            guild_data['raid_mode_expires'] = datetime.now() + \
-                timedelta(minutes=guild_data['settings']['raid_mode_duration'])
+        if not guild_data.raid_mode:
+            guild_data.enable_raid_mode(guild_data.settings['raid_mode_duration'])
                 
             # Log kanalına bildirim gönder
             try:
@@ -252,26 +226,36 @@ class AntiRaid(commands.Cog):
                     await log_channel.send(embed=embed)
             except discord.Forbidden:
                 pass
+
+    async def on_raid_mode_expired(self, guild_id, channel_id):
+        """Süresi dolan raid modunu bildir"""
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+            
+        try:
+            if channel_id is not None:
+                channel = guild.get_channel(channel_id)
+                if channel:
+                    await channel.send("🛡️ Raid modu otomatik olarak deaktif edildi!")
+                return
                 
-            # Raid modu otomatik kapatma
-            await asyncio.sleep(guild_data['settings']['raid_mode_duration'] * 60)
-            if guild_data['raid_mode']:
-                guild_data['raid_mode'] = False
-                guild_data['raid_mode_expires'] = None
-                
-                if log_channel:
-                    embed = discord.Embed(
-                        title="🛡️ Raid Modu Deaktif",
-                        description="Raid modu otomatik olarak deaktif edildi.",
-                        color=discord.Color.green(),
-                        timestamp=datetime.now()
-                    )
-                    await log_channel.send(embed=embed)
+            log_channel = discord.utils.get(guild.text_channels, name="raid-log")
+            if log_channel:
+                embed = discord.Embed(
+                    title="🛡️ Raid Modu Deaktif",
+                    description="Raid modu otomatik olarak deaktif edildi.",
+                    color=discord.Color.green(),
+                    timestamp=datetime.now()
+                )
+                await log_channel.send(embed=embed)
+        except discord.Forbidden:
+            pass
 
     async def handle_raid_punishment(self, member, reason):
         """Raid cezasını uygula"""
         guild_data = self.raid_detection[member.guild.id]
-        punishment = guild_data['settings']['punishment']
+        punishment = guild_data.settings['punishment']
         
         try:
             if punishment == 'kick':
@@ -1,36 +1,29 @@
 import discord
 from discord.ext import commands
 import json
-import sqlite3
 from datetime import datetime
 import random
+from storage import get_storage
 
 class Inventory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = sqlite3.connect('inventory.db')
+        self.db = get_storage().namespace('inventory')
         self.setup_database()
 
     def setup_database(self):
-        cursor = self.db.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS inventory
-                         (user_id INTEGER PRIMARY KEY,
-                          items TEXT)''')
-        self.db.commit()
+        # Eski inventory.db dosyasını bir kez içe aktar
+        self.db.import_legacy('inventory.db', ['inventory'])
 
     def load_inventory(self, user_id):
-        cursor = self.db.cursor()
-        cursor.execute("SELECT items FROM inventory WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
+        result = self.db.fetchone("SELECT items FROM {inventory} WHERE user_id = ?", (user_id,))
         if result:
             return json.loads(result[0])
         return {}
 
     def save_inventory(self, user_id, items):
-        cursor = self.db.cursor()
-        cursor.execute("INSERT OR REPLACE INTO inventory (user_id, items) VALUES (?, ?)",
-                       (user_id, json.dumps(items)))
-        self.db.commit()
+        self.db.execute("INSERT OR REPLACE INTO {inventory} (user_id, items) VALUES (?, ?)",
+                        (user_id, json.dumps(items)))
 
     @commands.command(name="envanter")
     async def show_inventory(self, ctx):
@@ -1,31 +1,30 @@
 import discord
 from discord.ext import commands
-import json
 import random
+from utils.journal import JournaledStore
+from utils.level_table import LINEAR_LEVELS
+from utils.announcer import get_announcer
+from utils.message_pipeline import MessageContext, STAGE_XP, get_message_pipeline
 
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.levels = {}
-        self.load_levels()
+        # Her mesajda tüm dosya yerine yalnızca değişen kullanıcı günlüğe eklenir
+        self.store = JournaledStore('levels.json')
+        self.levels = self.store.data
 
-    def load_levels(self):
-        try:
-            with open('levels.json', 'r') as f:
-                self.levels = json.load(f)
-        except FileNotFoundError:
-            self.levels = {}
+    async def cog_load(self):
+        get_message_pipeline(self.bot).register("leveling.xp", STAGE_XP, self.award_message_xp, run_in_dms=True)
+        self.store.start()
 
-    def save_levels(self):
-        with open('levels.json', 'w') as f:
-            json.dump(self.levels, f)
+    async def cog_unload(self):
+        get_message_pipeline(self.bot).unregister("leveling.xp")
+        self.store.close()
+        await get_announcer(self.bot).flush()
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
-        user_id = str(message.author.id)
+    async def award_message_xp(self, ctx: MessageContext):
+        message = ctx.message
+        user_id = str(ctx.author_id)
         if user_id not in self.levels:
             self.levels[user_id] = {"xp": 0, "level": 1}
 
@@ -33,14 +32,17 @@ class Leveling(commands.Cog):
         self.levels[user_id]["xp"] += random.randint(15, 25)
         xp = self.levels[user_id]["xp"]
         lvl = self.levels[user_id]["level"]
-        xp_required = lvl * 100
+        xp_required = LINEAR_LEVELS.cost(lvl)
 
-        if xp >= xp_required:
+        level_up = xp >= xp_required
+        if level_up:
             self.levels[user_id]["level"] += 1
             self.levels[user_id]["xp"] = 0
-            await message.channel.send(f"🎊 Tebrikler {message.author.mention}! Seviye atladınız: **{lvl + 1}**")
 
-        self.save_levels()
+        self.store.record(user_id)
+
+        if level_up:
+            get_announcer(self.bot).announce(message.channel, message.author, f"🎊 Seviye atladınız: **{lvl + 1}**")
 
     @commands.command(name="seviye")
     async def rank(self, ctx):
@@ -52,7 +54,7 @@ class Leveling(commands.Cog):
 
         level = self.levels[user_id]["level"]
         xp = self.levels[user_id]["xp"]
-        xp_required = level * 100
+        xp_required = LINEAR_LEVELS.cost(level)
 
         embed = discord.Embed(
             title="📊 Seviye Bilgisi",
@@ -1,43 +1,96 @@
 import discord
 from discord.ext import commands
-import json
-import sqlite3
 from datetime import datetime
 import asyncio
+import sqlite3
+from datetime import timedelta
+from storage import get_storage
+from utils.guild_config import get_guild_config
+from utils.log_archive import LogArchive
+from utils.log_delivery import LogDelivery
+from utils.log_queue import LogQueue
+from utils.json_store import get_json_store
+
+SEARCH_PAGE_SIZE = 10
+# !logsearch filtreleri: anahtar -> query_logs parametresi
+SEARCH_FILTERS = {'tür': 'event_type', 'başlangıç': 'since', 'bitiş': 'until'}
+
+
+def parse_search(text):
+    """Arama metnini FTS5 ifadesine ve filtrelere ayır"""
+    search = {'terms': None}
+    terms = []
+    for word in text.split():
+        key, sep, value = word.partition(':')
+        if sep and key.lower() in SEARCH_FILTERS and value:
+            search[SEARCH_FILTERS[key.lower()]] = value
+            continue
+        # Her kelime tırnaklanır; sondaki * önek araması yapar
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    if terms:
+        search['terms'] = " ".join(terms)
+
+    if 'since' in search:
+        search['since'] = datetime.fromisoformat(search['since']).isoformat()
+    if 'until' in search:
+        until = datetime.fromisoformat(search['until'])
+        # Yalnızca tarih verildiyse o günü de dahil et
+        if len(search['until']) == 10:
+            until += timedelta(days=1)
+        search['until'] = until.isoformat()
+    return search
+
 
 class Logging(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.log_channels = {}
+        # Log kanalı mesajları toplanıp en fazla 10 embed'lik mesajlarla gönderilir
+        self.delivery = LogDelivery()
+        # (sunucu, kullanıcı) -> (arama, son (skor, id)); !logsonraki için
+        self.search_cursors = {}
         self.load_config()
         self.setup_database()
         
     def load_config(self):
-        try:
-            with open('config/logging.json', 'r') as f:
-                self.log_channels = json.load(f)
-        except FileNotFoundError:
-            self.log_channels = {}
+        self.log_channels = get_json_store().load('config/logging.json', indent=4)
             
     def save_config(self):
-        with open('config/logging.json', 'w') as f:
-            json.dump(self.log_channels, f, indent=4)
+        get_json_store().save('config/logging.json', self.log_channels)
             
     def setup_database(self):
-        self.db = sqlite3.connect('logs.db')
-        cursor = self.db.cursor()
-        
-        # Log kayıtları tablosu
-        cursor.execute('''CREATE TABLE IF NOT EXISTS logs
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          guild_id INTEGER,
-                          event_type TEXT,
-                          user_id INTEGER,
-                          target_id INTEGER,
-                          content TEXT,
-                          timestamp TEXT)''')
-                          
-        self.db.commit()
+        self.db = get_storage().namespace('logging')
+        # Eski logs.db dosyasını bir kez içe aktar
+        self.db.import_legacy('logs.db', ['logs'])
+        # Log satırları toplanıp tek işlemde yazılır
+        self.log_queue = LogQueue(self.db, '''INSERT INTO {logs} 
+                         (guild_id, event_type, user_id, target_id, content, timestamp)
+                         VALUES (?, ?, ?, ?, ?, ?)''')
+        # Tabloda yalnızca bu ayın kayıtları kalır; önceki aylar sıkıştırılmış arşive taşınır
+        self.archive = LogArchive(self.db)
+        self.archive.retention = self.log_retention
+
+    async def cog_load(self):
+        self.log_queue.start()
+        self.archive.start()
+
+    async def cog_unload(self):
+        self.archive.stop()
+        await self.delivery.flush()
+        await self.log_queue.close()
+
+    async def log_retention(self):
+        """Saklama süresi ayarlanmış sunucular: guild_id -> gün"""
+        guild_config = get_guild_config(self.bot)
+        retention = {}
+        for guild in self.bot.guilds:
+            days = await guild_config.get(guild.id, 'log_retention_days')
+            if days:
+                retention[guild.id] = days
+        return retention
 
     @commands.group(name="log", invoke_without_command=True)
     @commands.has_permissions(administrator=True)
@@ -63,29 +116,47 @@ class Logging(commands.Cog):
         )
         await channel.send(embed=embed)
 
+    @log.command(name="saklama")
+    @commands.has_permissions(administrator=True)
+    async def set_retention(self, ctx, days: int):
+        """Log saklama süresini ayarla (gün, 0 = süresiz)"""
+        if days < 0:
+            await ctx.send("Geçersiz süre!")
+            return
+            
+        await get_guild_config(self.bot).set(ctx.guild.id, 'log_retention_days', days or None)
+        if days:
+            await ctx.send(f"Loglar {days} gün saklanacak!")
+        else:
+            await ctx.send("Loglar süresiz saklanacak!")
+
     async def log_event(self, guild, event_type, user=None, target=None, content=None):
         """Olayı veritabanına ve log kanalına kaydet"""
-        # Veritabanına kaydet
-        cursor = self.db.cursor()
-        cursor.execute('''INSERT INTO logs 
-                         (guild_id, event_type, user_id, target_id, content, timestamp)
-                         VALUES (?, ?, ?, ?, ?, ?)''',
-                      (guild.id, event_type, 
+        # Veritabanı kuyruğuna ekle
+        await self.log_queue.put((guild.id, event_type, 
                        user.id if user else None,
                        target.id if target else None,
                        content,
                        datetime.now().isoformat()))
-        self.db.commit()
         
         # Log kanalına gönder
         if str(guild.id) in self.log_channels:
             channel = guild.get_channel(self.log_channels[str(guild.id)])
             if channel:
                 embed = await self.create_log_embed(event_type, user, target, content)
-                try:
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    pass
+                self.delivery.enqueue(channel, event_type, embed, self.summary_line(user, target, content))
+
+    @staticmethod
+    def summary_line(user, target, content):
+        """Toplu özet embed'inde bu olayı temsil eden tek satır"""
+        parts = []
+        if user:
+            parts.append(user.mention)
+        if target:
+            parts.append(f"→ {target.mention}")
+        if content:
+            parts.append(content[:80].replace("\n", " "))
+        return " ".join(parts) or "-"
 
     async def create_log_embed(self, event_type, user, target, content):
         """Log embed'i oluştur"""
@@ -232,23 +303,82 @@ class Logging(commands.Cog):
                 target=before.channel
             )
 
+    def query_logs(self, guild_id, terms, event_type=None, since=None, until=None, after=None,
+                   limit=SEARCH_PAGE_SIZE):
+        """Log kayıtlarında ara
+
+        Arama terimi varsa tam metin dizini kullanılır ve sonuçlar alaka sırasına
+        göre (skor, id) ile sayfalanır; yalnızca filtre verildiyse en yeni kayıtlar
+        (guild_id, timestamp) indeksiyle (zaman, id) üzerinden sayfalanır.
+        """
+        if terms:
+            sql = """SELECT l.id, l.event_type, l.user_id, l.target_id, l.content, l.timestamp,
+                            bm25({logs_fts}) AS score
+                     FROM {logs_fts} JOIN {logs} l ON l.id = {logs_fts}.rowid
+                     WHERE {logs_fts} MATCH ? AND l.guild_id = ?"""
+            params = [terms, guild_id]
+        else:
+            sql = """SELECT l.id, l.event_type, l.user_id, l.target_id, l.content, l.timestamp,
+                            0.0 AS score
+                     FROM {logs} l
+                     WHERE l.guild_id = ?"""
+            params = [guild_id]
+        if event_type:
+            sql += " AND l.event_type = ?"
+            params.append(event_type)
+        if since:
+            sql += " AND l.timestamp >= ?"
+            params.append(since)
+        if until:
+            sql += " AND l.timestamp < ?"
+            params.append(until)
+        if after and terms:
+            sql += " AND (bm25({logs_fts}), l.id) > (?, ?)"
+            params.extend(after)
+        elif after:
+            sql += " AND (l.timestamp, l.id) < (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY score, l.id LIMIT ?" if terms else " ORDER BY l.timestamp DESC, l.id DESC LIMIT ?"
+        params.append(limit)
+        return self.db.fetchall(sql, params)
+
     @commands.command(name="logsearch")
     @commands.has_permissions(administrator=True)
     async def search_logs(self, ctx, *, search_term):
-        """Log kayıtlarında arama yap"""
-        cursor = self.db.cursor()
+        """Log kayıtlarında arama yap
+
+        Örnek: !logsearch merhab* tür:message_delete başlangıç:2024-01-01 bitiş:2024-01-31
+        """
+        try:
+            search = parse_search(search_term)
+        except ValueError:
+            await ctx.send("Geçersiz tarih! Biçim: YYYY-AA-GG")
+            return
+        await self.send_search_page(ctx, search, None)
+
+    @commands.command(name="logsonraki")
+    @commands.has_permissions(administrator=True)
+    async def search_logs_next(self, ctx):
+        """Son log aramasının sonraki sayfası"""
+        cursor = self.search_cursors.get((ctx.guild.id, ctx.author.id))
+        if cursor is None:
+            await ctx.send("Önce !logsearch ile arama yapın!")
+            return
+        search, after = cursor
+        await self.send_search_page(ctx, search, after)
+
+    async def send_search_page(self, ctx, search, after):
+        # Kuyrukta bekleyen kayıtlar da aramaya dahil olsun
+        await self.log_queue.flush()
         
-        # İçerikte veya olay tipinde arama yap
-        cursor.execute('''SELECT event_type, user_id, target_id, content, timestamp 
-                         FROM logs 
-                         WHERE guild_id = ? 
-                         AND (content LIKE ? OR event_type LIKE ?)
-                         ORDER BY timestamp DESC LIMIT 10''',
-                      (ctx.guild.id, f"%{search_term}%", f"%{search_term}%"))
-                      
-        results = cursor.fetchall()
+        try:
+            results = await asyncio.to_thread(self.query_logs, ctx.guild.id, after=after, **search)
+        except sqlite3.OperationalError:
+            await ctx.send("Geçersiz arama ifadesi!")
+            return
         
         if not results:
+            self.search_cursors.pop((ctx.guild.id, ctx.author.id), None)
             await ctx.send("Arama sonucu bulunamadı!")
             return
             
@@ -258,7 +388,7 @@ class Logging(commands.Cog):
             timestamp=datetime.now()
         )
         
-        for event_type, user_id, target_id, content, timestamp in results:
+        for log_id, event_type, user_id, target_id, content, timestamp, score in results:
             user = ctx.guild.get_member(user_id)
             target = ctx.guild.get_member(target_id) if target_id else None
             
@@ -276,7 +406,59 @@ class Logging(commands.Cog):
                 value=value or "Detay yok",
                 inline=False
             )
+        
+        if len(results) == SEARCH_PAGE_SIZE:
+            last = results[-1]
+            # Sıralama anahtarı: terimli aramada skor, filtre aramasında zaman
+            key = last[6] if search['terms'] else last[5]
+            self.search_cursors[(ctx.guild.id, ctx.author.id)] = (search, (key, last[0]))
+            embed.set_footer(text="Sonraki sayfa için: !logsonraki")
+        else:
+            self.search_cursors.pop((ctx.guild.id, ctx.author.id), None)
+            
+        await ctx.send(embed=embed)
+
+    @commands.command(name="logarsiv")
+    @commands.has_permissions(administrator=True)
+    async def search_archive(self, ctx, month: str = None, *terms):
+        """Arşivlenmiş ayları listele veya bir ayda ara
+
+        Örnek: !logarsiv 2024-01 merhaba
+        """
+        months = self.archive.archived_months(ctx.guild.id)
+        if month is None:
+            if months:
+                await ctx.send("📦 Arşivlenmiş aylar: " + ", ".join(months))
+            else:
+                await ctx.send("Arşivlenmiş log bulunmuyor!")
+            return
+            
+        if month not in months:
+            await ctx.send("Bu ay için arşiv bulunamadı! Biçim: YYYY-AA")
+            return
             
+        results = await asyncio.to_thread(self.archive.search, ctx.guild.id, month, list(terms), SEARCH_PAGE_SIZE)
+        if not results:
+            await ctx.send("Arama sonucu bulunamadı!")
+            return
+            
+        embed = discord.Embed(
+            title=f"📦 Log Arşivi - {month}",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        for row in results:
+            value = ""
+            if row['user_id']:
+                value += f"Kullanıcı: <@{row['user_id']}>\n"
+            if row['content']:
+                value += f"İçerik: {row['content'][:100]}...\n"
+            dt = datetime.fromisoformat(row['timestamp'])
+            embed.add_field(
+                name=f"{row['event_type']} - {dt.strftime('%Y-%m-%d %H:%M')}",
+                value=value or "Detay yok",
+                inline=False
+            )
         await ctx.send(embed=embed)
 
 async def setup(bot):
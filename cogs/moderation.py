@@ -3,18 +3,33 @@ from discord.ext import commands
 from discord import app_commands
 import json
 import re
-import sqlite3
 from datetime import datetime
 import asyncio
 import logging
 from datetime import timedelta
+from storage import get_storage
+from utils.rate_limit import RateLimiter
+from utils.sliding_window import SlidingWindowCounter
+from utils.word_filter import BannedWordMatcher
+from utils.guild_config import get_guild_config
+from utils.warning_counts import active_warnings, warning_cutoff
+from utils.message_pipeline import (
+    MessageContext, STAGE_ANTISPAM, STAGE_MODERATION, get_message_pipeline
+)
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_detection = {}
+        # 10 saniyede 5'ten fazla mesaj -> susturma; sunucular spam_limit ayarıyla değiştirebilir
+        self.spam_detection = RateLimiter(rate=5, per=10)
+        # check_spam: 5 saniyede 5'ten fazla mesaj -> uyarı (sabit pencere sayımı)
+        self.spam_check_window = SlidingWindowCounter(limit=5, window=5)
         self.banned_words = self.load_banned_words()
-        self.warning_db = sqlite3.connect('warnings.db')
+        # Yalnızca tam kelime eşleşmesi: banned_words.json "whole_words" anahtarı,
+        # /yasaklıkelimeler tamkelime aç|kapat ile değiştirilir
+        self.banned_words_whole = bool(self.banned_words.get("whole_words", False))
+        self.rebuild_banned_word_matcher()
+        self.warning_db = get_storage().namespace('moderation')
         self.setup_database()
         self.log_channel = None  # Log kanalı için değişken
         
@@ -28,15 +43,15 @@ class Moderation(commands.Cog):
                 "en": ["swear", "insult", "spam"]
             }
     
+    def rebuild_banned_word_matcher(self):
+        """Yasaklı kelime listesinden eşleştiriciyi yeniden derle"""
+        self.banned_word_matcher = BannedWordMatcher.from_config(
+            self.banned_words, whole_words=self.banned_words_whole
+        )
+    
     def setup_database(self):
-        cursor = self.warning_db.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS warnings
-                         (user_id INTEGER, guild_id INTEGER, reason TEXT, 
-                          timestamp TEXT, warned_by INTEGER, warning_count INTEGER)''')
-        cursor.execute('''CREATE TABLE IF NOT EXISTS moderation_logs
-                         (action TEXT, user_id INTEGER, moderator_id INTEGER, 
-                          reason TEXT, timestamp TEXT)''')
-        self.warning_db.commit()
+        # Eski warnings.db dosyasını bir kez içe aktar
+        self.warning_db.import_legacy('warnings.db', ['warnings', 'moderation_logs'])
     
     async def set_log_channel(self, channel: discord.TextChannel):
         """Log kanalını ayarla"""
@@ -52,12 +67,10 @@ class Moderation(commands.Cog):
             )
             await self.log_channel.send(embed=embed)
         
-        cursor = self.warning_db.cursor()
-        cursor.execute('''INSERT INTO moderation_logs 
+        self.warning_db.execute('''INSERT INTO {moderation_logs} 
                          (action, user_id, moderator_id, reason, timestamp) 
                          VALUES (?, ?, ?, ?, ?)''', 
                       (action, user.id, moderator.id, reason, datetime.now().isoformat()))
-        self.warning_db.commit()
     
     @app_commands.command(name="at", description="Kullanıcıyı sunucudan atar")
     @app_commands.checks.has_permissions(kick_members=True)
@@ -92,25 +105,49 @@ class Moderation(commands.Cog):
         except discord.Forbidden:
             await interaction.response.send_message("❌ Yasak kaldırma yetkim yok.")
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Otomatik moderasyon ve spam engelleme"""
-        if message.author.bot:
-            return
-        
-        # Küfür engelleme
-        if any(word in message.content.lower() for word in self.banned_words["tr"] + self.banned_words["en"]):
-            await message.delete()
-            await message.channel.send(f"{message.author.mention}, lütfen uygun bir dil kullanın!")
-            
-        # Spam engelleme
-        self.spam_detection[message.author.id] = self.spam_detection.get(message.author.id, []) + [datetime.now()]
-        recent_messages = [msg for msg in self.spam_detection[message.author.id] if (datetime.now() - msg).total_seconds() < 10]
-        
-        if len(recent_messages) > 5:
+    async def cog_load(self):
+        pipeline = get_message_pipeline(self.bot)
+        pipeline.register("moderation.banned_words", STAGE_MODERATION, self.filter_banned_words)
+        pipeline.register("moderation.spam", STAGE_ANTISPAM, self.filter_spam, run_on_deleted=True)
+        self.spam_detection.start_sweeper()
+        self.spam_check_window.start_sweeper()
+
+        guild_config = get_guild_config(self.bot)
+        guild_config.subscribe('spam_limit', self.apply_spam_limit)
+        for guild in self.bot.guilds:
+            self.apply_spam_limit(guild.id, 'spam_limit', None, await guild_config.get(guild.id, 'spam_limit'))
+
+    async def cog_unload(self):
+        pipeline = get_message_pipeline(self.bot)
+        pipeline.unregister("moderation.banned_words")
+        pipeline.unregister("moderation.spam")
+        self.spam_detection.stop_sweeper()
+        self.spam_check_window.stop_sweeper()
+        get_guild_config(self.bot).unsubscribe('spam_limit', self.apply_spam_limit)
+
+    def apply_spam_limit(self, guild_id, key, old, new):
+        """/moderasyon automod spam ile ayarlanan sunucu limitini uygula"""
+        if new:
+            count, interval = new
+            self.spam_detection.set_limit(guild_id, count, interval)
+        else:
+            self.spam_detection.remove_limit(guild_id)
+
+    async def filter_banned_words(self, ctx: MessageContext):
+        """Küfür engelleme"""
+        if self.banned_word_matcher.search(ctx.message.content) is not None:
+            if await ctx.delete():
+                await ctx.message.channel.send(f"{ctx.message.author.mention}, lütfen uygun bir dil kullanın!")
+
+    async def filter_spam(self, ctx: MessageContext):
+        """Spam engelleme"""
+        message = ctx.message
+        key = (ctx.guild_id, ctx.author_id)
+        if not self.spam_detection.hit(key, ctx.guild_id, ctx.received_at).allowed:
             await message.author.timeout(timedelta(minutes=10), reason="Spam yapma")
             await message.channel.send(f"{message.author.mention}, spam yaptığınız için 10 dakika süreyle susturuldunuz.")
-            self.spam_detection[message.author.id] = []
+            self.spam_detection.reset(key)
+            ctx.halt()
     
     @app_commands.command(name="rol_ver", description="Kullanıcıya rol atar")
     @app_commands.checks.has_permissions(manage_roles=True)
@@ -136,21 +173,17 @@ class Moderation(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def list_warnings(self, interaction: discord.Interaction, member: discord.Member = None):
         """Kullanıcının uyarılarını listeler"""
-        cursor = self.warning_db.cursor()
-        
         if member:
-            cursor.execute('''SELECT reason, timestamp, warned_by 
-                             FROM warnings 
+            warnings = self.warning_db.fetchall('''SELECT reason, timestamp, warned_by 
+                             FROM {warnings} 
                              WHERE user_id = ? AND guild_id = ?''', 
                           (member.id, interaction.guild_id))
         else:
-            cursor.execute('''SELECT user_id, reason, timestamp, warned_by 
-                             FROM warnings 
+            warnings = self.warning_db.fetchall('''SELECT user_id, reason, timestamp, warned_by 
+                             FROM {warnings} 
                              WHERE guild_id = ?''', 
                           (interaction.guild_id,))
         
-        warnings = cursor.fetchall()
-        
         if not warnings:
             await interaction.response.send_message("⚠️ Hiç uyarı bulunamadı.")
             return
@@ -184,17 +217,13 @@ class Moderation(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def warn(self, interaction: discord.Interaction, member: discord.Member, reason: str = "Belirtilmedi"):
         """Kullanıcıyı uyar ve veritabanına kaydet"""
-        cursor = self.warning_db.cursor()
-        cursor.execute('''INSERT INTO warnings VALUES (?, ?, ?, ?, ?)''',
-                      (member.id, interaction.guild_id, reason, 
-                       datetime.now().isoformat(), interaction.user.id))
-        self.warning_db.commit()
+        self.warning_db.execute('''INSERT INTO {warnings} (user_id, guild_id, reason, timestamp, warned_by)
+                                   VALUES (?, ?, ?, ?, ?)''',
+                                (member.id, interaction.guild_id, reason, 
+                                 datetime.now().isoformat(), interaction.user.id))
         
-        # Uyarı sayısını kontrol et
-        cursor.execute('''SELECT COUNT(*) FROM warnings 
-                         WHERE user_id = ? AND guild_id = ?''', 
-                      (member.id, interaction.guild_id))
-        warning_count = cursor.fetchone()[0]
+        # Aktif uyarı sayısı (sayaç tablosu ekleme ile aynı işlemde güncellenir)
+        warning_count = active_warnings(self.warning_db, member.id, interaction.guild_id, warning_cutoff())
         
         embed = discord.Embed(
             title="⚠️ Kullanıcı Uyarıldı",
@@ -222,11 +251,9 @@ class Moderation(commands.Cog):
         if not member:
             member = interaction.user
             
-        cursor = self.warning_db.cursor()
-        cursor.execute('''SELECT reason, timestamp FROM warnings 
+        warnings = self.warning_db.fetchall('''SELECT reason, timestamp FROM {warnings} 
                          WHERE user_id = ? AND guild_id = ?''',
                       (member.id, interaction.guild_id))
-        warnings = cursor.fetchall()
         
         if not warnings:
             await interaction.response.send_message(f"{member.mention} için uyarı bulunmamakta.")
@@ -249,11 +276,28 @@ class Moderation(commands.Cog):
                                    action: str, 
                                    word: str, 
                                    language: str = "tr"):
-        """Yasaklı kelimeleri ekle/çıkar"""
+        """Yasaklı kelimeleri ekle/çıkar, tam kelime modunu aç/kapat"""
         try:
             with open('config/banned_words.json', 'r', encoding='utf-8') as f:
                 banned_words = json.load(f)
-                
+
+            if action.lower() == "tamkelime":
+                if word.lower() not in ("aç", "kapat"):
+                    await interaction.response.send_message("❌ Geçersiz değer! Örnek: tamkelime aç", ephemeral=True)
+                    return
+                banned_words["whole_words"] = word.lower() == "aç"
+                with open('config/banned_words.json', 'w', encoding='utf-8') as f:
+                    json.dump(banned_words, f, ensure_ascii=False, indent=4)
+
+                self.banned_words = banned_words
+                self.banned_words_whole = banned_words["whole_words"]
+                self.rebuild_banned_word_matcher()
+
+                await interaction.response.send_message(
+                    f"✅ Tam kelime eşleşmesi {'açıldı' if self.banned_words_whole else 'kapatıldı'}!"
+                )
+                return
+
             if action.lower() == "ekle":
                 if word.lower() not in banned_words.get(language, []):
                     banned_words.setdefault(language, []).append(word.lower())
@@ -272,6 +316,7 @@ class Moderation(commands.Cog):
                     json.dump(banned_words, f, ensure_ascii=False, indent=4)
                 
                 self.banned_words = banned_words
+                self.rebuild_banned_word_matcher()
                 
                 await interaction.response.send_message(
                     f"✅ Kelime başarıyla {'eklendi' if action.lower() == 'ekle' else 'çıkarıldı'}!"
@@ -285,49 +330,27 @@ class Moderation(commands.Cog):
             await interaction.response.send_message(f"Bir hata oluştu: {str(e)}")
 
     async def check_spam(self, message):
-        user_id = message.author.id
-        current_time = datetime.now().timestamp()
-        
-        if user_id not in self.spam_detection:
-            self.spam_detection[user_id] = {"messages": [], "warnings": 0}
-            
-        self.spam_detection[user_id]["messages"].append(current_time)
-        
-        # Son 5 saniye içindeki mesajları filtrele
-        recent_messages = [msg for msg in self.spam_detection[user_id]["messages"] 
-                         if current_time - msg < 5]
-        self.spam_detection[user_id]["messages"] = recent_messages
-        
-        if len(recent_messages) > 5:  # 5 saniyede 5'ten fazla mesaj
+        if self.spam_check_window.exceeded(message.author.id):  # 5 saniyede 5'ten fazla mesaj
             await message.channel.send(f"{message.author.mention}, spam yapmayı bırak!")
             await self.warn_user(message.author, message.guild, "Spam yapma", self.bot.user)
             return True
         return False
 
     async def check_banned_words(self, message):
-        content = message.content.lower()
-        for word_list in self.banned_words.values():
-            for word in word_list:
-                if word.lower() in content:
-                    return True
-        return False
+        return self.banned_word_matcher.search(message.content) is not None
 
     async def check_links(self, message):
         url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
         return bool(re.search(url_pattern, message.content))
 
     async def warn_user(self, user, guild, reason, warned_by):
-        cursor = self.warning_db.cursor()
-        cursor.execute('''INSERT INTO warnings VALUES (?, ?, ?, ?, ?)''',
-                      (user.id, guild.id, reason, 
-                       datetime.now().isoformat(), warned_by.id))
-        self.warning_db.commit()
+        self.warning_db.execute('''INSERT INTO {warnings} (user_id, guild_id, reason, timestamp, warned_by)
+                                   VALUES (?, ?, ?, ?, ?)''',
+                                (user.id, guild.id, reason, 
+                                 datetime.now().isoformat(), warned_by.id))
         
-        # Uyarı sayısını kontrol et
-        cursor.execute('''SELECT COUNT(*) FROM warnings 
-                         WHERE user_id = ? AND guild_id = ?''', 
-                      (user.id, guild.id))
-        warning_count = cursor.fetchone()[0]
+        # Aktif uyarı sayısı (sayaç tablosu ekleme ile aynı işlemde güncellenir)
+        warning_count = active_warnings(self.warning_db, user.id, guild.id, warning_cutoff())
         
         if warning_count >= 3:
             await self.handle_excessive_warnings(user, guild)
@@ -1,10 +1,10 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
 import random
 import asyncio
 from datetime import datetime
+from utils.json_store import get_json_store
 
 class Pet:
     def __init__(self, name, species):
@@ -61,15 +61,11 @@ class PetSystem(commands.Cog):
         self.bot.loop.create_task(self.pet_status_update())
 
     def load_pets(self):
-        try:
-            with open('pets.json', 'r') as f:
-                self.pets = json.load(f)
-        except FileNotFoundError:
-            self.pets = {}
+        self.pets = get_json_store().load('pets.json')
 
     def save_pets(self):
-        with open('pets.json', 'w') as f:
-            json.dump(self.pets, f)
+        # Bellekteki belge kirli işaretlenir; yazım gecikmeli ve atomik
+        get_json_store().save('pets.json', self.pets)
 
     @app_commands.command(name="pet", description="Show pet commands help")
     async def pet_help(self, interaction: discord.Interaction):
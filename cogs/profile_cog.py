@@ -2,33 +2,25 @@ import discord
 from discord import app_commands  # Add this import
 from discord.ext import commands
 import json
-import sqlite3
 from datetime import datetime
 import random
 import asyncio
+from storage import get_storage
+from utils.message_pipeline import MessageContext, STAGE_XP, get_message_pipeline
+from utils.level_table import POWER_LEVELS
+from utils.announcer import get_announcer
 
 class Profile(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = sqlite3.connect('user_data.db')
+        self.db = get_storage().namespace('user_data')
         self.setup_database()
         self.load_achievements()
         self.xp_cooldowns = {}
 
     def setup_database(self):
-        cursor = self.db.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS user_profiles
-            (user_id INTEGER PRIMARY KEY,
-             level INTEGER DEFAULT 1,
-             xp INTEGER DEFAULT 0,
-             total_messages INTEGER DEFAULT 0,
-             achievements TEXT DEFAULT '[]',
-             join_date TEXT,
-             bio TEXT DEFAULT 'Henüz bir biyografi yok.',
-             favorite_color TEXT DEFAULT '#ffffff',
-             badges TEXT DEFAULT '[]',
-             title TEXT DEFAULT 'Yeni Üye')''')
-        self.db.commit()
+        # Eski user_data.db dosyasını bir kez içe aktar
+        self.db.import_legacy('user_data.db', ['user_profiles'])
 
     def load_achievements(self):
         self.achievements = {
@@ -49,16 +41,13 @@ class Profile(commands.Cog):
     async def profile(self, interaction: discord.Interaction, member: discord.Member = None):
         """Kullanıcı profilini göster"""
         member = member or interaction.user
-        cursor = self.db.cursor()
-        cursor.execute('SELECT * FROM user_profiles WHERE user_id = ?', (member.id,))
-        data = cursor.fetchone()
+        data = self.db.fetchone('SELECT * FROM {user_profiles} WHERE user_id = ?', (member.id,))
 
         if not data:
-            cursor.execute('INSERT INTO user_profiles (user_id, join_date) VALUES (?, ?)',
-                         (member.id, member.joined_at.isoformat()))
-            self.db.commit()
-            cursor.execute('SELECT * FROM user_profiles WHERE user_id = ?', (member.id,))
-            data = cursor.fetchone()
+            with self.db.transaction() as tx:
+                tx.execute('INSERT OR IGNORE INTO {user_profiles} (user_id, join_date) VALUES (?, ?)',
+                           (member.id, member.joined_at.isoformat()))
+                data = tx.fetchone('SELECT * FROM {user_profiles} WHERE user_id = ?', (member.id,))
 
         # Güvenli renk oluşturma
         try:
@@ -109,12 +98,18 @@ class Profile(commands.Cog):
         return f'```{bar} {percentage:.1f}%```'
 
     def calculate_xp_required(self, level):
-        return int(100 * (level ** 1.5))
+        return POWER_LEVELS.cost(level)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        get_message_pipeline(self.bot).register("profile_cog.xp", STAGE_XP, self.award_message_xp, run_in_dms=True)
+
+    async def cog_unload(self):
+        get_message_pipeline(self.bot).unregister("profile_cog.xp")
+        await get_announcer(self.bot).flush()
+
+    async def award_message_xp(self, ctx: MessageContext):
+        message = ctx.message
+        announcer = get_announcer(self.bot)
 
         # XP Cooldown kontrolü
         if message.author.id in self.xp_cooldowns:
@@ -123,15 +118,13 @@ class Profile(commands.Cog):
 
         self.xp_cooldowns[message.author.id] = datetime.now()
 
-        cursor = self.db.cursor()
-        cursor.execute('SELECT level, xp, achievements FROM user_profiles WHERE user_id = ?',
-                      (message.author.id,))
-        data = cursor.fetchone()
+        data = self.db.fetchone('SELECT level, xp, achievements, total_messages FROM {user_profiles} WHERE user_id = ?',
+                                (message.author.id,))
 
         if not data:
             return
 
-        level, xp, achievements = data
+        level, xp, achievements, total_messages = data
         achievements = json.loads(achievements)
 
         # XP kazanma
@@ -139,57 +132,40 @@ class Profile(commands.Cog):
         new_xp = xp + gained_xp
 
         # Level kontrolü
-        xp_required = self.calculate_xp_required(level)
-        new_level = level
+        new_level, new_xp = POWER_LEVELS.advance(level, new_xp)
 
-        while new_xp >= xp_required:
-            new_level += 1
-            new_xp -= xp_required
-            xp_required = self.calculate_xp_required(new_level)
-
-            if new_level in [5, 10, 20, 50, 100]:
-                achievement_id = f'level_{new_level}'
+        for reached in range(level + 1, new_level + 1):
+            if reached in [5, 10, 20, 50, 100]:
+                achievement_id = f'level_{reached}'
                 if achievement_id not in achievements:
                     achievements.append(achievement_id)
-                    await message.channel.send(
-                        f"🎉 {message.author.mention} yeni bir başarım kazandı: "
-                        f"**{self.achievements[achievement_id]['name']}**!"
+                    announcer.announce(
+                        message.channel, message.author,
+                        f"🏆 Yeni başarım: **{self.achievements[achievement_id]['name']}**"
                     )
 
         # Mesaj sayısı başarımları
-        cursor.execute('UPDATE user_profiles SET total_messages = total_messages + 1 WHERE user_id = ?',
-                      (message.author.id,))
-
-        cursor.execute('SELECT total_messages FROM user_profiles WHERE user_id = ?',
-                      (message.author.id,))
-        total_messages = cursor.fetchone()[0]
+        total_messages += 1
 
         for threshold in [1, 10, 100, 1000]:
             if total_messages == threshold:
                 achievement_id = f'message_{threshold}'
                 if achievement_id not in achievements:
                     achievements.append(achievement_id)
-                    await message.channel.send(
-                        f"🎉 {message.author.mention} yeni bir başarım kazandı: "
-                        f"**{self.achievements[achievement_id]['name']}**!"
+                    announcer.announce(
+                        message.channel, message.author,
+                        f"🏆 Yeni başarım: **{self.achievements[achievement_id]['name']}**"
                     )
 
-        # Veritabanını güncelle
-        cursor.execute('''UPDATE user_profiles 
-                         SET level = ?, xp = ?, achievements = ?
+        # Veritabanını tek yazımla güncelle
+        self.db.execute('''UPDATE {user_profiles} 
+                         SET level = ?, xp = ?, achievements = ?, total_messages = ?
                          WHERE user_id = ?''',
-                      (new_level, new_xp, json.dumps(achievements), message.author.id))
-        self.db.commit()
+                      (new_level, new_xp, json.dumps(achievements), total_messages, message.author.id))
 
         # Level atlama mesajı
         if new_level > level:
-            embed = discord.Embed(
-                title="🎊 Level Atladın!",
-                description=f"Tebrikler {message.author.mention}! "
-                          f"Seviye **{new_level}** oldun!",
-                color=discord.Color.gold()
-            )
-            await message.channel.send(embed=embed)
+            announcer.announce(message.channel, message.author, f"🎊 Seviye **{new_level}** oldun!")
 
 async def setup(bot):
     await bot.add_cog(Profile(bot))
@@ -1,56 +1,42 @@
 import discord
 from discord.ext import commands
 import json
-import sqlite3
 from datetime import datetime
 import random
+from storage import get_storage
+from utils.message_pipeline import (
+    MessageContext, STAGE_ACHIEVEMENTS, STAGE_XP, get_message_pipeline
+)
+from utils.level_table import PROFILE_LEVELS
+from utils.announcer import get_announcer
 
 class Profiles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = sqlite3.connect('profiles.db')
+        self.db = get_storage().namespace('profiles')
         self.setup_database()
         self.xp_cooldowns = {}
         
     def setup_database(self):
-        cursor = self.db.cursor()
-        
-        # Profil tablosu
-        cursor.execute('''CREATE TABLE IF NOT EXISTS profiles
-                         (user_id INTEGER PRIMARY KEY,
-                          xp INTEGER DEFAULT 0,
-                          level INTEGER DEFAULT 0,
-                          coins INTEGER DEFAULT 0,
-                          daily_streak INTEGER DEFAULT 0,
-                          last_daily TEXT,
-                          background_url TEXT,
-                          description TEXT)''')
-                          
-        # Başarımlar tablosu
-        cursor.execute('''CREATE TABLE IF NOT EXISTS achievements
-                         (user_id INTEGER,
-                          achievement_id TEXT,
-                          unlock_date TEXT,
-                          PRIMARY KEY (user_id, achievement_id))''')
-                          
-        # Günlük görevler tablosu
-        cursor.execute('''CREATE TABLE IF NOT EXISTS daily_tasks
-                         (user_id INTEGER,
-                          task_id TEXT,
-                          progress INTEGER DEFAULT 0,
-                          completed INTEGER DEFAULT 0,
-                          date TEXT,
-                          PRIMARY KEY (user_id, task_id, date))''')
-                          
-        self.db.commit()
+        # Eski profiles.db dosyasını bir kez içe aktar
+        self.db.import_legacy('profiles.db', ['profiles', 'achievements', 'daily_tasks'])
+
+    async def cog_load(self):
+        pipeline = get_message_pipeline(self.bot)
+        pipeline.register("profiles.xp", STAGE_XP, self.award_message_xp, run_in_dms=True)
+        pipeline.register("profiles.achievements", STAGE_ACHIEVEMENTS, self.award_level_achievements, run_in_dms=True)
+
+    async def cog_unload(self):
+        pipeline = get_message_pipeline(self.bot)
+        pipeline.unregister("profiles.xp")
+        pipeline.unregister("profiles.achievements")
+        await get_announcer(self.bot).flush()
+
+    async def award_message_xp(self, ctx: MessageContext):
+        message = ctx.message
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-            
         # XP kazanma cooldown kontrolü
-        user_id = message.author.id
+        user_id = ctx.author_id
         current_time = datetime.now().timestamp()
         
         if user_id in self.xp_cooldowns:
@@ -60,56 +46,49 @@ class Profiles(commands.Cog):
         self.xp_cooldowns[user_id] = current_time
         
         # XP ekle ve seviye kontrolü
-        cursor = self.db.cursor()
-        cursor.execute('INSERT OR IGNORE INTO profiles (user_id) VALUES (?)', 
-                      (user_id,))
-                      
-        xp_gain = random.randint(15, 25)
-        cursor.execute('''UPDATE profiles 
+        with self.db.transaction() as tx:
+            tx.execute('INSERT OR IGNORE INTO {profiles} (user_id) VALUES (?)', 
+                       (user_id,))
+                          
+            xp_gain = random.randint(15, 25)
+            tx.execute('''UPDATE {profiles} 
                          SET xp = xp + ? 
                          WHERE user_id = ?''', 
-                      (xp_gain, user_id))
-                      
-        # Seviye kontrolü
-        cursor.execute('SELECT xp, level FROM profiles WHERE user_id = ?', 
-                      (user_id,))
-        xp, level = cursor.fetchone()
-        
-        new_level = int(xp ** 0.4 / 4)  # Seviye formülü
-        
-        if new_level > level:
-            cursor.execute('''UPDATE profiles 
+                       (xp_gain, user_id))
+                          
+            # Seviye kontrolü
+            xp, level = tx.fetchone('SELECT xp, level FROM {profiles} WHERE user_id = ?', 
+                                    (user_id,))
+            
+            new_level = PROFILE_LEVELS.level_for_xp(xp)  # Seviye formülü: int(xp ** 0.4 / 4)
+            
+            if new_level > level:
+                tx.execute('''UPDATE {profiles} 
                             SET level = ? 
                             WHERE user_id = ?''', 
-                         (new_level, user_id))
+                           (new_level, user_id))
                          
-            # Seviye atlama mesajı
-            embed = discord.Embed(
-                title="🎉 Seviye Atlama!",
-                description=f"{message.author.mention} seviye atladı!\n"
-                          f"Yeni seviye: {new_level}",
-                color=discord.Color.green()
+        if new_level > level:
+            # Seviye atlama mesajı (kanal başına toplu gönderilir)
+            get_announcer(self.bot).announce(message.channel, message.author, f"Yeni seviye: **{new_level}**")
+            ctx.data["profiles.new_level"] = new_level
+
+    async def award_level_achievements(self, ctx: MessageContext):
+        # Seviye başarımı kontrolü
+        new_level = ctx.data.get("profiles.new_level")
+        if new_level in [5, 10, 25, 50, 100]:
+            await self.check_and_award_achievement(
+                ctx.author_id, 
+                f"level_{new_level}", 
+                f"{new_level}. Seviyeye Ulaşma"
             )
-            await message.channel.send(embed=embed)
-            
-            # Seviye başarımı kontrolü
-            if new_level in [5, 10, 25, 50, 100]:
-                await self.check_and_award_achievement(
-                    user_id, 
-                    f"level_{new_level}", 
-                    f"{new_level}. Seviyeye Ulaşma"
-                )
-                
-        self.db.commit()
 
     async def check_and_award_achievement(self, user_id, achievement_id, name):
-        cursor = self.db.cursor()
-        cursor.execute('''INSERT OR IGNORE INTO achievements 
+        inserted = self.db.execute('''INSERT OR IGNORE INTO {achievements} 
                          VALUES (?, ?, ?)''',
                       (user_id, achievement_id, datetime.now().isoformat()))
         
-        if cursor.rowcount > 0:  # Yeni başarım
-            self.db.commit()
+        if inserted > 0:  # Yeni başarım
             user = self.bot.get_user(user_id)
             if user:
                 embed = discord.Embed(
@@ -126,13 +105,10 @@ class Profiles(commands.Cog):
     async def show_profile(self, ctx, member: discord.Member = None):
         """Kullanıcı profilini göster"""
         member = member or ctx.author
-        cursor = self.db.cursor()
-        
-        cursor.execute('''SELECT xp, level, coins, daily_streak, 
+        result = self.db.fetchone('''SELECT xp, level, coins, daily_streak, 
                                 background_url, description 
-                         FROM profiles 
+                         FROM {profiles} 
                          WHERE user_id = ?''', (member.id,))
-        result = cursor.fetchone()
         
         if not result:
             await ctx.send("Profil bulunamadı!")
@@ -141,11 +117,10 @@ class Profiles(commands.Cog):
         xp, level, coins, streak, bg_url, desc = result
         
         # Başarımları al
-        cursor.execute('''SELECT achievement_id, unlock_date 
-                         FROM achievements 
+        achievements = self.db.fetchall('''SELECT achievement_id, unlock_date 
+                         FROM {achievements} 
                          WHERE user_id = ?''', 
                       (member.id,))
-        achievements = cursor.fetchall()
         
         embed = discord.Embed(
             title=f"{member.name}'in Profili",
@@ -158,8 +133,9 @@ class Profiles(commands.Cog):
             embed.set_image(url=bg_url)
             
         # Seviye bilgisi
-        next_level_xp = ((level + 1) * 4) ** 2.5
-        progress = (xp - (level * 4) ** 2.5) / (next_level_xp - (level * 4) ** 2.5) * 100
+        next_level_xp = PROFILE_LEVELS.threshold(level + 1)
+        level_xp = PROFILE_LEVELS.threshold(level)
+        progress = (xp - level_xp) / (next_level_xp - level_xp) * 100
         progress_bar = "█" * int(progress / 10) + "▒" * (10 - int(progress / 10))
         
         embed.add_field(
@@ -215,23 +191,21 @@ class Profiles(commands.Cog):
     @commands.command(name="günlükgörev", aliases=["dailytask"])
     async def daily_tasks(self, ctx):
         """Günlük görevleri göster"""
-        cursor = self.db.cursor()
         today = datetime.now().strftime('%Y-%m-%d')
         
         # Eğer bugün için görev yoksa, yeni görevler oluştur
-        cursor.execute('''SELECT COUNT(*) FROM daily_tasks 
+        task_count = self.db.fetchone('''SELECT COUNT(*) FROM {daily_tasks} 
                          WHERE user_id = ? AND date = ?''',
-                      (ctx.author.id, today))
+                      (ctx.author.id, today))[0]
                       
-        if cursor.fetchone()[0] == 0:
+        if task_count == 0:
             await self.generate_daily_tasks(ctx.author.id)
             
         # Görevleri getir
-        cursor.execute('''SELECT task_id, progress, completed 
-                         FROM daily_tasks 
+        tasks = self.db.fetchall('''SELECT task_id, progress, completed 
+                         FROM {daily_tasks} 
                          WHERE user_id = ? AND date = ?''',
                       (ctx.author.id, today))
-        tasks = cursor.fetchall()
         
         embed = discord.Embed(
             title="📋 Günlük Görevler",
@@ -254,7 +228,6 @@ class Profiles(commands.Cog):
 
     async def generate_daily_tasks(self, user_id):
         """Yeni günlük görevler oluştur"""
-        cursor = self.db.cursor()
         today = datetime.now().strftime('%Y-%m-%d')
         
         tasks = [
@@ -265,13 +238,11 @@ class Profiles(commands.Cog):
             "daily_streak"
         ]
         
-        for task_id in random.sample(tasks, 3):  # 3 rastgele görev seç
-            cursor.execute('''INSERT INTO daily_tasks 
+        # 3 rastgele görev seç
+        self.db.executemany('''INSERT INTO {daily_tasks} 
                             (user_id, task_id, date) 
                             VALUES (?, ?, ?)''',
-                         (user_id, task_id, today))
-                         
-        self.db.commit()
+                         [(user_id, task_id, today) for task_id in random.sample(tasks, 3)])
 
     def get_task_info(self, task_id):
         """Görev bilgilerini döndür"""
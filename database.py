@@ -1,115 +1,61 @@
-import sqlite3
+import re
 import json
-import os
+import queue
+import asyncio
+import sqlite3
 import logging
-from typing import Any, Dict, Optional
+import threading
+import functools
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from ledger import MINT, SINK, bank, get_ledger, wallet
+from migrations import apply_migrations
+from storage import StorageEngine, get_storage
+from utils.warning_counts import active_warnings, warning_cutoff
 
 class DatabaseManager:
-    def __init__(self, db_path: str = 'bot_database.sqlite'):
+    def __init__(self, db_path: str = 'bot_database.sqlite', storage: Optional[StorageEngine] = None,
+                 profile_cache_size: int = 10000):
         """
         Initialize the database manager with a specific database path.
         
         :param db_path: Path to the SQLite database file
+        :param storage: Storage engine to use (defaults to the shared engine)
+        :param profile_cache_size: Decoded profiles kept in the LRU cache (0 disables it)
         """
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
-        
-        # Create connection and cursor
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.execute('PRAGMA foreign_keys = ON')  # Enable foreign key support
-        
-        # Initialize core tables
-        self._create_core_tables()
-        
-    def _create_core_tables(self):
-        """Create essential tables for the bot's functionality"""
-        tables = {
-            'casino_users': '''
-                CREATE TABLE IF NOT EXISTS casino_users (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    last_daily DATETIME,
-                    inventory TEXT
-                )
-            ''',
-            'economy_users': '''
-                CREATE TABLE IF NOT EXISTS economy_users (
-                    user_id INTEGER PRIMARY KEY,
-                    wallet_balance INTEGER DEFAULT 0,
-                    bank_balance INTEGER DEFAULT 0,
-                    last_work DATETIME
-                )
-            ''',
-            'user_profiles': '''
-                CREATE TABLE IF NOT EXISTS user_profiles (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    level INTEGER DEFAULT 1,
-                    xp INTEGER DEFAULT 0,
-                    reputation INTEGER DEFAULT 0,
-                    join_date DATETIME
-                )
-            ''',
-            'profiles': '''
-                CREATE TABLE IF NOT EXISTS profiles (
-                    user_id TEXT PRIMARY KEY,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 1,
-                    coins INTEGER DEFAULT 0,
-                    bio TEXT DEFAULT 'Henüz biyografi yok',
-                    badges TEXT DEFAULT '[]',
-                    daily_last TEXT
-                )
-            ''',
-            'events': '''
-                CREATE TABLE IF NOT EXISTS events (
-                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT,
-                    date TEXT,
-                    time TEXT,
-                    channel_id INTEGER,
-                    creator_id INTEGER
-                )
-            ''',
-            'autoroles': '''
-                CREATE TABLE IF NOT EXISTS autoroles (
-                    guild_id TEXT,
-                    role_id TEXT,
-                    PRIMARY KEY (guild_id, role_id)
-                )
-            ''',
-            'config': '''
-                CREATE TABLE IF NOT EXISTS config (
-                    guild_id TEXT,
-                    key TEXT,
-                    value TEXT,
-                    PRIMARY KEY (guild_id, key)
-                )
-            '''
-        }
+        # Read-through LRU of decoded profiles, written through on every update
+        self.profile_cache_size = profile_cache_size
+        self._profile_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._profile_lock = threading.Lock()
+        self._profile_writes = 0
+        self.profile_cache_hits = 0
+        self.profile_cache_misses = 0
         
-        # Create tables
-        cursor = self.conn.cursor()
-        for table_name, table_schema in tables.items():
-            cursor.execute(table_schema)
+        # Core tables live in the shared engine's unprefixed namespace
+        self.storage = storage or get_storage(db_path)
+        
+        # Create or upgrade every table (see migrations.py)
+        apply_migrations(self.storage)
+        
+        # Every coin balance lives in the ledger (see ledger.py)
+        self.ledger = get_ledger(self.storage)
+        
+        # Async API for cogs: same methods, run on a dedicated DB thread
+        self.aio = AsyncDatabaseManager(self)
         
-        self.conn.commit()
-        self.logger.info("Core database tables initialized successfully.")
-    
     def get_casino_balance(self, user_id: int) -> int:
         """
-        Retrieve a user's casino balance.
+        Retrieve a user's casino balance (their ledger wallet).
         
         :param user_id: Discord user ID
         :return: User's casino balance
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT balance FROM casino_users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        return result[0] if result else 0
+        return self.ledger.balance(wallet(user_id))
     
     def update_casino_balance(self, user_id: int, amount: int) -> None:
         """
@@ -117,13 +63,12 @@ class DatabaseManager:
         
         :param user_id: Discord user ID
         :param amount: Amount to add or subtract
+        :raises InsufficientFunds: If a subtraction exceeds the balance
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO casino_users (user_id, balance) 
-            VALUES (?, COALESCE((SELECT balance FROM casino_users WHERE user_id = ?), 0) + ?)
-        ''', (user_id, user_id, amount))
-        self.conn.commit()
+        if amount >= 0:
+            self.ledger.credit(wallet(user_id), amount, 'casino')
+        else:
+            self.ledger.debit(wallet(user_id), -amount, 'casino')
     
     def add_daily_reward(self, user_id: int, amount: int) -> None:
         """
@@ -132,12 +77,12 @@ class DatabaseManager:
         :param user_id: Discord user ID
         :param amount: Reward amount
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO casino_users (user_id, balance, last_daily) 
-            VALUES (?, COALESCE((SELECT balance FROM casino_users WHERE user_id = ?), 0) + ?, CURRENT_TIMESTAMP)
-        ''', (user_id, user_id, amount))
-        self.conn.commit()
+        with self.ledger.transaction() as ltx:
+            ltx.post([(MINT, -amount), (wallet(user_id), amount)], 'casino_daily')
+            ltx.tx.execute('''
+                INSERT INTO {casino_users} (user_id, last_daily) VALUES (?, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET last_daily = excluded.last_daily
+            ''', (user_id,))
     
     def can_claim_daily_reward(self, user_id: int) -> bool:
         """
@@ -146,9 +91,8 @@ class DatabaseManager:
         :param user_id: Discord user ID
         :return: Whether user can claim daily reward
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT last_daily FROM casino_users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
+        with self.storage.read() as conn:
+            result = conn.execute('SELECT last_daily FROM casino_users WHERE user_id = ?', (user_id,)).fetchone()
         
         if not result or not result[0]:
             return True
@@ -158,17 +102,293 @@ class DatabaseManager:
         last_daily = datetime.fromisoformat(result[0])
         return datetime.now() - last_daily >= timedelta(hours=24)
     
+    def coin_balance(self, user_id: int) -> int:
+        """
+        :param user_id: Discord user ID
+        :return: Wallet balance from the ledger
+        """
+        return self.ledger.balance(wallet(user_id))
+
+    def get_balance(self, user_id: int) -> Dict[str, int]:
+        """
+        :param user_id: Discord user ID
+        :return: ``{"balance": wallet, "bank": bank}`` from the ledger
+        """
+        balances = self.ledger.balances([wallet(user_id), bank(user_id)])
+        return {"balance": balances[wallet(user_id)], "bank": balances[bank(user_id)]}
+
+    def claim_daily(self, user_id, amount: int, day: str) -> bool:
+        """
+        Pay the daily reward and mark it claimed, atomically.
+        
+        :param user_id: Discord user ID
+        :param amount: Reward amount
+        :param day: Current day (``YYYY-MM-DD``)
+        :return: False if the reward was already claimed on ``day``
+        """
+        key = str(user_id)
+        self.get_profile(key)  # Profil satırı yoksa oluştur
+        with self.ledger.transaction() as ltx:
+            row = ltx.tx.fetchone('SELECT daily_last FROM {profiles} WHERE user_id = ?', (key,))
+            if row and row[0] == day:
+                return False
+            ltx.tx.execute('UPDATE {profiles} SET daily_last = ? WHERE user_id = ?', (day, key))
+            ltx.post([(MINT, -amount), (wallet(key), amount)], 'daily')
+        self._patch_cached_profile(key, daily_last=day)
+        return True
+
+    def buy_badge(self, user_id, badge: str, price: int) -> bool:
+        """
+        Charge ``price`` and add ``badge`` to the profile, atomically.
+        
+        :param user_id: Discord user ID
+        :param badge: Badge ID
+        :param price: Badge price
+        :return: False if the user already owns the badge
+        :raises InsufficientFunds: If the wallet cannot cover ``price``
+        """
+        key = str(user_id)
+        self.get_profile(key)
+        with self.ledger.transaction() as ltx:
+            row = ltx.tx.fetchone('SELECT badges FROM {profiles} WHERE user_id = ?', (key,))
+            badges = json.loads(row[0]) if row and row[0] else []
+            if badge in badges:
+                return False
+            badges.append(badge)
+            ltx.post([(wallet(key), -price), (SINK, price)], 'badge', memo=badge, require=[wallet(key)])
+            ltx.tx.execute('UPDATE {profiles} SET badges = ? WHERE user_id = ?', (json.dumps(badges), key))
+        self._patch_cached_profile(key, badges=badges)
+        return True
+
+    def open_investment(self, user_id: int, kind: str, amount: int) -> int:
+        """
+        Move ``amount`` from the wallet into a new investment, atomically.
+        
+        :param user_id: Discord user ID
+        :param kind: Investment type
+        :param amount: Invested amount
+        :return: Investment ID
+        :raises InsufficientFunds: If the wallet cannot cover ``amount``
+        """
+        with self.ledger.transaction() as ltx:
+            investment_id = ltx.tx.execute('''
+                INSERT INTO {investments} (user_id, type, amount, initial_amount, timestamp)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (user_id, kind, amount, amount)).lastrowid
+            ltx.post([(wallet(user_id), -amount), (SINK, amount)], 'investment',
+                     memo=str(investment_id), require=[wallet(user_id)])
+        return investment_id
+
+    def buy_item(self, user_id: int, item_id: str, quantity: int, cost: int, expire_date=None) -> None:
+        """
+        Charge ``cost`` and add the item to the inventory, atomically.
+        
+        :param user_id: Discord user ID
+        :param item_id: Market item ID
+        :param quantity: Item count
+        :param cost: Total price
+        :param expire_date: Expiry of timed items
+        :raises InsufficientFunds: If the wallet cannot cover ``cost``
+        """
+        with self.ledger.transaction() as ltx:
+            ltx.post([(wallet(user_id), -cost), (SINK, cost)], 'market', memo=item_id, require=[wallet(user_id)])
+            ltx.tx.execute('''
+                INSERT INTO {inventory} (user_id, item_id, quantity, purchase_date, expire_date)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+            ''', (user_id, item_id, quantity, expire_date))
+
     def get_profile(self, user_id):
-        with self.conn as conn:
-            c = conn.cursor()
-            c.execute('SELECT * FROM profiles WHERE user_id = ?', (str(user_id),))
-            result = c.fetchone()
+        """
+        Get a user's profile, creating it if needed.
+        
+        Served from the LRU cache when possible; the returned dict is a copy
+        and can be modified freely. ``coins`` is the user's ledger wallet
+        balance; change it through the ledger, not :meth:`update_profile`.
+        
+        :param user_id: Discord user ID
+        :return: Profile dict
+        """
+        key = str(user_id)
+        with self._profile_lock:
+            profile = self._profile_cache.get(key)
+            if profile is not None:
+                self._profile_cache.move_to_end(key)
+                self.profile_cache_hits += 1
+                return self._view_profile(profile)
+            self.profile_cache_misses += 1
+            writes = self._profile_writes
+        
+        profile = self._load_profile(key)
+        with self._profile_lock:
+            # Okurken bir yazım olduysa okunan satır eskimiş olabilir; önbelleğe alma
+            if writes == self._profile_writes:
+                self._cache_profile(key, profile)
+        return self._view_profile(profile)
+
+    def _load_profile(self, key):
+        with self.storage.read() as conn:
+            result = conn.execute('SELECT * FROM profiles WHERE user_id = ?', (key,)).fetchone()
             
-            if result is None:
-                c.execute('''INSERT INTO profiles (user_id) VALUES (?)''', (str(user_id),))
-                conn.commit()
-                return {
-                    "user_id": str(user_id),
+        if result is None:
+            with self.storage.write() as conn:
+                conn.execute('''INSERT OR IGNORE INTO profiles (user_id) VALUES (?)''', (key,))
+            return {
+                "user_id": key,
+                "xp": 0,
+                "level": 1,
+                "coins": 0,
+                "bio": "Henüz biyografi yok",
+                "badges": [],
+                "daily_last": None
+            }
+        
+        return self._decode_profile(result)
+
+    @staticmethod
+    def _decode_profile(row):
+        return {
+            "user_id": row[0],
+            "xp": row[1],
+            "level": row[2],
+            "coins": row[3],
+            "bio": row[4],
+            "badges": json.loads(row[5]),
+            "daily_last": row[6]
+        }
+
+    @staticmethod
+    def _copy_profile(profile):
+        return dict(profile, badges=list(profile["badges"]))
+
+    def _view_profile(self, profile, coins=None):
+        # profiles.coins artık okunmaz; bakiye defterden gelir
+        if coins is None:
+            coins = self.ledger.balance(wallet(profile["user_id"]))
+        return dict(self._copy_profile(profile), coins=coins)
+
+    def _cache_profile(self, key, profile):
+        # _profile_lock tutulurken çağrılır
+        if self.profile_cache_size <= 0:
+            return
+        self._profile_cache[key] = profile
+        self._profile_cache.move_to_end(key)
+        while len(self._profile_cache) > self.profile_cache_size:
+            self._profile_cache.popitem(last=False)
+
+    def update_profile(self, user_id, data):
+        # coins deftere aittir (bkz. claim_daily, buy_badge); burada yazılmaz
+        key = str(user_id)
+        with self.storage.write() as conn:
+            c = conn.cursor()
+            c.execute('''UPDATE profiles SET 
+                xp = ?, level = ?, bio = ?, badges = ?, daily_last = ?
+                WHERE user_id = ?''',
+                (data["xp"], data["level"], data["bio"],
+                 json.dumps(data["badges"]), data["daily_last"], key))
+        with self._profile_lock:
+            self._profile_writes += 1
+            self._cache_profile(key, self._copy_profile(dict(data, user_id=key)))
+
+    def _patch_cached_profile(self, key, **fields):
+        with self._profile_lock:
+            self._profile_writes += 1
+            profile = self._profile_cache.get(key)
+            if profile is not None:
+                self._profile_cache[key] = dict(profile, **fields)
+
+    def invalidate_profile(self, user_id=None) -> None:
+        """
+        Drop a cached profile after writing to ``profiles`` outside this class.
+        
+        :param user_id: Discord user ID, or ``None`` to clear the whole cache
+        """
+        with self._profile_lock:
+            self._profile_writes += 1
+            if user_id is None:
+                self._profile_cache.clear()
+            else:
+                self._profile_cache.pop(str(user_id), None)
+
+    def profile_cache_stats(self) -> Dict[str, Any]:
+        """
+        :return: Cache size, hit/miss counters and hit rate
+        """
+        with self._profile_lock:
+            lookups = self.profile_cache_hits + self.profile_cache_misses
+            return {
+                "size": len(self._profile_cache),
+                "max_size": self.profile_cache_size,
+                "hits": self.profile_cache_hits,
+                "misses": self.profile_cache_misses,
+                "hit_rate": self.profile_cache_hits / lookups if lookups else 0.0
+            }
+
+    def apply_profile_deltas(self, rows):
+        """
+        Write accumulated XP/level state and coin deltas in one transaction.
+
+        The coin deltas become a single multi-leg ledger transaction paid
+        from the mint, committed together with the XP update.
+
+        :param rows: Iterable of ``(xp, level, coin_delta, user_id)`` tuples
+        :return: Number of rows written
+        """
+        rows = [(xp, level, coins, str(user_id)) for xp, level, coins, user_id in rows]
+        if not rows:
+            return 0
+        legs = [(wallet(key), coins) for _, _, coins, key in rows if coins]
+        with self.ledger.transaction() as ltx:
+            ltx.tx.executemany('''UPDATE {profiles} SET xp = ?, level = ? WHERE user_id = ?''',
+                               [(xp, level, key) for xp, level, _, key in rows])
+            if legs:
+                ltx.post(legs + [(MINT, -sum(coins for _, coins in legs))], 'message')
+        with self._profile_lock:
+            self._profile_writes += 1
+            for xp, level, _, key in rows:
+                profile = self._profile_cache.get(key)
+                if profile is not None:
+                    profile["xp"] = xp
+                    profile["level"] = level
+        return len(rows)
+
+    def get_profiles(self, user_ids) -> Dict[str, dict]:
+        """
+        Batch :meth:`get_profile`: cached profiles are served from memory,
+        the rest are read with chunked ``IN (...)`` queries and missing
+        profiles are created in a single transaction.
+        
+        :param user_ids: Discord user IDs
+        :return: User ID (str) -> profile dict copy
+        """
+        keys = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        profiles = {}
+        missing = []
+        with self._profile_lock:
+            for key in keys:
+                profile = self._profile_cache.get(key)
+                if profile is None:
+                    missing.append(key)
+                else:
+                    self._profile_cache.move_to_end(key)
+                    profiles[key] = profile
+            self.profile_cache_hits += len(profiles)
+            self.profile_cache_misses += len(missing)
+            writes = self._profile_writes
+        
+        loaded = {}
+        with self.storage.read() as conn:
+            for chunk in _chunks(missing):
+                placeholders = ", ".join("?" * len(chunk))
+                for row in conn.execute(f'SELECT * FROM profiles WHERE user_id IN ({placeholders})', chunk):
+                    loaded[row[0]] = self._decode_profile(row)
+        
+        new = [key for key in missing if key not in loaded]
+        if new:
+            with self.storage.write() as conn:
+                conn.executemany('INSERT OR IGNORE INTO profiles (user_id) VALUES (?)', [(key,) for key in new])
+            for key in new:
+                loaded[key] = {
+                    "user_id": key,
                     "xp": 0,
                     "level": 1,
                     "coins": 0,
@@ -176,38 +396,65 @@ class DatabaseManager:
                     "badges": [],
                     "daily_last": None
                 }
-            
-            return {
-                "user_id": result[0],
-                "xp": result[1],
-                "level": result[2],
-                "coins": result[3],
-                "bio": result[4],
-                "badges": json.loads(result[5]),
-                "daily_last": result[6]
-            }
+        
+        with self._profile_lock:
+            cacheable = writes == self._profile_writes
+            for key, profile in loaded.items():
+                if cacheable:
+                    self._cache_profile(key, profile)
+                profiles[key] = profile
+        
+        balances = self.ledger.balances(wallet(key) for key in profiles)
+        return {key: self._view_profile(profile, balances[wallet(key)]) for key, profile in profiles.items()}
 
-    def update_profile(self, user_id, data):
-        with self.conn as conn:
-            c = conn.cursor()
-            c.execute('''UPDATE profiles SET 
-                xp = ?, level = ?, coins = ?, bio = ?, badges = ?, daily_last = ?
-                WHERE user_id = ?''',
-                (data["xp"], data["level"], data["coins"], data["bio"],
-                 json.dumps(data["badges"]), data["daily_last"], str(user_id)))
-            conn.commit()
+    def upsert_profiles(self, profiles) -> int:
+        """
+        Insert or fully overwrite many profiles in one transaction.
+        
+        ``coins`` is ignored; balances only change through the ledger.
+        
+        :param profiles: Profile dicts with the same keys as :meth:`get_profile` returns
+        :return: Number of rows written
+        """
+        profiles = [dict(profile, user_id=str(profile["user_id"])) for profile in profiles]
+        if not profiles:
+            return 0
+        with self.storage.write() as conn:
+            conn.executemany('''INSERT INTO profiles (user_id, xp, level, bio, badges, daily_last)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    xp = excluded.xp, level = excluded.level,
+                    bio = excluded.bio, badges = excluded.badges, daily_last = excluded.daily_last''',
+                [(p["user_id"], p["xp"], p["level"], p["bio"],
+                  json.dumps(p["badges"]), p["daily_last"]) for p in profiles])
+        with self._profile_lock:
+            self._profile_writes += 1
+            for profile in profiles:
+                self._cache_profile(profile["user_id"], self._copy_profile(profile))
+        return len(profiles)
+
+    def active_warning_count(self, user_id: int, guild_id: int) -> int:
+        """
+        Active (non-expired) warnings of a user, from the maintained counter.
+        
+        :param user_id: Discord user ID
+        :param guild_id: Discord guild ID
+        :return: Active warning count
+        """
+        # Çekirdek uyarılar NOW() -> CURRENT_TIMESTAMP (UTC) ile kaydedilir
+        return active_warnings(self.storage.namespace(), user_id, guild_id,
+                               warning_cutoff(sql_timestamp=True))
 
     def add_event(self, title, date, time, channel_id, creator_id):
-        with self.conn as conn:
+        with self.storage.write() as conn:
             c = conn.cursor()
             c.execute('''INSERT INTO events (title, date, time, channel_id, creator_id)
                 VALUES (?, ?, ?, ?, ?)''',
                 (title, date, time, channel_id, creator_id))
-            conn.commit()
             return c.lastrowid
 
     def get_events(self):
-        with self.conn as conn:
+        with self.storage.read() as conn:
             c = conn.cursor()
             c.execute('SELECT * FROM events')
             events = {}
@@ -222,51 +469,307 @@ class DatabaseManager:
             return events
 
     def remove_event(self, event_id):
-        with self.conn as conn:
+        with self.storage.write() as conn:
             c = conn.cursor()
             c.execute('DELETE FROM events WHERE event_id = ?', (event_id,))
-            conn.commit()
+
+    def add_events(self, events) -> List[int]:
+        """
+        Insert many events in one transaction.
+        
+        :param events: ``(title, date, time, channel_id, creator_id)`` tuples
+        :return: New event IDs in input order
+        """
+        with self.storage.write() as conn:
+            return [
+                conn.execute('''INSERT INTO events (title, date, time, channel_id, creator_id)
+                    VALUES (?, ?, ?, ?, ?)''', tuple(event)).lastrowid
+                for event in events
+            ]
+
+    def remove_events(self, event_ids) -> int:
+        """
+        :param event_ids: Event IDs to delete
+        :return: Number of deleted events
+        """
+        with self.storage.write() as conn:
+            return conn.executemany('DELETE FROM events WHERE event_id = ?',
+                                    [(event_id,) for event_id in event_ids]).rowcount
 
     def add_autorole(self, guild_id, role_id):
-        with self.conn as conn:
+        with self.storage.write() as conn:
             c = conn.cursor()
             c.execute('INSERT OR IGNORE INTO autoroles (guild_id, role_id) VALUES (?, ?)',
                      (str(guild_id), str(role_id)))
-            conn.commit()
 
     def remove_autorole(self, guild_id, role_id):
-        with self.conn as conn:
+        with self.storage.write() as conn:
             c = conn.cursor()
             c.execute('DELETE FROM autoroles WHERE guild_id = ? AND role_id = ?',
                      (str(guild_id), str(role_id)))
-            conn.commit()
 
     def get_autoroles(self, guild_id):
-        with self.conn as conn:
+        with self.storage.read() as conn:
             c = conn.cursor()
             c.execute('SELECT role_id FROM autoroles WHERE guild_id = ?', (str(guild_id),))
             return [row[0] for row in c.fetchall()]
 
+    def add_autoroles(self, pairs) -> int:
+        """
+        :param pairs: ``(guild_id, role_id)`` tuples
+        :return: Number of newly added autoroles
+        """
+        with self.storage.write() as conn:
+            return conn.executemany('INSERT OR IGNORE INTO autoroles (guild_id, role_id) VALUES (?, ?)',
+                                    [(str(guild_id), str(role_id)) for guild_id, role_id in pairs]).rowcount
+
+    def remove_autoroles(self, pairs) -> int:
+        """
+        :param pairs: ``(guild_id, role_id)`` tuples
+        :return: Number of removed autoroles
+        """
+        with self.storage.write() as conn:
+            return conn.executemany('DELETE FROM autoroles WHERE guild_id = ? AND role_id = ?',
+                                    [(str(guild_id), str(role_id)) for guild_id, role_id in pairs]).rowcount
+
+    def get_all_autoroles(self, guild_ids=None) -> Dict[str, List[str]]:
+        """
+        Autoroles of many guilds in one round trip (e.g. for the periodic sweep).
+        
+        :param guild_ids: Guild IDs, or ``None`` for every guild
+        :return: Guild ID (str) -> role IDs
+        """
+        result: Dict[str, List[str]] = {}
+        with self.storage.read() as conn:
+            if guild_ids is None:
+                rows = conn.execute('SELECT guild_id, role_id FROM autoroles').fetchall()
+            else:
+                rows = []
+                for chunk in _chunks([str(guild_id) for guild_id in guild_ids]):
+                    placeholders = ", ".join("?" * len(chunk))
+                    rows += conn.execute(
+                        f'SELECT guild_id, role_id FROM autoroles WHERE guild_id IN ({placeholders})', chunk
+                    ).fetchall()
+        for guild_id, role_id in rows:
+            result.setdefault(guild_id, []).append(role_id)
+        return result
+
     def set_config(self, guild_id, key, value):
-        with self.conn as conn:
+        with self.storage.write() as conn:
             c = conn.cursor()
             c.execute('''INSERT OR REPLACE INTO config (guild_id, key, value)
                 VALUES (?, ?, ?)''', (str(guild_id), key, json.dumps(value)))
-            conn.commit()
+
+    def get_guild_config(self, guild_id) -> Dict[str, Any]:
+        """
+        Load every config key of a guild in one query.
+        
+        :param guild_id: Discord guild ID
+        :return: Key -> decoded value
+        """
+        with self.storage.read() as conn:
+            rows = conn.execute('SELECT key, value FROM config WHERE guild_id = ?',
+                                (str(guild_id),)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
 
     def get_config(self, guild_id, key, default=None):
-        with self.conn as conn:
+        with self.storage.read() as conn:
             c = conn.cursor()
             c.execute('SELECT value FROM config WHERE guild_id = ? AND key = ?',
                      (str(guild_id), key))
             result = c.fetchone()
             return json.loads(result[0]) if result else default
 
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["CompatConnection"]:
+        """
+        asyncpg-style connection for code written against Postgres.
+
+        Supports ``fetch``, ``fetchrow``, ``fetchval``, ``execute`` and
+        ``executemany`` with ``$n`` placeholders; statements run on the
+        database thread using the storage engine's pooled connections.
+        """
+        yield CompatConnection(self)
+
     def close(self):
         """Close database connection"""
-        self.conn.close()
+        self.aio.close()
+        self.storage.close()
         self.logger.info("Database connection closed.")
 
+class AsyncDatabaseManager:
+    def __init__(self, manager: DatabaseManager):
+        """
+        Non-blocking facade over :class:`DatabaseManager`.
+
+        Every public method of the manager is available as a coroutine, e.g.
+        ``await db.aio.get_profile(user_id)``. Calls are queued to a single
+        dedicated thread, so disk I/O and commits never run on the event loop
+        and calls still execute in submission order.
+
+        :param manager: Synchronous database manager
+        """
+        self.manager = manager
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._methods: Dict[str, Callable[..., Any]] = {}
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._worker, name="database", daemon=True)
+                    self._thread.start()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            func, args, kwargs, future, loop = item
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                loop.call_soon_threadsafe(self._resolve, future, None, e)
+            else:
+                loop.call_soon_threadsafe(self._resolve, future, result, None)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> "asyncio.Future":
+        """
+        Run any callable on the database thread.
+
+        :param func: Callable using the database
+        :return: Future resolved with the callable's result
+        """
+        self._ensure_thread()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((func, args, kwargs, future, loop))
+        return future
+
+    def pending(self) -> int:
+        """Number of queued calls not yet started."""
+        return self._queue.qsize()
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is None:
+            target = getattr(self.manager, name)
+            if not callable(target):
+                raise AttributeError(name)
+
+            async def method(*args, **kwargs):
+                return await self.run(target, *args, **kwargs)
+
+            method.__name__ = name
+            method.__doc__ = target.__doc__
+            self._methods[name] = method
+        return method
+
+    def close(self) -> None:
+        """Finish queued calls and stop the database thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+_PG_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_PG_PARAM = re.compile(r'\$(\d+)')
+_PG_NOW = re.compile(r'\bNOW\(\)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=512)
+def translate_pg_sql(sql: str) -> str:
+    """
+    Translate Postgres-flavoured SQL to SQLite (cached per statement).
+
+    ``$n`` becomes ``?n`` (so repeated parameters keep working) and ``NOW()``
+    becomes ``CURRENT_TIMESTAMP``; string literals are left alone.
+    ``ON CONFLICT ... DO UPDATE`` and ``RETURNING`` are native in SQLite 3.35+.
+
+    :param sql: Postgres SQL
+    :return: SQLite SQL
+    """
+    parts = _PG_LITERAL.split(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = _PG_NOW.sub('CURRENT_TIMESTAMP', _PG_PARAM.sub(r'?\1', parts[i]))
+    return ''.join(parts)
+
+
+def _is_read_only(sql: str) -> bool:
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return head == 'SELECT' and 'RETURNING' not in sql.upper()
+
+
+class CompatConnection:
+    def __init__(self, manager: DatabaseManager):
+        """
+        Subset of the asyncpg connection API on top of the storage engine.
+
+        Reads use a pooled read connection, writes the writer connection;
+        each statement commits on its own like asyncpg outside a transaction.
+        Rows are :class:`sqlite3.Row`, which supports ``row['column']`` and
+        ``row[0]`` like an asyncpg ``Record``.
+
+        :param manager: Database manager
+        """
+        self.manager = manager
+
+    def _run(self, sql: str, args: Sequence[Any], many: bool = False):
+        sql = translate_pg_sql(sql)
+        storage = self.manager.storage
+        context = storage.read() if not many and _is_read_only(sql) else storage.write()
+        with context as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            if many:
+                cursor.executemany(sql, args)
+            else:
+                cursor.execute(sql, args)
+            return cursor.fetchall(), cursor.rowcount
+
+    async def fetch(self, sql: str, *args) -> List[sqlite3.Row]:
+        rows, _ = await self.manager.aio.run(self._run, sql, args)
+        return rows
+
+    async def fetchrow(self, sql: str, *args) -> Optional[sqlite3.Row]:
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql: str, *args, column: int = 0) -> Any:
+        row = await self.fetchrow(sql, *args)
+        return row[column] if row is not None else None
+
+    async def execute(self, sql: str, *args) -> str:
+        """
+        :return: Status string such as ``"UPDATE 1"``
+        """
+        _, rowcount = await self.manager.aio.run(self._run, sql, args)
+        verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+        return f"{verb} {max(rowcount, 0)}"
+
+    async def executemany(self, sql: str, args: Sequence[Sequence[Any]]) -> None:
+        await self.manager.aio.run(self._run, sql, args, True)
+
+def _chunks(values: Sequence[Any], size: int = 500):
+    # SQLite'ın bağlı parametre sınırının altında kal
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
 # Singleton pattern to ensure only one database instance
 _database_instance = None
 
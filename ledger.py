@@ -0,0 +1,367 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from storage import StorageEngine, Transaction, get_storage
+
+# Sistem hesapları; bakiyeleri negatif olabilir
+MINT = 'system:mint'  # Ödüller, günlük coinler, kazançlar
+SINK = 'system:sink'  # Harcamalar, kaybedilen bahisler
+OPENING = 'system:opening'  # Eski bakiye tablolarından devralınan açılış bakiyeleri
+
+Leg = Tuple[str, int]
+
+
+def wallet(user_id) -> str:
+    """:return: Ledger account of a user's wallet"""
+    return f"wallet:{int(user_id)}"
+
+
+def bank(user_id) -> str:
+    """:return: Ledger account of a user's bank balance"""
+    return f"bank:{int(user_id)}"
+
+
+class InsufficientFunds(Exception):
+    def __init__(self, account: str, balance: int, amount: int):
+        super().__init__(f"{account}: bakiye {balance}, gereken {amount}")
+        self.account = account
+        self.balance = balance
+        self.amount = amount
+
+
+class LedgerTransaction:
+    def __init__(self, ledger: "Ledger", tx: Transaction):
+        """
+        One database transaction that may post several ledger transactions
+        and run other statements (``tx``) atomically with them.
+
+        :param ledger: Owning ledger
+        :param tx: Storage transaction on the writer connection
+        """
+        self.ledger = ledger
+        self.tx = tx
+        self.deltas: Dict[str, int] = {}
+
+    def post(self, legs: Iterable[Leg], kind: str, memo: Optional[str] = None,
+             require: Sequence[str] = ()) -> Optional[int]:
+        """
+        Record one balanced multi-leg transaction.
+
+        :param legs: ``(account, amount)`` pairs summing to zero
+        :param kind: Short reason, e.g. ``daily`` or ``shop``
+        :param memo: Free-form detail
+        :param require: Accounts that must not end up negative
+        :return: Transaction ID, or ``None`` if every leg was zero
+        :raises ValueError: If the legs do not sum to zero
+        :raises InsufficientFunds: If a required account would go negative
+            (the whole database transaction is rolled back)
+        """
+        folded: Dict[str, int] = {}
+        for account, amount in legs:
+            folded[account] = folded.get(account, 0) + int(amount)
+        if sum(folded.values()) != 0:
+            raise ValueError(f"Dengesiz işlem ({kind}): {folded}")
+        rows = [(account, amount) for account, amount in folded.items() if amount]
+        if not rows:
+            return None
+
+        txn_id = self.tx.execute('INSERT INTO {ledger_transactions} (kind, memo) VALUES (?, ?)',
+                                 (kind, memo)).lastrowid
+        # Bakiyeler {ledger_entries} tetikleyicisiyle aynı işlemde güncellenir
+        self.tx.executemany('INSERT INTO {ledger_entries} (transaction_id, account, amount) VALUES (?, ?, ?)',
+                            [(txn_id, account, amount) for account, amount in rows])
+        for account in require:
+            row = self.tx.fetchone('SELECT balance FROM {ledger_balances} WHERE account = ?', (account,))
+            balance = row[0] if row else 0
+            if balance < 0:
+                raise InsufficientFunds(account, balance - folded.get(account, 0), -folded.get(account, 0))
+
+        for account, amount in rows:
+            self.deltas[account] = self.deltas.get(account, 0) + amount
+        return txn_id
+
+
+class Ledger:
+    def __init__(self, storage: StorageEngine, namespace: str = "", cache_size: int = 50000,
+                 flush_interval: float = 2.0, max_pending: int = 500):
+        """
+        Append-only double-entry coin ledger.
+
+        Every balance change is a transaction whose entries (legs) sum to
+        zero; coins enter through :data:`MINT` and leave through
+        :data:`SINK`. ``{ledger_balances}`` holds the materialized balance
+        of each account and is maintained by a trigger in the same
+        transaction as the entries (see migrations.py), so a balance read is
+        one primary-key lookup, usually served from an in-memory cache.
+
+        Frequent small rewards can be queued with :meth:`defer_credit`; they
+        are written together in one transaction every ``flush_interval``
+        seconds, or with the next posted transaction, whichever comes first.
+
+        :param storage: Storage engine
+        :param namespace: Namespace owning the ledger tables
+        :param cache_size: Balances kept in memory (0 disables the cache)
+        :param flush_interval: Maximum seconds a deferred credit waits
+        :param max_pending: Deferred credits that trigger an early flush
+        """
+        self.storage = storage
+        self.namespace = storage.namespace(namespace)
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._balances: "OrderedDict[str, int]" = OrderedDict()
+        self._writes = 0  # Tek sayı: bir yazım sürüyor
+        # (hesap, tür) -> bekleyen tutar; hesap -> toplam
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self._pending_totals: Dict[str, int] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.transactions = 0
+        self.flushes = 0
+
+    # ------ Okuma ------
+
+    def balance(self, account: str) -> int:
+        """
+        :param account: Ledger account, e.g. ``wallet(user_id)``
+        :return: Balance including deferred credits
+        """
+        return self.balances([account])[account]
+
+    def balances(self, accounts: Iterable[str]) -> Dict[str, int]:
+        """
+        :param accounts: Ledger accounts
+        :return: Account -> balance including deferred credits
+        """
+        accounts = list(dict.fromkeys(accounts))
+        result: Dict[str, int] = {}
+        missing = []
+        with self._lock:
+            for account in accounts:
+                balance = self._balances.get(account)
+                if balance is None:
+                    missing.append(account)
+                else:
+                    self._balances.move_to_end(account)
+                    result[account] = balance
+            writes = self._writes
+
+        if missing:
+            loaded = dict.fromkeys(missing, 0)
+            with self.storage.read() as conn:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    placeholders = ", ".join("?" * len(chunk))
+                    loaded.update(conn.execute(
+                        self.namespace.sql(f'SELECT account, balance FROM {{ledger_balances}} '
+                                           f'WHERE account IN ({placeholders})'), chunk
+                    ).fetchall())
+            with self._lock:
+                # Okurken yazım sürdüyse veya bittiyse değerler eskimiş olabilir; önbelleğe alma
+                if writes == self._writes and not writes % 2:
+                    for account, balance in loaded.items():
+                        self._cache(account, balance)
+            result.update(loaded)
+
+        with self._lock:
+            for account in accounts:
+                result[account] += self._pending_totals.get(account, 0)
+        return result
+
+    def history(self, account: str, limit: int = 10) -> List[Tuple[int, int, str, Optional[str], str]]:
+        """
+        :param account: Ledger account
+        :param limit: Maximum entries
+        :return: ``(transaction_id, amount, kind, memo, created_at)`` rows, newest first
+        """
+        return self.namespace.fetchall('''
+            SELECT e.transaction_id, e.amount, t.kind, t.memo, t.created_at
+            FROM {ledger_entries} e JOIN {ledger_transactions} t ON t.id = e.transaction_id
+            WHERE e.account = ? ORDER BY e.id DESC LIMIT ?
+        ''', (account, limit))
+
+    def _cache(self, account: str, balance: int):
+        # _lock tutulurken çağrılır
+        if self.cache_size <= 0:
+            return
+        self._balances[account] = balance
+        self._balances.move_to_end(account)
+        while len(self._balances) > self.cache_size:
+            self._balances.popitem(last=False)
+
+    # ------ Yazma ------
+
+    @contextmanager
+    def transaction(self) -> Iterator[LedgerTransaction]:
+        """
+        Post transfers atomically with other writes, e.g.::
+
+            with ledger.transaction() as ltx:
+                ltx.post([(wallet(user_id), -price), (SINK, price)], 'shop', require=[wallet(user_id)])
+                ltx.tx.execute('INSERT INTO {inventory} ...', ...)
+
+        Deferred credits are written in the same transaction. Cached
+        balances are updated only after the commit.
+        """
+        # Yazıcı kilidi önbellek güncellemesi bitene kadar tutulur; işlemler sırayla uygulanır
+        with self.storage.write():
+            with self._lock:
+                # İşlem sürerken okunan bakiyeler önbelleğe alınmaz
+                self._writes += 1
+                # Toplamlar commit'e kadar bakiyelerde görünmeye devam eder
+                pending, self._pending = self._pending, {}
+            try:
+                with self.namespace.transaction() as tx:
+                    ltx = LedgerTransaction(self, tx)
+                    self._post_pending(ltx, pending)
+                    yield ltx
+            except BaseException:
+                with self._lock:
+                    self._writes += 1
+                    # Yazılamayan ertelenmiş ödülleri geri koy
+                    for key, amount in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                raise
+
+            with self._lock:
+                self._writes += 1
+                for account, delta in ltx.deltas.items():
+                    if account in self._balances:
+                        self._balances[account] += delta
+                for (account, _), amount in pending.items():
+                    left = self._pending_totals[account] - amount
+                    if left:
+                        self._pending_totals[account] = left
+                    else:
+                        del self._pending_totals[account]
+        self.transactions += 1
+        if pending:
+            self.flushes += 1
+
+    @staticmethod
+    def _post_pending(ltx: LedgerTransaction, pending: Dict[Tuple[str, str], int]):
+        by_kind: Dict[str, List[Leg]] = {}
+        for (account, kind), amount in pending.items():
+            by_kind.setdefault(kind, []).append((account, amount))
+        for kind, legs in by_kind.items():
+            ltx.post(legs + [(MINT, -sum(amount for _, amount in legs))], kind, memo="toplu")
+
+    def post(self, legs: Iterable[Leg], kind: str, memo: Optional[str] = None,
+             require: Sequence[str] = ()) -> Optional[int]:
+        """
+        Record one balanced transaction in its own database transaction.
+
+        See :meth:`LedgerTransaction.post` for the parameters.
+        """
+        with self.transaction() as ltx:
+            return ltx.post(legs, kind, memo, require)
+
+    def transfer(self, source: str, target: str, amount: int, kind: str,
+                 memo: Optional[str] = None, allow_overdraft: bool = False) -> Optional[int]:
+        """
+        :param source: Account to debit
+        :param target: Account to credit
+        :param amount: Positive amount
+        :param kind: Short reason
+        :param memo: Free-form detail
+        :param allow_overdraft: Let ``source`` go negative
+        :return: Transaction ID
+        :raises InsufficientFunds: If ``source`` cannot cover ``amount``
+        """
+        if amount < 0:
+            raise ValueError("Tutar negatif olamaz")
+        return self.post([(source, -amount), (target, amount)], kind, memo,
+                         require=() if allow_overdraft else (source,))
+
+    def credit(self, account: str, amount: int, kind: str, memo: Optional[str] = None) -> Optional[int]:
+        """Pay ``amount`` from :data:`MINT` to ``account`` right away."""
+        return self.transfer(MINT, account, amount, kind, memo, allow_overdraft=True)
+
+    def debit(self, account: str, amount: int, kind: str, memo: Optional[str] = None) -> Optional[int]:
+        """
+        Move ``amount`` from ``account`` to :data:`SINK`.
+
+        :raises InsufficientFunds: If the account cannot cover ``amount``
+        """
+        return self.transfer(account, SINK, amount, kind, memo)
+
+    def defer_credit(self, account: str, amount: int, kind: str) -> None:
+        """
+        Queue a reward from :data:`MINT` without waiting for a commit.
+
+        The amount is visible through :meth:`balance` immediately and is
+        written with the next flush. Safe to call from the event loop.
+
+        :param account: Account to credit
+        :param amount: Positive amount
+        :param kind: Short reason; credits of one kind share a ledger transaction
+        """
+        if amount < 0:
+            raise ValueError("Tutar negatif olamaz")
+        if not amount:
+            return
+        with self._lock:
+            key = (account, kind)
+            self._pending[key] = self._pending.get(key, 0) + amount
+            self._pending_totals[account] = self._pending_totals.get(account, 0) + amount
+            pending = len(self._pending)
+        self._schedule_flush(0 if pending >= self.max_pending else self.flush_interval)
+
+    def pending(self) -> int:
+        """Number of deferred ``(account, kind)`` credits not yet written."""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every deferred credit in one transaction.
+
+        :return: Number of ``(account, kind)`` credits written
+        """
+        with self._lock:
+            count = len(self._pending)
+        if count:
+            with self.transaction():
+                pass
+        return count
+
+    def _schedule_flush(self, delay: float):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Olay döngüsü dışında (ör. veritabanı iş parçacığı): hemen yaz
+            self.flush()
+            return
+        if self._flush_handle is not None:
+            if delay > 0:
+                return
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, lambda: loop.create_task(self._flush_later()))
+
+    async def _flush_later(self):
+        self._flush_handle = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            self.logger.error(f"Ertelenmiş coin ödülleri yazılamadı: {e}")
+
+
+def get_ledger(storage: Optional[StorageEngine] = None) -> Ledger:
+    """
+    Get or create the coin ledger of a storage engine.
+
+    :param storage: Storage engine (defaults to the shared engine)
+    :return: Ledger instance
+    """
+    storage = storage or get_storage()
+    ledger: Optional[Ledger] = getattr(storage, 'ledger', None)
+    if ledger is None:
+        ledger = Ledger(storage)
+        storage.ledger = ledger
+    return ledger
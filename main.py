@@ -13,9 +13,18 @@ import logging
 from typing import Optional, Literal
 import sys
 from database import DatabaseManager, get_database
+from ledger import InsufficientFunds
+from utils.message_pipeline import MessageContext, STAGE_XP, get_message_pipeline
+from utils.rate_limit import RateLimiter
+from utils.raid_state import RaidStates
+from utils.level_table import LINEAR_LEVELS
+from utils.announcer import get_announcer
+from utils.guild_config import get_guild_config
+from utils.xp_accumulator import ProfileAccumulator
+from utils.user_locks import get_user_locks
+from utils.json_store import get_json_store, write_json_atomic
 import math
 import uuid
-from collections import defaultdict, deque
 import traceback
 import httpx
 import pathlib
@@ -56,8 +65,7 @@ DATA_FILES = {
 def ensure_data_files():
     for filename, default_data in DATA_FILES.items():
         if not os.path.exists(filename):
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(default_data, f, ensure_ascii=False, indent=4)
+            write_json_atomic(filename, json.dumps(default_data, ensure_ascii=False, indent=4))
 
 ensure_data_files()
 
@@ -95,21 +103,24 @@ async def send_embed(interaction: discord.Interaction, title: str, description:
     await interaction.response.send_message(embed=embed)
 
 def load_json(filename: str) -> dict:
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return DATA_FILES.get(filename, {})
+    # Dosya bir kez okunur; sonraki çağrılar bellekteki aynı nesneyi döndürür
+    return get_json_store().load(filename, DATA_FILES.get(filename, {}), indent=4)
 
 def save_json(filename: str, data: dict):
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    # Değişiklikler biriktirilip atomik olarak, olay döngüsü dışında yazılır
+    get_json_store().save(filename, data, indent=4)
 
 # Veri tabanı yöneticisini ekle
 from database import get_database
 
 # Veritabanını bot örneğine ekle
 bot.db = get_database()
+bot.message_pipeline = get_message_pipeline(bot)
+# Sunucu ayarları bir kez yüklenir ve bellekte tutulur
+bot.guild_config = get_guild_config(bot)
+
+# systems/ modülleri load_extension ile yüklenmez; teardown için izlenir
+loaded_systems = {}
 
 # Update cog blacklist in load_extensions function
 async def load_extensions():
@@ -132,6 +143,7 @@ async def load_extensions():
                     module = importlib.import_module(f'systems.{filename[:-3]}')
                     if hasattr(module, 'setup'):
                         await module.setup(bot)
+                        loaded_systems[module.__name__] = module
                         print(f'Loaded system: {filename[:-3]}')
                 except ModuleNotFoundError as e:
                     print(f'Module import error for {filename}: {e}')
@@ -142,6 +154,15 @@ async def load_extensions():
             except Exception as e:
                 print(f'Failed to load system {filename[:-3]}: {e}')
 
+async def unload_systems():
+    for name, module in reversed(list(loaded_systems.items())):
+        if hasattr(module, 'teardown'):
+            try:
+                await module.teardown(bot)
+            except Exception as e:
+                print(f'Failed to unload system {name}: {e}')
+    loaded_systems.clear()
+
 # Bot hazır olduğunda
 @bot.event
 async def on_ready():
@@ -221,9 +242,9 @@ async def on_member_join(member):
 
     # Otomatik rol verme
     try:
-        config = load_json('config.json')
-        if 'autorole' in config and config['autorole']:
-            role = member.guild.get_role(config['autorole'])
+        autorole = await get_guild_config(bot).get(member.guild.id, 'autorole')
+        if autorole:
+            role = member.guild.get_role(autorole)
             if role:
                 await member.add_roles(role)
     except Exception as e:
@@ -235,7 +256,6 @@ class Automation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.events_file = "events.json"
-        self.config_file = "config.json"
         self.events = load_json(self.events_file)
         self.check_events.start()
         self.check_autoroles.start()
@@ -355,9 +375,9 @@ class Automation(commands.Cog):
 
         # Otomatik rol verme
         try:
-            config = load_json(self.config_file)
-            if 'autorole' in config and config['autorole']:
-                role = member.guild.get_role(config['autorole'])
+            autorole = await get_guild_config(self.bot).get(member.guild.id, 'autorole')
+            if autorole:
+                role = member.guild.get_role(autorole)
                 if role:
                     await member.add_roles(role)
         except Exception as e:
@@ -380,9 +400,7 @@ class Automation(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def otorol(self, interaction: discord.Interaction, role: discord.Role):
         """Yeni üyeler için otomatik rol ayarla"""
-        config = load_json(self.config_file)
-        config["autorole"] = role.id
-        save_json(self.config_file, config)
+        await get_guild_config(self.bot).set(interaction.guild.id, 'autorole', role.id)
         await send_embed(interaction, "✅ Başarılı", f"Otomatik rol {role.name} olarak ayarlandı!", color=discord.Color.green())
 
     @app_commands.command(name="otomesaj", description="Belirli bir kanala otomatik mesaj ayarlar")
@@ -395,10 +413,10 @@ class Automation(commands.Cog):
             await send_embed(interaction, "❌ Hata", f"'{kanal_adı}' adlı kanal bulunamadı!", color=discord.Color.red())
             return
 
-        config = load_json(self.config_file)
-        config['auto_messages'] = config.get('auto_messages', {})
-        config['auto_messages'][str(channel.id)] = mesaj
-        save_json(self.config_file, config)
+        guild_config = get_guild_config(self.bot)
+        auto_messages = await guild_config.get(interaction.guild.id, 'auto_messages')
+        auto_messages[str(channel.id)] = mesaj
+        await guild_config.set(interaction.guild.id, 'auto_messages', auto_messages)
         await send_embed(interaction, "✅ Başarılı", f"{channel.mention} kanalına otomatik mesaj ayarlandı!", color=discord.Color.green())
 
     @app_commands.command(name="autorole_ekle", description="Otomatik verilecek rol ekler")
@@ -790,21 +808,27 @@ class Profile(commands.Cog):
             "altın_rozet": {"fiyat": 5000, "tip": "rozet", "emoji": "🥇"},
             "vip_rozet": {"fiyat": 10000, "tip": "rozet", "emoji": "👑"}
         }
+        # Mesaj ödülleri bellekte toplanır ve toplu halde yazılır
+        self.accumulator = ProfileAccumulator(self.db)
+        # Aynı kullanıcının eşzamanlı bakiye işlemleri sıraya girer
+        self.user_locks = get_user_locks(bot)
 
-    def get_profile(self, user_id):
-        return self.db.get_profile(str(user_id))
+    async def get_profile(self, user_id):
+        return await self.accumulator.get(user_id)
 
     async def update_profile(self, user_id, data):
-        self.db.update_profile(str(user_id), data)
+        await self.accumulator.store(user_id, data)
 
     @app_commands.command(name="profil", description="Kullanıcı profilini göster")
     @app_commands.describe(member="Profilini görüntülemek istediğiniz kullanıcı")
     async def profil(self, interaction: discord.Interaction, member: discord.Member = None):
         """Kullanıcı profilini göster"""
         member = member or interaction.user
-        profile = self.get_profile(member.id)
+        profile = await self.get_profile(member.id)
+        # Bakiye defterden; henüz yazılmamış mesaj ödülleri eklenir
+        coins = await self.db.aio.coin_balance(member.id) + self.accumulator.pending_coins(member.id)
         
-        next_level_xp = profile["level"] * 100
+        next_level_xp = LINEAR_LEVELS.cost(profile["level"])
         progress = (profile["xp"] / next_level_xp) * 100
         progress_bar = "▰" * int(progress/10) + "▱" * (10-int(progress/10))
         
@@ -816,7 +840,7 @@ class Profile(commands.Cog):
                 f"Seviye: {profile['level']}\nXP: {profile['xp']}/{next_level_xp}\n{progress_bar}",
                 False
              ),
-            ("💰 Ekonomi", f"Coin: {profile['coins']}", True),
+            ("💰 Ekonomi", f"Coin: {coins}", True),
             ("🏅 Rozetler", badges, True),
             ("📝 Biyografi", profile["bio"], False)
         ]
@@ -826,17 +850,17 @@ class Profile(commands.Cog):
     @app_commands.command(name="gunluk", description="Günlük coin ödülü al")
     async def günlük(self, interaction: discord.Interaction):
         """Günlük coin ödülü al"""
-        profile = self.get_profile(interaction.user.id)
-        last_daily = profile["daily_last"]
+        coins = random.randint(100, 500)
+        today = datetime.datetime.utcnow().strftime("%Y-%m-%d")
+        async with self.user_locks.hold(interaction.user.id):
+            profile = await self.get_profile(interaction.user.id)
+            claimed = profile["daily_last"] != today and await self.db.aio.claim_daily(interaction.user.id, coins, today)
+            if claimed:
+                self.accumulator.patch(interaction.user.id, daily_last=today)
         
-        if last_daily and datetime.datetime.utcnow().strftime("%Y-%m-%d") == last_daily:
+        if not claimed:
             await send_embed(interaction, "❌ Hata", "Bugünkü ödülünü zaten aldın!", color=discord.Color.red())
             return
-            
-        coins = random.randint(100, 500)
-        profile["coins"] += coins
-        profile["daily_last"] = datetime.datetime.utcnow().strftime("%Y-%m-%d")
-        self.update_profile(interaction.user.id, profile)
         
         await interaction.response.send_message(f"💰 Günlük ödülün: {coins} coin!")
 
@@ -857,61 +881,64 @@ class Profile(commands.Cog):
              await send_embed(interaction, "❌ Hata", "Böyle bir ürün bulunamadı!", color=discord.Color.red())
              return
             
-        profile = self.get_profile(interaction.user.id)
         item = self.shop_items[item_id]
         
-        if profile["coins"] < item["fiyat"]:
+        async with self.user_locks.hold(interaction.user.id):
+            profile = await self.get_profile(interaction.user.id)
+            bought = False
+            if item_id not in profile["badges"]:
+                # Bekleyen mesaj ödülleri de harcanabilsin
+                await self.accumulator.flush()
+                try:
+                    bought = await self.db.aio.buy_badge(interaction.user.id, item_id, item["fiyat"])
+                except InsufficientFunds:
+                    bought = None
+            if bought:
+                self.accumulator.patch(interaction.user.id, badges=profile["badges"] + [item_id])
+        
+        if bought is None:
              await send_embed(interaction, "❌ Hata", "Yeterli coinin yok!", color=discord.Color.red())
              return
-            
-        if item_id in profile["badges"]:
+        if not bought:
              await send_embed(interaction, "❌ Hata", "Bu rozete zaten sahipsin!", color=discord.Color.red())
              return
-            
-        profile["coins"] -= item["fiyat"]
-        profile["badges"].append(item_id)
-        self.update_profile(interaction.user.id, profile)
         
         await interaction.response.send_message(f"✅ {item['emoji']} {item_id} rozetini satın aldın!")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        get_message_pipeline(self.bot).register("profile.xp", STAGE_XP, self.award_message_xp, run_in_dms=True)
+        self.accumulator.start()
 
-        profile = self.get_profile(message.author.id)
-        
-        # XP kazanma
+    async def cog_unload(self):
+        get_message_pipeline(self.bot).unregister("profile.xp")
+        await self.accumulator.close()
+        await get_announcer(self.bot).flush()
+
+    async def award_message_xp(self, ctx: MessageContext):
+        message = ctx.message
+
+        # XP ve coin kazanma
         xp_gain = random.randint(5, 15)
-        profile["xp"] += xp_gain
-        
-        # Coin kazanma
         coin_gain = random.randint(1, 5)
-        profile["coins"] += coin_gain
+        profile = await self.accumulator.add(ctx.author_id, xp=xp_gain, coins=coin_gain)
         
         # Seviye atlama kontrolü
-        level_up = False
-        while profile["xp"] >= profile["level"] * 100:
-            profile["xp"] -= profile["level"] * 100
-            profile["level"] += 1
-            level_up = True
+        old_level = profile["level"]
+        profile["level"], profile["xp"] = LINEAR_LEVELS.advance(old_level, profile["xp"])
+        level_up = profile["level"] > old_level
         
-        self.update_profile(message.author.id, profile)
+        await self.accumulator.flush_if_needed()
         
         if level_up:
-            embed = discord.Embed(
-                title="🎉 Seviye Atlama!",
-                description=f"{message.author.mention} seviye atladı!\nYeni seviye: {profile['level']}",
-                color=discord.Color.green()
-            )
-            await message.channel.send(embed=embed)
+            get_announcer(self.bot).announce(message.channel, message.author, f"Yeni seviye: **{profile['level']}**")
 
 # Sophisticated command groups
 class EconomyCommands(commands.GroupCog, name="ekonomi"):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.transaction_cooldowns = commands.CooldownMapping.from_cooldown(1, 30, commands.BucketType.user)
+        self.transaction_cooldowns = RateLimiter(rate=1, per=30)  # Kullanıcı başına 30 saniyede 1 işlem
+        self.user_locks = get_user_locks(bot)
         self.market_items = {
             "investment_bond": {"name": "Yatırım Bonosu", "price": 5000, "risk": 0.2, "return_rate": 1.5},
             "stock_share": {"name": "Hisse Senedi", "price": 2500, "risk": 0.4, "return_rate": 2.0},
@@ -964,27 +991,22 @@ class EconomyCommands(commands.GroupCog, name="ekonomi"):
             await interaction.response.send_message("❌ Minimum yatırım miktarı 1000 coindir!", ephemeral=True)
             return
 
-        async with self.db.connection() as conn:
-            user_balance = await conn.fetchval(
-                "SELECT balance FROM economy WHERE user_id = $1",
-                interaction.user.id
+        cooldown = self.transaction_cooldowns.hit(interaction.user.id)
+        if not cooldown.allowed:
+            await interaction.response.send_message(
+                f"⏳ Yeni bir işlem için {cooldown.retry_after:.0f} saniye bekleyin!", ephemeral=True
             )
+            return
 
-            if not user_balance or user_balance < miktar:
-                await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
-                return
-
-            # Karmaşık yatırım işlemi
-            investment_id = await conn.fetchval("""
-                INSERT INTO investments (user_id, type, amount, initial_amount, timestamp)
-                VALUES ($1, $2, $3, $3, NOW())
-                RETURNING id
-            """, interaction.user.id, yatirim_tipi, miktar)
-
-            await conn.execute(
-                "UPDATE economy SET balance = balance - $1 WHERE user_id = $2",
-                miktar, interaction.user.id
-            )
+        # Bakiye kontrolü, düşüm ve yatırım kaydı tek işlemde
+        try:
+            async with self.user_locks.hold(interaction.user.id):
+                investment_id = await self.db.aio.open_investment(interaction.user.id, yatirim_tipi, miktar)
+        except InsufficientFunds:
+            # Başarısız yatırım bekleme süresini harcamaz
+            self.transaction_cooldowns.reset(interaction.user.id)
+            await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
+            return
 
         embed = discord.Embed(
             title="🎯 Yatırım Başarılı",
@@ -1008,24 +1030,43 @@ class EconomyCommands(commands.GroupCog, name="ekonomi"):
         await interaction.response.send_message(embed=embed)
 
 class BlackjackGameView(discord.ui.View):
-    def __init__(self, bot, game_id):
+    def __init__(self, bot, game_id, games):
         super().__init__(timeout=180)
         self.bot = bot
         self.game_id = game_id
+        # Cog adı "oyunlar" olduğundan get_cog('GamesCommands') yerine doğrudan referans
+        self.games = games
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        game = self.games.active_games.get(self.game_id)
+        if game is None or game["player"] != interaction.user.id:
+            await interaction.response.send_message("❌ Bu oyun size ait değil veya bitti!", ephemeral=True)
+            return False
+        return True
 
     @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary)
     async def hit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        game = self.bot.get_cog('GamesCommands').active_games[self.game_id]
-        deck = self.bot.get_cog('GamesCommands').create_deck()
-        game["player_cards"].append(deck.pop())
+        game = self.games.active_games[self.game_id]
+        game["player_cards"].append(game["deck"].pop())
+        if self.games.hand_value(game["player_cards"]) > 21:
+            # Bust: bahis başta düşüldü, ödeme yok
+            await self.games.settle_blackjack(self.game_id)
+            self.stop()
+            await interaction.response.edit_message(embed=self.create_game_embed(game), view=None)
+            return
         await interaction.response.edit_message(embed=self.create_game_embed(game))
 
     @discord.ui.button(label="Stand", style=discord.ButtonStyle.secondary)
     async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        game = self.bot.get_cog('GamesCommands').active_games[self.game_id]
-        game["status"] = "finished"
+        game = self.games.active_games[self.game_id]
+        await self.games.settle_blackjack(self.game_id)
+        self.stop()
         await interaction.response.edit_message(embed=self.create_game_embed(game), view=None)
 
+    async def on_timeout(self):
+        # Terk edilen oyunda bahis iade edilir
+        await self.games.settle_blackjack(self.game_id, refund=True)
+
     def create_game_embed(self, game):
         embed = discord.Embed(
             title="🎰 Blackjack",
@@ -1034,13 +1075,15 @@ class BlackjackGameView(discord.ui.View):
         )
         embed.add_field(
             name="Sizin Kartlarınız",
-            value=self.bot.get_cog('GamesCommands').format_cards(game["player_cards"])
+            value=self.games.format_cards(game["player_cards"])
         )
         embed.add_field(
             name="Krupiyenin Kartları",
             value=f"{game['dealer_cards'][0]} | ?" if game['status'] == 'active' else 
-                  self.bot.get_cog('GamesCommands').format_cards(game["dealer_cards"])
+                  self.games.format_cards(game["dealer_cards"])
         )
+        if game.get("result"):
+            embed.add_field(name="Sonuç", value=game["result"], inline=False)
         return embed
 
 class GamesCommands(commands.GroupCog, name="oyunlar"):
@@ -1157,23 +1200,7 @@ class ProfileCommands(commands.GroupCog, name="profil"):
 class AntiRaidCommands(commands.GroupCog, name="antiraid"):
     def __init__(self, bot):
         self.bot = bot
-        self.raid_detection = defaultdict(lambda: {
-            'joins': deque(maxlen=10),
-            'messages': defaultdict(lambda: deque(maxlen=50)),
-            'spam_warnings': defaultdict(int),
-            'banned_words': set(),
-            'raid_mode': False,
-            'raid_mode_expires': None,
-            'whitelist': set(),
-            'settings': {
-                'join_threshold': 5,
-                'join_interval': 10,
-                'message_threshold': 5,
-                'message_interval': 3,
-                'punishment': 'kick',
-                'raid_mode_duration': 30
-            }
-        })
+        self.raid_detection = RaidStates()
 
     @app_commands.command(name="koruma")
     @app_commands.describe(
@@ -1227,7 +1254,7 @@ class AntiRaidCommands(commands.GroupCog, name="antiraid"):
             await interaction.response.send_message("❌ Geçersiz eylem tipi!", ephemeral=True)
             return
 
-        guild_settings = self.raid_detection[interaction.guild.id]['settings']
+        guild_settings = self.raid_detection[interaction.guild.id].settings
         guild_settings.update(settings[mod])
         guild_settings['punishment'] = eylem
         guild_settings['raid_mode_duration'] = süre
@@ -1264,7 +1291,7 @@ class AntiRaidCommands(commands.GroupCog, name="antiraid"):
             await interaction.response.send_message("❌ Bu komutu kullanmak için yönetici yetkiniz yok!", ephemeral=True)
             return
 
-        whitelist = self.raid_detection[interaction.guild.id]['whitelist']
+        whitelist = self.raid_detection[interaction.guild.id].whitelist
 
         if işlem == "ekle" and kullanıcı:
             whitelist.add(kullanıcı.id)
@@ -1308,6 +1335,7 @@ class EconomyCommands(commands.GroupCog, name="ekonomi"):
             "xp_boost": {"name": "XP Boost", "price": 10000, "duration": 7},
             "coin_boost": {"name": "Coin Boost", "price": 15000, "duration": 7}
         }
+        self.user_locks = get_user_locks(bot)
 
     @app_commands.command(name="market")
     async def market(self, interaction: discord.Interaction):
@@ -1359,28 +1387,16 @@ class EconomyCommands(commands.GroupCog, name="ekonomi"):
         item = self.market_items[ürün]
         total_cost = item['price'] * miktar
 
-        async with self.db.connection() as conn:
-            balance = await conn.fetchval(
-                "SELECT balance FROM economy WHERE user_id = $1",
-                interaction.user.id
-            )
-
-            if not balance or balance < total_cost:
-                await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
-                return
-
-            # Satın alma işlemi
-            await conn.execute(
-                "UPDATE economy SET balance = balance - $1 WHERE user_id = $2",
-                total_cost, interaction.user.id
-            )
-
-            # Ürün kaydı
-            await conn.execute("""
-                INSERT INTO inventory (user_id, item_id, quantity, purchase_date, expire_date)
-                VALUES ($1, $2, $3, NOW(), $4)
-            """, interaction.user.id, ürün, miktar,
-            datetime.datetime.utcnow() + datetime.timedelta(days=item['duration']) if item['duration'] else None)
+        # Ödeme ve ürün kaydı tek işlemde
+        try:
+            async with self.user_locks.hold(interaction.user.id):
+                await self.db.aio.buy_item(
+                    interaction.user.id, ürün, miktar, total_cost,
+                    datetime.datetime.utcnow() + datetime.timedelta(days=item['duration']) if item['duration'] else None
+                )
+        except InsufficientFunds:
+            await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
+            return
 
         embed = discord.Embed(
             title="💰 Satın Alma Başarılı!",
@@ -1400,6 +1416,12 @@ class GamesCommands(commands.GroupCog, name="oyunlar"):
         self.db = bot.db
         self.active_games = {}
         self.game_stats = {}
+        self.user_locks = get_user_locks(bot)
+
+    async def cog_unload(self):
+        # Yarım kalan blackjack oyunlarının bahislerini iade et
+        for game_id in list(self.active_games):
+            await self.settle_blackjack(game_id, refund=True)
 
     @app_commands.command(name="blackjack")
     @app_commands.describe(
@@ -1419,52 +1441,50 @@ class GamesCommands(commands.GroupCog, name="oyunlar"):
             await interaction.response.send_message("❌ Minimum bahis 100 coin!", ephemeral=True)
             return
 
-        async with self.db.connection() as conn:
-            balance = await conn.fetchval(
-                "SELECT balance FROM economy WHERE user_id = $1",
-                interaction.user.id
-            )
-
-            if not balance or balance < bahis:
-                await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
-                return
-
-            # Oyun başlatma
-            game_id = str(uuid.uuid4())
-            self.active_games[game_id] = {
-                "player": interaction.user.id,
-                "bet": bahis,
-                "player_cards": [],
-                "dealer_cards": [],
-                "status": "active"
-            }
+        # Bahis oyun başında defterden düşülür; oyun bitince ödenir veya iade edilir
+        try:
+            async with self.user_locks.hold(interaction.user.id):
+                await self.db.aio.update_casino_balance(interaction.user.id, -bahis)
+                # Oyun başlatma
+                game_id = str(uuid.uuid4())
+                self.active_games[game_id] = {
+                    "player": interaction.user.id,
+                    "bet": bahis,
+                    "player_cards": [],
+                    "dealer_cards": [],
+                    "status": "active"
+                }
+        except InsufficientFunds:
+            await interaction.response.send_message("❌ Yetersiz bakiye!", ephemeral=True)
+            return
 
-            # Kartları dağıt
-            game = self.active_games[game_id]
-            deck = self.create_deck()
-            random.shuffle(deck)
-            
-            game["player_cards"] = [deck.pop(), deck.pop()]
-            game["dealer_cards"] = [deck.pop(), deck.pop()]
+        # Kartları dağıt
+        game = self.active_games[game_id]
+        deck = self.create_deck()
+        random.shuffle(deck)
+        
+        game["player_cards"] = [deck.pop(), deck.pop()]
+        game["dealer_cards"] = [deck.pop(), deck.pop()]
+        game["deck"] = deck
 
-            # Oyun görünümü
-            embed = discord.Embed(
-                title="🎰 Blackjack",
-                description=f"Bahis: {bahis:,} coin",
-                color=discord.Color.blue()
-            )
-            embed.add_field(
-                name="Sizin Kartlarınız",
-                value=self.format_cards(game["player_cards"])
-            )
-            embed.add_field(
-                name="Krupiyenin Kartları",
-                value=f"{game['dealer_cards'][0]} | ?"
-            )
+        # Oyun görünümü
+        embed = discord.Embed(
+            title="🎰 Blackjack",
+            description=f"Bahis: {bahis:,} coin",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="Sizin Kartlarınız",
+            value=self.format_cards(game["player_cards"])
+        )
+        embed.add_field(
+            name="Krupiyenin Kartları",
+            value=f"{game['dealer_cards'][0]} | ?"
+        )
 
-            # Oyun butonları
-            view = BlackjackGameView(self.bot, game_id)
-            await interaction.response.send_message(embed=embed, view=view)
+        # Oyun butonları
+        view = BlackjackGameView(self.bot, game_id, self)
+        await interaction.response.send_message(embed=embed, view=view)
 
     def create_deck(self):
         suits = ['♠️', '♥️', '♦️', '♣️']
@@ -1474,6 +1494,54 @@ class GamesCommands(commands.GroupCog, name="oyunlar"):
     def format_cards(self, cards):
         return " | ".join(cards)
 
+    def hand_value(self, cards):
+        total, aces = 0, 0
+        for card in cards:
+            rank = card[:2] if card.startswith('10') else card[0]
+            if rank == 'A':
+                total += 11
+                aces += 1
+            elif rank in ('J', 'Q', 'K'):
+                total += 10
+            else:
+                total += int(rank)
+        # Asları gerektiğinde 1 say
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        return total
+
+    async def settle_blackjack(self, game_id, refund=False):
+        """Oyunu bitirir ve kazancı öder; oyun zaten bittiyse bir şey yapmaz"""
+        game = self.active_games.get(game_id)
+        if game is None or game["status"] != "active":
+            return
+        # Aynı anda gelen Hit/Stand/zaman aşımı ikinci kez ödeme yapamaz
+        game["status"] = "finished"
+        self.active_games.pop(game_id, None)
+
+        bet = game["bet"]
+        player = self.hand_value(game["player_cards"])
+        if refund:
+            payout, game["result"] = bet, "⌛ Süre doldu, bahis iade edildi."
+        elif player > 21:
+            payout, game["result"] = 0, f"💥 Bust! {bet:,} coin kaybettiniz."
+        else:
+            # Krupiye 17'ye kadar kart çeker
+            while self.hand_value(game["dealer_cards"]) < 17:
+                game["dealer_cards"].append(game["deck"].pop())
+            dealer = self.hand_value(game["dealer_cards"])
+            if dealer > 21 or player > dealer:
+                payout, game["result"] = bet * 2, f"🎉 Kazandınız! +{bet:,} coin"
+            elif player == dealer:
+                payout, game["result"] = bet, "🤝 Berabere, bahis iade edildi."
+            else:
+                payout, game["result"] = 0, f"😞 Kaybettiniz. -{bet:,} coin"
+
+        if payout:
+            async with self.user_locks.hold(game["player"]):
+                await self.db.aio.update_casino_balance(game["player"], payout)
+
 # ------ Cog: ModerationCommands ------
 class ModerationCommands(commands.GroupCog, name="moderasyon"):
     def __init__(self, bot):
@@ -1491,7 +1559,6 @@ class ModerationCommands(commands.GroupCog, name="moderasyon"):
             "link_whitelist": [],
             "word_blacklist": set()
         }
-
     @app_commands.command(name="uyar")
     @app_commands.describe(
         kullanıcı="Uyarılacak kullanıcı",
@@ -1527,11 +1594,8 @@ class ModerationCommands(commands.GroupCog, name="moderasyon"):
                 RETURNING id
             """, kullanıcı.id, interaction.guild.id, interaction.user.id, sebep, seviye)
 
-            # Toplam uyarı sayısını kontrol et
-            total_warnings = await conn.fetchval("""
-                SELECT COUNT(*) FROM warnings
-                WHERE user_id = $1 AND guild_id = $2
-            """, kullanıcı.id, interaction.guild.id)
+            # Aktif uyarı sayısı: sayaç tablosundan tek anahtar okuması
+            total_warnings = await self.db.aio.active_warning_count(kullanıcı.id, interaction.guild.id)
 
             # Otomatik ceza kontrolü
             punishment = None
@@ -1675,8 +1739,10 @@ class ModerationCommands(commands.GroupCog, name="moderasyon"):
                 values = değer.split()
                 if len(values) == 2:
                     count, interval = map(int, values)
-                    self.auto_mod_settings["spam_count"] = count
-                    self.auto_mod_settings["spam_interval"] = interval
+                    if count <= 0 or interval <= 0:
+                        raise ValueError("spam limiti pozitif olmalı")
+                    # Sunucu ayarı; cogs/moderation.py spam aşaması bu limiti uygular
+                    await get_guild_config(self.bot).set(interaction.guild.id, 'spam_limit', [count, interval])
                     await interaction.response.send_message(
                         f"✅ Spam koruması güncellendi: {count} mesaj / {interval} saniye"
                     )
@@ -2213,10 +2279,22 @@ async def discover_commands():
 
 # Modify the main function to include command discovery
 async def main():
-    async with bot:
-        await setup_cogs(bot)
-        await discover_commands()  # Add this line
-        await bot.start(TOKEN)
+    try:
+        async with bot:
+            try:
+                await setup_cogs(bot)
+                await discover_commands()  # Add this line
+                await bot.start(TOKEN)
+            finally:
+                # Bekleyen seviye duyurularını bağlantı kapanmadan gönder
+                await get_announcer(bot).flush()
+                await unload_systems()
+    finally:
+        # Coglar kaldırıldıktan sonra: ertelenmiş coin ödüllerini yaz, veritabanı iş parçacığını durdur
+        await bot.db.aio.run(bot.db.ledger.flush)
+        bot.db.aio.close()
+        # Henüz yazılmamış JSON değişikliklerini kaydet
+        await get_json_store().close()
 
 # Modify the crypto command to use the new menu system
 @bot.tree.command(name="kriptolar", description="🪙 Kripto para listesi ve detayları")  # Changed name from "kripto" to "kriptolar"
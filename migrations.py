@@ -0,0 +1,538 @@
+import time
+import sqlite3
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from storage import StorageEngine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCheck(NamedTuple):
+    namespace: str
+    sql: str  # {table} yer tutuculu örnek sorgu
+    index: str  # Sorgu planında görülmesi beklenen indeks ({table} yer tutuculu)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: Sequence[Tuple[str, str]]  # (namespace, SQL)
+    checks: Sequence[QueryCheck] = ()
+    # Göç öncesi içe aktarılacak eski dosyalar: (namespace, dosya, tablolar)
+    imports: Sequence[Tuple[str, str, Sequence[str]]] = ()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", [
+        # Çekirdek tablolar (database.py, systems/database_system.py, connection() kullanıcıları)
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {casino_users} (
+                user_id INTEGER PRIMARY KEY,
+                balance INTEGER DEFAULT 0,
+                last_daily DATETIME,
+                inventory TEXT
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {economy_users} (
+                user_id INTEGER PRIMARY KEY,
+                wallet_balance INTEGER DEFAULT 0,
+                bank_balance INTEGER DEFAULT 0,
+                last_work DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {user_profiles} (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                level INTEGER DEFAULT 1,
+                xp INTEGER DEFAULT 0,
+                reputation INTEGER DEFAULT 0,
+                join_date DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {profiles} (
+                user_id TEXT PRIMARY KEY,
+                xp INTEGER DEFAULT 0,
+                level INTEGER DEFAULT 1,
+                coins INTEGER DEFAULT 0,
+                bio TEXT DEFAULT 'Henüz biyografi yok',
+                badges TEXT DEFAULT '[]',
+                daily_last TEXT
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {events} (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT,
+                date TEXT,
+                time TEXT,
+                channel_id INTEGER,
+                creator_id INTEGER
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {autoroles} (
+                guild_id TEXT,
+                role_id TEXT,
+                PRIMARY KEY (guild_id, role_id)
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {config} (
+                guild_id TEXT,
+                key TEXT,
+                value TEXT,
+                PRIMARY KEY (guild_id, key)
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {economy} (
+                user_id INTEGER PRIMARY KEY,
+                balance INTEGER DEFAULT 0,
+                bank INTEGER DEFAULT 0,
+                last_daily TEXT,
+                inventory TEXT
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {investments} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                type TEXT,
+                amount INTEGER,
+                initial_amount INTEGER,
+                timestamp DATETIME,
+                active BOOLEAN DEFAULT TRUE
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {chess_ratings} (
+                user_id INTEGER PRIMARY KEY,
+                elo INTEGER DEFAULT 1200
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {inventory} (
+                user_id INTEGER,
+                item_id TEXT,
+                quantity INTEGER DEFAULT 1,
+                purchase_date DATETIME,
+                expire_date DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {warnings} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                guild_id INTEGER,
+                moderator_id INTEGER,
+                reason TEXT,
+                level INTEGER,
+                timestamp DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {message_logs} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                channel_id INTEGER,
+                moderator_id INTEGER,
+                action TEXT,
+                count INTEGER,
+                timestamp DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {user_stats} (
+                user_id INTEGER PRIMARY KEY,
+                skill_points INTEGER DEFAULT 0,
+                last_reputation_given DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {reputation} (
+                user_id INTEGER PRIMARY KEY,
+                reputation_points INTEGER DEFAULT 0,
+                last_updated DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {reputation_history} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                from_user INTEGER,
+                to_user INTEGER,
+                reason TEXT,
+                timestamp DATETIME
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {skills} (
+                user_id INTEGER,
+                skill_name TEXT,
+                level INTEGER DEFAULT 0,
+                experience INTEGER DEFAULT 0,
+                PRIMARY KEY (user_id, skill_name)
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {achievements} (
+                user_id INTEGER,
+                achievement_type TEXT,
+                tier INTEGER,
+                earned_at DATETIME,
+                PRIMARY KEY (user_id, achievement_type)
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {casino_stats} (
+                user_id INTEGER PRIMARY KEY,
+                games_played INTEGER DEFAULT 0,
+                total_wagered INTEGER DEFAULT 0,
+                total_won INTEGER DEFAULT 0,
+                total_lost INTEGER DEFAULT 0
+            )
+        '''),
+        # cogs/moderation.py
+        ("moderation", '''
+            CREATE TABLE IF NOT EXISTS {warnings}
+               (user_id INTEGER, guild_id INTEGER, reason TEXT, 
+                timestamp TEXT, warned_by INTEGER, warning_count INTEGER)
+        '''),
+        ("moderation", '''
+            CREATE TABLE IF NOT EXISTS {moderation_logs}
+               (action TEXT, user_id INTEGER, moderator_id INTEGER, 
+                reason TEXT, timestamp TEXT)
+        '''),
+        # cogs/log_cog.py
+        ("logging", '''
+            CREATE TABLE IF NOT EXISTS {logs}
+               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                event_type TEXT,
+                user_id INTEGER,
+                target_id INTEGER,
+                content TEXT,
+                timestamp TEXT)
+        '''),
+        # cogs/profiles.py
+        ("profiles", '''
+            CREATE TABLE IF NOT EXISTS {profiles}
+               (user_id INTEGER PRIMARY KEY,
+                xp INTEGER DEFAULT 0,
+                level INTEGER DEFAULT 0,
+                coins INTEGER DEFAULT 0,
+                daily_streak INTEGER DEFAULT 0,
+                last_daily TEXT,
+                background_url TEXT,
+                description TEXT)
+        '''),
+        ("profiles", '''
+            CREATE TABLE IF NOT EXISTS {achievements}
+               (user_id INTEGER,
+                achievement_id TEXT,
+                unlock_date TEXT,
+                PRIMARY KEY (user_id, achievement_id))
+        '''),
+        ("profiles", '''
+            CREATE TABLE IF NOT EXISTS {daily_tasks}
+               (user_id INTEGER,
+                task_id TEXT,
+                progress INTEGER DEFAULT 0,
+                completed INTEGER DEFAULT 0,
+                date TEXT,
+                PRIMARY KEY (user_id, task_id, date))
+        '''),
+        # cogs/profile_cog.py
+        ("user_data", '''
+            CREATE TABLE IF NOT EXISTS {user_profiles}
+               (user_id INTEGER PRIMARY KEY,
+                level INTEGER DEFAULT 1,
+                xp INTEGER DEFAULT 0,
+                total_messages INTEGER DEFAULT 0,
+                achievements TEXT DEFAULT '[]',
+                join_date TEXT,
+                bio TEXT DEFAULT 'Henüz bir biyografi yok.',
+                favorite_color TEXT DEFAULT '#ffffff',
+                badges TEXT DEFAULT '[]',
+                title TEXT DEFAULT 'Yeni Üye')
+        '''),
+        # cogs/inventory_cog.py
+        ("inventory", '''
+            CREATE TABLE IF NOT EXISTS {inventory}
+               (user_id INTEGER PRIMARY KEY,
+                items TEXT)
+        '''),
+    ], checks=[
+        QueryCheck("profiles", "SELECT achievement_id FROM {achievements} WHERE user_id = 1",
+                   "sqlite_autoindex_{achievements}_1"),
+    ]),
+    Migration(2, "hot-path indexes", [
+        # Her uyarıda kullanıcı + sunucu sayımı
+        ("moderation", "CREATE INDEX IF NOT EXISTS {idx_warnings_user_guild} ON {warnings} (user_id, guild_id)"),
+        ("", "CREATE INDEX IF NOT EXISTS {idx_warnings_user_guild} ON {warnings} (user_id, guild_id)"),
+        # Sunucu logları zamana göre sıralı okunur
+        ("logging", "CREATE INDEX IF NOT EXISTS {idx_logs_guild_time} ON {logs} (guild_id, timestamp)"),
+        # Günlük görevler (user_id, date) ile aranır; birincil anahtar task_id'yi araya alır
+        ("profiles", "CREATE INDEX IF NOT EXISTS {idx_daily_tasks_user_date} ON {daily_tasks} (user_id, date)"),
+        # achievements sorguları (user_id, ...) birincil anahtarının önekini kullanır; ek indeks
+        # gerekmez (kontrolü sürüm 1'de)
+    ], checks=[
+        QueryCheck("moderation", "SELECT COUNT(*) FROM {warnings} WHERE user_id = 1 AND guild_id = 2",
+                   "{idx_warnings_user_guild}"),
+        QueryCheck("", "SELECT COUNT(*) FROM {warnings} WHERE user_id = 1 AND guild_id = 2",
+                   "{idx_warnings_user_guild}"),
+        QueryCheck("logging", "SELECT * FROM {logs} WHERE guild_id = 1 ORDER BY timestamp DESC LIMIT 10",
+                   "{idx_logs_guild_time}"),
+        QueryCheck("profiles", "SELECT task_id, progress, completed FROM {daily_tasks} "
+                   "WHERE user_id = 1 AND date = '2024-01-01'",
+                   "{idx_daily_tasks_user_date}"),
+    ]),
+    Migration(3, "logs full-text index", [
+        # Dış içerikli FTS5 tablosu: metin yalnızca {logs} içinde tutulur
+        ("logging", '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {logs_fts} USING fts5(
+                content, event_type,
+                content='{logs}', content_rowid='id'
+            )
+        '''),
+        ("logging", '''
+            CREATE TRIGGER IF NOT EXISTS {logs_fts_insert} AFTER INSERT ON {logs} BEGIN
+                INSERT INTO {logs_fts} (rowid, content, event_type)
+                VALUES (new.id, new.content, new.event_type);
+            END
+        '''),
+        ("logging", '''
+            CREATE TRIGGER IF NOT EXISTS {logs_fts_delete} AFTER DELETE ON {logs} BEGIN
+                INSERT INTO {logs_fts} ({logs_fts}, rowid, content, event_type)
+                VALUES ('delete', old.id, old.content, old.event_type);
+            END
+        '''),
+        ("logging", '''
+            CREATE TRIGGER IF NOT EXISTS {logs_fts_update} AFTER UPDATE ON {logs} BEGIN
+                INSERT INTO {logs_fts} ({logs_fts}, rowid, content, event_type)
+                VALUES ('delete', old.id, old.content, old.event_type);
+                INSERT INTO {logs_fts} (rowid, content, event_type)
+                VALUES (new.id, new.content, new.event_type);
+            END
+        '''),
+        # Mevcut kayıtları dizine ekle
+        ("logging", "INSERT INTO {logs_fts} ({logs_fts}) VALUES ('rebuild')"),
+    ], checks=[
+        QueryCheck("logging", "SELECT rowid FROM {logs_fts} WHERE {logs_fts} MATCH 'test'",
+                   "VIRTUAL TABLE INDEX"),
+    ]),
+    Migration(4, "warning counters", [
+        statement
+        for namespace in ("moderation", "")
+        for statement in (
+            (namespace, '''
+                CREATE TABLE IF NOT EXISTS {warning_counts} (
+                    user_id INTEGER,
+                    guild_id INTEGER,
+                    active INTEGER DEFAULT 0,
+                    oldest_active TEXT,
+                    dirty INTEGER DEFAULT 0,
+                    PRIMARY KEY (user_id, guild_id)
+                )
+            '''),
+            # Sayaç uyarıyla aynı işlemde güncellenir; süre dolumu okurken uygulanır (utils/warning_counts.py)
+            (namespace, '''
+                CREATE TRIGGER IF NOT EXISTS {warning_counts_insert} AFTER INSERT ON {warnings} BEGIN
+                    INSERT INTO {warning_counts} (user_id, guild_id, active, oldest_active, dirty)
+                    VALUES (new.user_id, new.guild_id, 1, new.timestamp, 0)
+                    ON CONFLICT(user_id, guild_id) DO UPDATE SET
+                        active = active + 1,
+                        oldest_active = COALESCE(MIN(oldest_active, excluded.oldest_active),
+                                                 excluded.oldest_active);
+                END
+            '''),
+            # Silinen uyarının sayılıp sayılmadığı bilinmez; bir sonraki okumada yeniden say
+            (namespace, '''
+                CREATE TRIGGER IF NOT EXISTS {warning_counts_delete} AFTER DELETE ON {warnings} BEGIN
+                    UPDATE {warning_counts} SET dirty = 1
+                    WHERE user_id = old.user_id AND guild_id = old.guild_id;
+                END
+            '''),
+            # Mevcut uyarılar: ilk okumada süre dolumuna göre yeniden sayılır
+            (namespace, '''
+                INSERT OR IGNORE INTO {warning_counts} (user_id, guild_id, active, oldest_active, dirty)
+                SELECT user_id, guild_id, COUNT(*), MIN(timestamp), 1
+                FROM {warnings} GROUP BY user_id, guild_id
+            '''),
+        )
+    ], checks=[
+        QueryCheck("moderation", "SELECT active FROM {warning_counts} WHERE user_id = 1 AND guild_id = 2",
+                   "sqlite_autoindex_{warning_counts}_1"),
+    ]),
+    Migration(5, "coin ledger", [
+        # ledger.py: çift kayıtlı, yalnızca eklenen coin defteri
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {ledger_transactions} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                memo TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        '''),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {ledger_entries} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                transaction_id INTEGER NOT NULL REFERENCES {ledger_transactions} (id),
+                account TEXT NOT NULL,
+                amount INTEGER NOT NULL
+            )
+        '''),
+        ("", "CREATE INDEX IF NOT EXISTS {idx_ledger_entries_account} ON {ledger_entries} (account, id)"),
+        ("", '''
+            CREATE TABLE IF NOT EXISTS {ledger_balances} (
+                account TEXT PRIMARY KEY,
+                balance INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        '''),
+        ("", '''
+            CREATE TRIGGER IF NOT EXISTS {ledger_entries_insert} AFTER INSERT ON {ledger_entries} BEGIN
+                INSERT INTO {ledger_balances} (account, balance) VALUES (new.account, new.amount)
+                ON CONFLICT(account) DO UPDATE SET balance = balance + excluded.balance;
+            END
+        '''),
+        ("", '''
+            CREATE TRIGGER IF NOT EXISTS {ledger_entries_update} BEFORE UPDATE ON {ledger_entries} BEGIN
+                SELECT RAISE(ABORT, 'ledger entries are append-only');
+            END
+        '''),
+        ("", '''
+            CREATE TRIGGER IF NOT EXISTS {ledger_entries_delete} BEFORE DELETE ON {ledger_entries} BEGIN
+                SELECT RAISE(ABORT, 'ledger entries are append-only');
+            END
+        '''),
+        # Eski bakiye tabloları tek seferlik açılış kayıtlarıyla devralınır; sütunlar artık okunmaz
+        ("", "INSERT INTO {ledger_transactions} (kind, memo) VALUES ('opening', 'economy, profiles, casino_users, economy_users')"),
+        ("", '''
+            INSERT INTO {ledger_entries} (transaction_id, account, amount)
+            SELECT (SELECT MAX(id) FROM {ledger_transactions}), account, SUM(amount)
+            FROM (
+                SELECT 'wallet:' || user_id AS account, balance AS amount FROM {economy}
+                UNION ALL SELECT 'bank:' || user_id, bank FROM {economy}
+                UNION ALL SELECT 'wallet:' || user_id, coins FROM {profiles}
+                UNION ALL SELECT 'wallet:' || user_id, balance FROM {casino_users}
+                UNION ALL SELECT 'wallet:' || user_id, wallet_balance FROM {economy_users}
+                UNION ALL SELECT 'bank:' || user_id, bank_balance FROM {economy_users}
+            )
+            WHERE account IS NOT NULL
+            GROUP BY account HAVING SUM(amount) != 0
+        '''),
+        ("", '''
+            INSERT INTO {ledger_entries} (transaction_id, account, amount)
+            SELECT transaction_id, 'system:opening', -SUM(amount) FROM {ledger_entries}
+            WHERE transaction_id = (SELECT MAX(id) FROM {ledger_transactions})
+            GROUP BY transaction_id
+        '''),
+    ], checks=[
+        QueryCheck("", "SELECT balance FROM {ledger_balances} WHERE account = 'wallet:1'",
+                   "PRIMARY KEY"),
+        QueryCheck("", "SELECT amount FROM {ledger_entries} WHERE account = 'wallet:1' ORDER BY id DESC LIMIT 10",
+                   "{idx_ledger_entries_account}"),
+    ], imports=[
+        # systems/database_system.py'nin eski bot.db bakiyeleri açılış kaydına girmeli
+        ("", 'bot.db', ['economy', 'casino_stats']),
+    ]),
+]
+
+
+def explain(storage: StorageEngine, namespace: str, sql: str) -> List[str]:
+    """
+    :param storage: Storage engine
+    :param namespace: Namespace used to resolve ``{table}`` placeholders
+    :param sql: Query to explain
+    :return: ``EXPLAIN QUERY PLAN`` detail lines
+    """
+    ns = storage.namespace(namespace)
+    # EXPLAIN şema değişikliğini okuyucu bağlantılarda hemen görmez; yazıcıyı kullan
+    with storage.write() as conn:
+        return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {ns.sql(sql)}")]
+
+
+def check_plans(storage: StorageEngine, migration: Migration) -> Dict[str, bool]:
+    """
+    Verify that a migration's sample queries use the expected indexes.
+
+    :param storage: Storage engine
+    :param migration: Applied migration
+    :return: Resolved query -> whether the expected index appears in its plan
+    """
+    results = {}
+    for check in migration.checks:
+        ns = storage.namespace(check.namespace)
+        plan = explain(storage, check.namespace, check.sql)
+        index = ns.sql(check.index)
+        results[ns.sql(check.sql)] = any(index in line for line in plan)
+    return results
+
+
+def applied_versions(storage: StorageEngine) -> List[int]:
+    with storage.read() as conn:
+        return [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def apply_migrations(storage: StorageEngine, migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Apply pending migrations in version order, one transaction each.
+
+    Legacy database files listed in a migration's ``imports`` are copied in
+    first, so the migration sees their rows. Query plans of each migration's
+    checks are logged before and after, and a warning is logged when an
+    expected index is not used.
+
+    :param storage: Storage engine
+    :param migrations: Migrations to consider
+    :return: Versions applied by this call
+    """
+    with storage.write() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                duration_ms REAL
+            )
+        """)
+    done = set(applied_versions(storage))
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+
+        for namespace, legacy_path, tables in migration.imports:
+            storage.namespace(namespace).import_legacy(legacy_path, tables)
+
+        before = [_try_explain(storage, check) for check in migration.checks]
+        started = time.perf_counter()
+        with storage.write() as conn:
+            for namespace, sql in migration.statements:
+                conn.execute(storage.namespace(namespace).sql(sql))
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (?, ?, ?)",
+                (migration.version, migration.name, (time.perf_counter() - started) * 1000)
+            )
+        applied.append(migration.version)
+        logger.info(f"Migration {migration.version} ({migration.name}) applied")
+
+        for check, plan in zip(migration.checks, before):
+            after = explain(storage, check.namespace, check.sql)
+            logger.info(f"Query plan [{check.namespace or 'core'}] {check.sql!r}: {plan} -> {after}")
+        for query, ok in check_plans(storage, migration).items():
+            if not ok:
+                logger.warning(f"Expected index not used by {query!r}")
+    return applied
+
+
+def _try_explain(storage: StorageEngine, check: QueryCheck) -> Optional[List[str]]:
+    # Tablo henüz yoksa (ilk kurulum) plan alınamaz
+    try:
+        return explain(storage, check.namespace, check.sql)
+    except sqlite3.OperationalError:
+        return None
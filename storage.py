@@ -0,0 +1,273 @@
+import os
+import re
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+_TABLE_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class Transaction:
+    def __init__(self, conn: sqlite3.Connection, namespace: "Namespace"):
+        """
+        Write transaction bound to a namespace; SQL may use ``{table}`` placeholders.
+
+        :param conn: Writer connection
+        :param namespace: Namespace used to resolve table names
+        """
+        self.conn = conn
+        self.namespace = namespace
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self.conn.execute(self.namespace.sql(sql), params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        return self.conn.executemany(self.namespace.sql(sql), rows)
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self.execute(sql, params).fetchall()
+
+
+class Namespace:
+    def __init__(self, engine: "StorageEngine", name: str):
+        """
+        Per-subsystem schema namespace inside the shared database.
+
+        Tables are prefixed with ``<name>_`` (the core namespace ``""`` has no
+        prefix), and SQL refers to them as ``{table}``, e.g.
+        ``SELECT * FROM {warnings}`` in namespace ``moderation`` reads
+        ``moderation_warnings``.
+
+        :param engine: Storage engine
+        :param name: Namespace name, ``""`` for core tables
+        """
+        self.engine = engine
+        self.name = name
+        self.prefix = f"{name}_" if name else ""
+        self._sql_cache: Dict[str, str] = {}
+
+    def table(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def sql(self, sql: str) -> str:
+        """
+        Resolve ``{table}`` placeholders (cached per statement).
+
+        :param sql: SQL text with placeholders
+        :return: SQL text with real table names
+        """
+        resolved = self._sql_cache.get(sql)
+        if resolved is None:
+            resolved = _TABLE_PLACEHOLDER.sub(lambda m: self.table(m.group(1)), sql)
+            self._sql_cache[sql] = resolved
+        return resolved
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Run several statements atomically on the writer connection."""
+        with self.engine.write() as conn:
+            yield Transaction(conn, self)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """
+        Run one write statement in its own transaction.
+
+        :return: Affected row count
+        """
+        with self.engine.write() as conn:
+            return conn.execute(self.sql(sql), params).rowcount
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        with self.engine.write() as conn:
+            return conn.executemany(self.sql(sql), rows).rowcount
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        with self.engine.read() as conn:
+            return conn.execute(self.sql(sql), params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self.engine.read() as conn:
+            return conn.execute(self.sql(sql), params).fetchall()
+
+    def import_legacy(self, legacy_path: str, tables: Iterable[str]) -> int:
+        """
+        Copy tables from a pre-consolidation database file into this namespace.
+
+        :param legacy_path: Old database file, e.g. ``warnings.db``
+        :param tables: Table names in the old file (same name inside the namespace)
+        :return: Number of imported rows
+        """
+        return self.engine.import_legacy(legacy_path, {table: self.table(table) for table in tables})
+
+
+class StorageEngine:
+    def __init__(self, db_path: str = 'bot_database.sqlite', max_readers: int = 4):
+        """
+        Single SQLite database shared by every subsystem.
+
+        Runs in WAL mode with one writer connection guarded by a lock and a
+        small pool of read-only connections, so readers never wait for a
+        commit and there is a single fsync stream instead of one per file.
+
+        :param db_path: Path to the SQLite database file
+        :param max_readers: Maximum number of read connections
+        """
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.writer = self._connect()
+        self.writer.execute('PRAGMA journal_mode = WAL')
+        self._write_lock = threading.RLock()
+
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._namespaces: Dict[str, Namespace] = {}
+
+        self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS storage_imports (
+                source TEXT PRIMARY KEY,
+                rows INTEGER,
+                imported_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.writer.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA foreign_keys = ON')
+        # WAL ile NORMAL senkronizasyon çökmede tutarlıdır, her commit'te fsync gerekmez
+        conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def namespace(self, name: str = "") -> Namespace:
+        """
+        :param name: Subsystem name, ``""`` for core tables
+        :return: Shared Namespace instance
+        """
+        ns = self._namespaces.get(name)
+        if ns is None:
+            ns = self._namespaces[name] = Namespace(self, name)
+        return ns
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            with self.writer:
+                yield self.writer
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            if self._reader_count < self.max_readers:
+                self._reader_count += 1
+                conn = self._connect()
+                conn.execute('PRAGMA query_only = ON')
+                return conn
+        return self._readers.get()
+
+    def import_legacy(self, legacy_path: str, tables: Dict[str, str]) -> int:
+        """
+        One-shot import of an old database file; later calls are no-ops.
+
+        Columns present in both tables are copied with ``INSERT OR IGNORE``,
+        so existing rows win. The source file is left untouched.
+
+        :param legacy_path: Old database file
+        :param tables: Old table name -> new table name
+        :return: Number of imported rows
+        """
+        source = os.path.abspath(legacy_path)
+        with self._write_lock:
+            if self.writer.execute('SELECT 1 FROM storage_imports WHERE source = ?', (source,)).fetchone():
+                return 0
+            if not os.path.exists(legacy_path):
+                return 0
+
+            # ATTACH bir işlem içinde çalışamaz
+            self.writer.commit()
+            self.writer.execute('ATTACH DATABASE ? AS legacy', (legacy_path,))
+            try:
+                imported = 0
+                with self.writer:
+                    for old_name, new_name in tables.items():
+                        old_columns = self._columns('legacy', old_name)
+                        if not old_columns:
+                            continue
+                        new_columns = self._columns('main', new_name)
+                        shared = [c for c in old_columns if c in new_columns]
+                        if not shared:
+                            # Hedef tablo yok ya da ortak sütun yok
+                            self.logger.warning(
+                                f"{legacy_path}: {old_name} -> {new_name} için ortak sütun yok, atlandı"
+                            )
+                            continue
+                        columns = ", ".join(f'"{c}"' for c in shared)
+                        cursor = self.writer.execute(
+                            f'INSERT OR IGNORE INTO main."{new_name}" ({columns}) '
+                            f'SELECT {columns} FROM legacy."{old_name}"'
+                        )
+                        imported += max(cursor.rowcount, 0)
+                    self.writer.execute(
+                        'INSERT INTO storage_imports (source, rows) VALUES (?, ?)', (source, imported)
+                    )
+            finally:
+                self.writer.execute('DETACH DATABASE legacy')
+
+        self.logger.info(f"{legacy_path} içe aktarıldı: {imported} satır")
+        return imported
+
+    def _columns(self, schema: str, table: str) -> List[str]:
+        return [row[1] for row in self.writer.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+    def close(self) -> None:
+        """Close every connection."""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self.writer.close()
+        self.logger.info("Storage engine closed.")
+
+
+# Singleton pattern: every subsystem shares one engine
+_storage_instance = None
+
+
+def get_storage(db_path: str = 'bot_database.sqlite') -> StorageEngine:
+    """
+    Get or create the shared storage engine.
+
+    :param db_path: Database file, only used on first call
+    :return: StorageEngine instance
+    """
+    global _storage_instance
+    if _storage_instance is None:
+        # migrations.py imports this module, so import it lazily
+        from migrations import apply_migrations
+        _storage_instance = StorageEngine(db_path)
+        apply_migrations(_storage_instance)
+    return _storage_instance
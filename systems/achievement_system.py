@@ -4,6 +4,7 @@ from typing import List, Dict, Tuple
 import asyncio
 import json
 import datetime
+from ledger import wallet
 
 class AchievementSystem(commands.Cog):
     def __init__(self, bot):
@@ -66,12 +67,8 @@ class AchievementSystem(commands.Cog):
                         DO UPDATE SET tier = $3, earned_at = NOW()
                     """, user_id, achievement_type, next_tier)
 
-                    # Ödül ver
-                    await conn.execute("""
-                        UPDATE economy 
-                        SET balance = balance + $1
-                        WHERE user_id = $2
-                    """, tier_data["reward"], user_id)
+                    # Ödül ver: defterde toplu yazılır, ayrı commit beklenmez
+                    self.db.ledger.defer_credit(wallet(user_id), tier_data["reward"], 'achievement')
 
                     return True, {
                         "name": achievement["name"],
@@ -1,120 +1,193 @@
-import sqlite3
-import aiosqlite
-import os
-from typing import Dict, Any
-
-class DatabaseSystem:
-    def __init__(self, db_path: str = "bot.db"):
-        self.db_path = db_path
-        self._init_db()
-
-    def _init_db(self):
-        """Veritabanı tablolarını oluştur"""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            
-            # Ekonomi tablosu
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS economy (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    bank INTEGER DEFAULT 0,
-                    last_daily TEXT,
-                    inventory TEXT
-                )
-            """)
-            
-            # Casino tablosu
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS casino_stats (
-                    user_id INTEGER PRIMARY KEY,
-                    games_played INTEGER DEFAULT 0,
-                    total_wagered INTEGER DEFAULT 0,
-                    total_won INTEGER DEFAULT 0,
-                    total_lost INTEGER DEFAULT 0
-                )
-            """)
-
-    async def get_balance(self, user_id: int) -> Dict[str, int]:
-        """Kullanıcı bakiyesini getir"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute(
-                "SELECT balance, bank FROM economy WHERE user_id = ?", 
-                (user_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    # Yeni kullanıcı oluştur
-                    await db.execute(
-                        "INSERT INTO economy (user_id, balance, bank) VALUES (?, 0, 0)",
-                        (user_id,)
-                    )
-                    await db.commit()
-                    return {"balance": 0, "bank": 0}
-                return {"balance": row[0], "bank": row[1]}
-
-    async def update_balance(self, user_id: int, amount: int, bank: bool = False) -> bool:
-        """Kullanıcı bakiyesini güncelle"""
-        async with aiosqlite.connect(self.db_path) as db:
-            if bank:
-                await db.execute(
-                    "UPDATE economy SET bank = bank + ? WHERE user_id = ?",
-                    (amount, user_id)
-                )
-            else:
-                await db.execute(
-                    "UPDATE economy SET balance = balance + ? WHERE user_id = ?",
-                    (amount, user_id)
-                )
-            await db.commit()
-            return True
-
-    async def get_casino_stats(self, user_id: int) -> Dict[str, Any]:
-        """Casino istatistiklerini getir"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute(
-                "SELECT * FROM casino_stats WHERE user_id = ?",
-                (user_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    return {
-                        "games_played": 0,
-                        "total_wagered": 0,
-                        "total_won": 0,
-                        "total_lost": 0
-                    }
-                return {
-                    "games_played": row[1],
-                    "total_wagered": row[2], 
-                    "total_won": row[3],
-                    "total_lost": row[4]
-                }
-
-    async def update_casino_stats(self, user_id: int, stats: Dict[str, int]):
-        """Casino istatistiklerini güncelle"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Önce kullanıcıyı kontrol et
-            async with db.execute(
-                "SELECT 1 FROM casino_stats WHERE user_id = ?",
-                (user_id,)
-            ) as cursor:
-                if not await cursor.fetchone():
-                    await db.execute(
-                        "INSERT INTO casino_stats (user_id) VALUES (?)",
-                        (user_id,)
-                    )
-            
-            # İstatistikleri güncelle
-            updates = []
-            params = []
-            for key, value in stats.items():
-                updates.append(f"{key} = {key} + ?")
-                params.append(value)
-            params.append(user_id)
-            
-            await db.execute(
-                f"UPDATE casino_stats SET {', '.join(updates)} WHERE user_id = ?",
-                params
-            )
-            await db.commit()
+import aiosqlite
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+from storage import get_storage
+from ledger import InsufficientFunds, get_ledger, wallet, bank as bank_account
+
+# update_casino_stats ile artırılabilen sütunlar
+CASINO_STAT_FIELDS = ("games_played", "total_wagered", "total_won", "total_lost")
+
+class DatabaseSystem:
+    def __init__(self, db_path: str = None, pool_size: int = 4,
+                 stats_flush_interval: float = 5.0, max_pending_stats: int = 200):
+        """
+        Economy and casino storage on long-lived aiosqlite connections.
+
+        :param db_path: Database file (defaults to the shared storage engine file)
+        :param pool_size: Number of pooled connections
+        :param stats_flush_interval: Seconds between casino stat flushes
+        :param max_pending_stats: Flush early once this many users have pending stats
+        """
+        # Tablolar ortak veritabanının çekirdek alanında tutulur
+        self.storage = get_storage()
+        # Bakiyeler ortak coin defterinde (ledger.py)
+        self.ledger = get_ledger(self.storage)
+        self.db_path = db_path or self.storage.db_path
+        self.pool_size = pool_size
+        self.stats_flush_interval = stats_flush_interval
+        self.max_pending_stats = max_pending_stats
+        self.logger = logging.getLogger(__name__)
+
+        self._pool: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._opened = 0
+        self._open_lock = asyncio.Lock()
+        # SQLite tek yazıcıya izin verir; havuz içindeki yazımlar sıraya girer
+        self._write_lock = asyncio.Lock()
+        self._pending_stats: Dict[int, Dict[str, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Eski bot.db dosyası coin defteri göçünden önce içe aktarılır (migrations.py)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path, timeout=30)
+        await db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        if self._pool.empty():
+            async with self._open_lock:
+                if self._pool.empty() and self._opened < self.pool_size:
+                    self._opened += 1
+                    try:
+                        return await self._connect()
+                    except Exception:
+                        self._opened -= 1
+                        raise
+        return await self._pool.get()
+
+    def _release(self, db: aiosqlite.Connection):
+        self._pool.put_nowait(db)
+
+    async def _read(self, sql: str, params=()):
+        db = await self._acquire()
+        try:
+            async with db.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+        finally:
+            self._release(db)
+
+    async def _write(self, sql: str, params=(), many: bool = False):
+        async with self._write_lock:
+            db = await self._acquire()
+            try:
+                if many:
+                    await db.executemany(sql, params)
+                else:
+                    await db.execute(sql, params)
+                await db.commit()
+            finally:
+                self._release(db)
+
+    async def get_balance(self, user_id: int) -> Dict[str, int]:
+        """Kullanıcı bakiyesini getir"""
+        balances = await asyncio.to_thread(self.ledger.balances, [wallet(user_id), bank_account(user_id)])
+        return {"balance": balances[wallet(user_id)], "bank": balances[bank_account(user_id)]}
+
+    async def update_balance(self, user_id: int, amount: int, bank: bool = False) -> bool:
+        """
+        Kullanıcı bakiyesini güncelle
+
+        :return: Bakiye yetmediği için düşüm yapılamadıysa False
+        """
+        account = bank_account(user_id) if bank else wallet(user_id)
+        try:
+            if amount >= 0:
+                await asyncio.to_thread(self.ledger.credit, account, amount, 'casino')
+            else:
+                await asyncio.to_thread(self.ledger.debit, account, -amount, 'casino')
+        except InsufficientFunds:
+            return False
+        return True
+
+    async def get_casino_stats(self, user_id: int) -> Dict[str, Any]:
+        """Casino istatistiklerini getir"""
+        row = await self._read(
+            "SELECT games_played, total_wagered, total_won, total_lost FROM casino_stats WHERE user_id = ?",
+            (user_id,)
+        )
+        stats = dict(zip(CASINO_STAT_FIELDS, row)) if row else dict.fromkeys(CASINO_STAT_FIELDS, 0)
+        # Henüz yazılmamış artışları da göster
+        for key, value in self._pending_stats.get(user_id, {}).items():
+            stats[key] += value
+        return stats
+
+    async def update_casino_stats(self, user_id: int, stats: Dict[str, int]):
+        """
+        Casino istatistiklerini artır.
+
+        Artışlar bellekte toplanır ve periyodik olarak tek bir toplu UPSERT ile yazılır.
+        """
+        pending = self._pending_stats.setdefault(user_id, dict.fromkeys(CASINO_STAT_FIELDS, 0))
+        for key, value in stats.items():
+            if key not in pending:
+                raise ValueError(f"Geçersiz istatistik: {key}")
+            pending[key] += value
+
+        if len(self._pending_stats) >= self.max_pending_stats:
+            await self.flush_casino_stats()
+        else:
+            self.start()
+
+    async def flush_casino_stats(self) -> int:
+        """
+        Bekleyen casino istatistiklerini tek işlemde yaz.
+
+        :return: Yazılan kullanıcı sayısı
+        """
+        if not self._pending_stats:
+            return 0
+        pending, self._pending_stats = self._pending_stats, {}
+        rows = [
+            (user_id, *(values[key] for key in CASINO_STAT_FIELDS))
+            for user_id, values in pending.items()
+        ]
+        try:
+            await self._write(
+                f"INSERT INTO casino_stats (user_id, {', '.join(CASINO_STAT_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in CASINO_STAT_FIELDS)}) "
+                f"ON CONFLICT(user_id) DO UPDATE SET "
+                + ", ".join(f"{key} = {key} + excluded.{key}" for key in CASINO_STAT_FIELDS),
+                rows, many=True
+            )
+        except Exception:
+            # Yazılamayan artışları geri koy
+            for user_id, values in pending.items():
+                current = self._pending_stats.setdefault(user_id, dict.fromkeys(CASINO_STAT_FIELDS, 0))
+                for key, value in values.items():
+                    current[key] += value
+            raise
+        return len(rows)
+
+    def start(self) -> None:
+        """Periyodik istatistik yazımını başlat"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.stats_flush_interval)
+            try:
+                await self.flush_casino_stats()
+            except Exception as e:
+                self.logger.error(f"Casino istatistikleri yazılamadı: {e}")
+
+    async def close(self):
+        """Bekleyen istatistikleri yaz ve bağlantıları kapat"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush_casino_stats()
+        while not self._pool.empty():
+            await self._pool.get_nowait().close()
+        self._opened = 0
+
+
+async def setup(bot):
+    bot.economy_db = DatabaseSystem()
+
+
+async def teardown(bot):
+    # Toplu tutulan casino istatistiklerini kapanmadan önce yaz
+    economy_db: Optional[DatabaseSystem] = getattr(bot, 'economy_db', None)
+    if economy_db is not None:
+        await economy_db.close()
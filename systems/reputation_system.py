@@ -3,6 +3,7 @@ from discord.ext import commands
 from typing import Dict, List
 import asyncio
 import datetime
+from ledger import wallet
 
 class ReputationSystem(commands.Cog):
     def __init__(self, bot):
@@ -76,12 +77,8 @@ class ReputationSystem(commands.Cog):
             rewards = {}
             for level, reward in self.reputation_rewards.items():
                 if rep_points >= level and rep_points - 1 < level:
-                    # Coin ödülü
-                    await conn.execute("""
-                        UPDATE economy
-                        SET balance = balance + $1
-                        WHERE user_id = $2
-                    """, reward["coins"], to_user)
+                    # Coin ödülü: defterde toplu yazılır, ayrı commit beklenmez
+                    self.db.ledger.defer_credit(wallet(to_user), reward["coins"], 'reputation')
                     rewards = reward
                     break
 
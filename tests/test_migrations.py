@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from migrations import MIGRATIONS, apply_migrations, applied_versions, check_plans, explain
+from storage import StorageEngine
+
+
+@pytest.fixture
+def storage(tmp_path):
+    engine = StorageEngine(str(tmp_path / "bot_database.sqlite"))
+    yield engine
+    engine.close()
+
+
+def uses_index(storage, check):
+    """Whether the check's query plan mentions its index; False if the table does not exist yet."""
+    try:
+        plan = explain(storage, check.namespace, check.sql)
+    except sqlite3.OperationalError:
+        return False
+    index = storage.namespace(check.namespace).sql(check.index)
+    return any(index in line for line in plan)
+
+
+def test_apply_migrations_is_idempotent(storage):
+    assert apply_migrations(storage) == [m.version for m in MIGRATIONS]
+    assert apply_migrations(storage) == []
+    assert applied_versions(storage) == [m.version for m in MIGRATIONS]
+
+
+@pytest.mark.parametrize("migration", [m for m in MIGRATIONS if m.checks], ids=lambda m: f"v{m.version}")
+def test_checks_use_index_only_after_migration(storage, migration):
+    earlier = [m for m in MIGRATIONS if m.version < migration.version]
+    apply_migrations(storage, earlier)
+
+    for check in migration.checks:
+        assert not uses_index(storage, check), f"{check.sql!r} already uses {check.index}"
+
+    assert apply_migrations(storage, earlier + [migration]) == [migration.version]
+    results = check_plans(storage, migration)
+    assert len(results) == len(migration.checks)
+    assert all(results.values()), results
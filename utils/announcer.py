@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+import discord
+
+# Discord sınırları
+_MAX_DESCRIPTION = 4096
+_MAX_EMBEDS = 10
+
+
+class _ChannelBatch:
+    __slots__ = ('channel', 'lines', 'task')
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        # Kullanıcı başına tek satır: mention -> parçalar
+        self.lines: Dict[str, List[str]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+
+class Announcer:
+    def __init__(self, bot, window: float = 2.0):
+        """
+        Per-channel queue for level-up and achievement notices.
+
+        Notices produced within ``window`` seconds in the same channel are
+        merged into a single embed (one line per user), so a chat burst costs
+        one send per channel instead of one per level-up.
+
+        :param bot: Bot instance
+        :param window: Seconds to collect notices before sending
+        """
+        self.bot = bot
+        self.window = window
+        self.logger = logging.getLogger(__name__)
+        self._batches: Dict[int, _ChannelBatch] = {}
+        self.notices = 0
+        self.sends = 0
+
+    def announce(self, channel: discord.abc.Messageable, member: discord.abc.User, text: str) -> None:
+        """
+        Queue a notice for ``channel``.
+
+        :param channel: Channel the triggering message was sent in
+        :param member: User the notice is about
+        :param text: Short notice, e.g. ``"🎊 Seviye **5**"``
+        """
+        batch = self._batches.get(channel.id)
+        if batch is None:
+            batch = self._batches[channel.id] = _ChannelBatch(channel)
+            batch.task = asyncio.get_running_loop().create_task(self._send_later(channel.id))
+
+        parts = batch.lines.setdefault(member.mention, [])
+        if text not in parts:
+            parts.append(text)
+        self.notices += 1
+
+    async def _send_later(self, channel_id: int):
+        await asyncio.sleep(self.window)
+        await self._send(channel_id)
+
+    async def _send(self, channel_id: int):
+        batch = self._batches.pop(channel_id, None)
+        if batch is None or not batch.lines:
+            return
+
+        embeds = []
+        description = ""
+        for mention, parts in batch.lines.items():
+            line = f"{mention} {' · '.join(parts)}"
+            if description and len(description) + len(line) + 1 > _MAX_DESCRIPTION:
+                embeds.append(self._build_embed(description))
+                description = ""
+            description = f"{description}\n{line}" if description else line[:_MAX_DESCRIPTION]
+        embeds.append(self._build_embed(description))
+
+        for start in range(0, len(embeds), _MAX_EMBEDS):
+            try:
+                await batch.channel.send(embeds=embeds[start:start + _MAX_EMBEDS])
+                self.sends += 1
+            except discord.HTTPException as e:
+                self.logger.error(f"Duyuru gönderilemedi ({channel_id}): {e}")
+                return
+
+    @staticmethod
+    def _build_embed(description: str) -> discord.Embed:
+        return discord.Embed(
+            title="🎉 Seviye Atlama!",
+            description=description,
+            color=discord.Color.gold()
+        )
+
+    async def flush(self) -> None:
+        """Send every pending batch now."""
+        for channel_id in list(self._batches):
+            batch = self._batches.get(channel_id)
+            if batch is not None and batch.task is not None:
+                batch.task.cancel()
+            await self._send(channel_id)
+
+
+def get_announcer(bot) -> Announcer:
+    """
+    Get or create the bot's announcement queue.
+
+    :param bot: Bot instance
+    :return: Announcer instance
+    """
+    announcer: Optional[Announcer] = getattr(bot, 'announcer', None)
+    if announcer is None:
+        announcer = Announcer(bot)
+        bot.announcer = announcer
+    return announcer
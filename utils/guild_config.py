@@ -0,0 +1,180 @@
+import copy
+import json
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+# Bilinen ayarlar: anahtar -> (tip, varsayılan)
+CONFIG_KEYS: Dict[str, Tuple[type, Any]] = {
+    'autorole': (int, None),
+    'auto_messages': (dict, {}),
+    'log_retention_days': (int, None),
+    'spam_limit': (list, None),  # [mesaj sayısı, saniye]
+}
+
+_MISSING = object()
+
+ConfigSubscriber = Callable[[int, str, Any, Any], Union[None, Awaitable[None]]]
+
+
+def coerce_config_value(key: str, value: Any) -> Any:
+    """
+    Validate a value against :data:`CONFIG_KEYS`.
+
+    :param key: Config key
+    :param value: New value (``None`` clears the setting)
+    :return: Value converted to the key's type
+    :raises ValueError: If the value cannot be converted
+    """
+    spec = CONFIG_KEYS.get(key)
+    if spec is None or value is None:
+        return value
+    kind = spec[0]
+    if isinstance(value, kind):
+        return value
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} ayarı {kind.__name__} olmalı: {value!r}")
+
+
+class GuildConfig:
+    def __init__(self, db, legacy_path: Optional[str] = 'config.json'):
+        """
+        In-memory per-guild settings backed by the ``config`` table.
+
+        Each guild's settings are read from the database once and kept
+        decoded; writes go through the database and update the cache, then
+        notify subscribers of the changed key. The old global ``config.json``
+        is read once at startup and used as a fallback for guilds that have
+        not set a key yet.
+
+        :param db: DatabaseManager instance
+        :param legacy_path: Global JSON config file used as fallback
+        """
+        self.db = db
+        self.logger = logging.getLogger(__name__)
+        self._guilds: Dict[int, Dict[str, Any]] = {}
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._subscribers: Dict[str, List[ConfigSubscriber]] = {}
+        self._fallback = self._load_legacy(legacy_path) if legacy_path else {}
+        self.loads = 0
+
+    def _load_legacy(self, path: str) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        fallback = {}
+        for key, value in data.items():
+            try:
+                fallback[key] = coerce_config_value(key, value)
+            except ValueError as e:
+                self.logger.warning(f"{path}: {e}")
+        return fallback
+
+    async def _settings(self, guild_id: int) -> Dict[str, Any]:
+        settings = self._guilds.get(guild_id)
+        if settings is not None:
+            return settings
+
+        # Aynı sunucu için eşzamanlı yüklemeler (ör. katılım patlaması) tek sorguyu paylaşır
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._load(guild_id))
+            self._loading[guild_id] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, guild_id: int) -> Dict[str, Any]:
+        try:
+            settings = await self.db.aio.get_guild_config(guild_id)
+            self._guilds[guild_id] = settings
+            self.loads += 1
+            return settings
+        finally:
+            self._loading.pop(guild_id, None)
+
+    async def get(self, guild_id: int, key: str, default: Any = _MISSING) -> Any:
+        """
+        :param guild_id: Discord guild ID
+        :param key: Config key
+        :param default: Returned when neither the guild nor the fallback sets ``key``
+            (defaults to the :data:`CONFIG_KEYS` default)
+        :return: Setting value (copied for mutable types)
+        """
+        settings = await self._settings(guild_id)
+        if key in settings:
+            value = settings[key]
+        elif key in self._fallback:
+            value = self._fallback[key]
+        elif default is not _MISSING:
+            value = default
+        else:
+            value = CONFIG_KEYS.get(key, (None, None))[1]
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    async def set(self, guild_id: int, key: str, value: Any) -> None:
+        """
+        Store a setting and notify subscribers if it changed.
+
+        :param guild_id: Discord guild ID
+        :param key: Config key
+        :param value: New value
+        :raises ValueError: If the value does not match the key's type
+        """
+        value = coerce_config_value(key, value)
+        old = await self.get(guild_id, key)
+        await self.db.aio.set_config(guild_id, key, value)
+        settings = await self._settings(guild_id)
+        settings[key] = copy.deepcopy(value)
+        if old != value:
+            await self._notify(guild_id, key, old, value)
+
+    def subscribe(self, key: str, callback: ConfigSubscriber) -> None:
+        """
+        Call ``callback(guild_id, key, old, new)`` whenever ``key`` changes.
+
+        :param key: Config key
+        :param callback: Function or coroutine function
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key: str, callback: ConfigSubscriber) -> None:
+        callbacks = self._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def _notify(self, guild_id: int, key: str, old: Any, new: Any):
+        for callback in list(self._subscribers.get(key, ())):
+            try:
+                result = callback(guild_id, key, old, new)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"Ayar bildirimi başarısız ({key}): {e}")
+
+    def invalidate(self, guild_id: Optional[int] = None) -> None:
+        """
+        Forget cached settings so they are reloaded on next access.
+
+        :param guild_id: Discord guild ID, or ``None`` for every guild
+        """
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(guild_id, None)
+
+
+def get_guild_config(bot) -> GuildConfig:
+    """
+    Get or create the bot's guild config cache.
+
+    :param bot: Bot instance
+    :return: GuildConfig instance
+    """
+    config: Optional[GuildConfig] = getattr(bot, 'guild_config', None)
+    if config is None:
+        config = GuildConfig(bot.db)
+        bot.guild_config = config
+    return config
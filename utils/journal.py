@@ -0,0 +1,124 @@
+import json
+import os
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+
+class JournaledStore:
+    def __init__(self, path: str, max_journal_bytes: int = 1024 * 1024, compact_interval: float = 300.0):
+        """
+        JSON dict kept in memory, persisted as a snapshot plus an append-only journal.
+
+        Every change appends one compact ``{"k": key, "v": value}`` line to
+        ``<path>.journal``; the full dict is only rewritten when the journal is
+        compacted into a new snapshot (size threshold, timer or close), using a
+        temporary file and an atomic rename.
+
+        :param path: Snapshot file, e.g. ``levels.json``
+        :param max_journal_bytes: Compact once the journal grows past this size
+        :param compact_interval: Seconds between background compactions
+        """
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.max_journal_bytes = max_journal_bytes
+        self.compact_interval = compact_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.data: Dict[str, Any] = {}
+        self._journal = None
+        self._journal_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            self.data = {}
+
+        # Son anlık görüntüden sonraki değişiklikleri yeniden uygula
+        replayed = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Yarım yazılmış son satır (çökme) - atla
+                        continue
+                    if record.get("d"):
+                        self.data.pop(record["k"], None)
+                    else:
+                        self.data[record["k"]] = record["v"]
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+
+        if replayed:
+            self.compact()
+        self._open_journal()
+
+    def _open_journal(self):
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal_bytes = self._journal.tell()
+
+    def record(self, key: str) -> None:
+        """
+        Append the current value of ``key`` to the journal.
+
+        :param key: Key in :attr:`data` that was just modified
+        """
+        if key in self.data:
+            line = json.dumps({"k": key, "v": self.data[key]}, separators=(',', ':'), ensure_ascii=False)
+        else:
+            line = json.dumps({"k": key, "d": 1}, separators=(',', ':'), ensure_ascii=False)
+        self._journal.write(line + "\n")
+        self._journal.flush()
+        self._journal_bytes += len(line) + 1
+
+        if self._journal_bytes >= self.max_journal_bytes:
+            self.compact()
+
+    def compact(self) -> None:
+        """Write a full snapshot atomically and truncate the journal."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, separators=(',', ':'), ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        # Anlık görüntü güvende; günlük artık boşaltılabilir
+        if self._journal is not None:
+            self._journal.close()
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self._open_journal()
+
+    def start(self) -> None:
+        """Start periodic background compaction."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def close(self) -> None:
+        """Stop background compaction, write a final snapshot and close the journal."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._journal_bytes:
+            self.compact()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            if not self._journal_bytes:
+                continue
+            try:
+                self.compact()
+            except OSError as e:
+                self.logger.error(f"Günlük sıkıştırılamadı ({self.path}): {e}")
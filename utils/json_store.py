@@ -0,0 +1,174 @@
+import os
+import copy
+import json
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+
+def write_json_atomic(path: str, text: str) -> None:
+    """
+    Replace ``path`` with ``text`` without ever leaving a half-written file.
+
+    :param path: Target file
+    :param text: Serialized JSON
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _Document:
+    __slots__ = ('path', 'data', 'indent', 'version', 'written', 'task', 'lock')
+
+    def __init__(self, path: str, data: Any, indent: Optional[int]):
+        self.path = path
+        self.data = data
+        self.indent = indent
+        self.version = 0  # Her değişiklikte artar
+        self.written = 0  # Diske yazılmış son sürüm
+        self.task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()  # Aynı dosyaya tek yazım
+
+    def dumps(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, indent=self.indent)
+
+
+class JsonDocumentStore:
+    def __init__(self, delay: float = 1.0):
+        """
+        In-memory JSON files with debounced, atomic write-back.
+
+        Each file is read once and its decoded object is shared by every
+        caller. After a change, :meth:`save` marks the document dirty and
+        schedules a write ``delay`` seconds later, so a burst of changes
+        costs one write. The document is serialized on the event loop (no
+        other code mutates it meanwhile) and written in a worker thread
+        through a temporary file and ``os.replace``.
+
+        :param delay: Seconds to collect changes before writing
+        """
+        self.delay = delay
+        self.logger = logging.getLogger(__name__)
+        self._documents: Dict[str, _Document] = {}
+        self.writes = 0
+
+    def load(self, path: str, default: Any = None, indent: Optional[int] = None) -> Any:
+        """
+        :param path: JSON file
+        :param default: Value used when the file is missing or unreadable (copied)
+        :param indent: Indentation used when writing the file
+        :return: Shared decoded document; call :meth:`save` after changing it
+        """
+        document = self._documents.get(path)
+        if document is None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = copy.deepcopy(default if default is not None else {})
+            except json.JSONDecodeError as e:
+                self.logger.warning(f"{path} okunamadı, varsayılan kullanılıyor: {e}")
+                data = copy.deepcopy(default if default is not None else {})
+            document = self._documents[path] = _Document(path, data, indent)
+        return document.data
+
+    def save(self, path: str, data: Any = None, indent: Optional[int] = None) -> None:
+        """
+        Mark a document dirty and schedule its write.
+
+        Outside a running event loop the file is written immediately.
+
+        :param path: JSON file
+        :param data: New document object (defaults to the loaded one)
+        :param indent: Indentation used when writing the file
+        """
+        document = self._documents.get(path)
+        if document is None:
+            document = self._documents[path] = _Document(path, {} if data is None else data, indent)
+        elif data is not None:
+            document.data = data
+        if indent is not None:
+            document.indent = indent
+        document.version += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_now(document)
+            return
+        if document.task is None or document.task.done():
+            document.task = loop.create_task(self._write_later(document))
+
+    async def _write_later(self, document: _Document):
+        await asyncio.sleep(self.delay)
+        # Yazım sürerken gelen değişiklikler bir sonraki turda yazılır
+        while document.written < document.version:
+            if not await self._write(document):
+                break
+
+    async def _write(self, document: _Document) -> bool:
+        async with document.lock:
+            version = document.version
+            if document.written >= version:
+                return True
+            text = document.dumps()
+            try:
+                await asyncio.to_thread(write_json_atomic, document.path, text)
+            except OSError as e:
+                # Bir sonraki save() veya flush() yeniden dener
+                self.logger.error(f"{document.path} yazılamadı: {e}")
+                return False
+            document.written = version
+            self.writes += 1
+            return True
+
+    def _write_now(self, document: _Document):
+        version = document.version
+        write_json_atomic(document.path, document.dumps())
+        document.written = version
+        self.writes += 1
+
+    def dirty(self) -> int:
+        """Number of documents with unwritten changes."""
+        return sum(1 for document in self._documents.values() if document.written < document.version)
+
+    async def flush(self) -> int:
+        """
+        Write every dirty document now.
+
+        :return: Number of written documents
+        """
+        written = 0
+        for document in list(self._documents.values()):
+            if document.written < document.version and await self._write(document):
+                written += 1
+            # Zamanlayıcı artık gereksiz; yazım ortasındaysa bitmesine izin ver
+            if document.task is not None and not document.task.done() and not document.lock.locked():
+                document.task.cancel()
+        return written
+
+    async def close(self) -> None:
+        """Write pending changes; the documents stay loaded."""
+        await self.flush()
+
+
+# Singleton pattern: every module shares one store (one in-memory copy per file)
+_store_instance: Optional[JsonDocumentStore] = None
+
+
+def get_json_store() -> JsonDocumentStore:
+    """
+    Get or create the shared JSON document store.
+
+    :return: JsonDocumentStore instance
+    """
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = JsonDocumentStore()
+    return _store_instance
@@ -0,0 +1,150 @@
+import math
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterable, List, NamedTuple, Tuple
+
+
+class LevelProgress(NamedTuple):
+    level: int
+    xp: int  # seviye içindeki XP
+    required: int  # sonraki seviye için gereken XP
+
+
+class LevelTable:
+    def __init__(self, threshold: Callable[[int], int], first_level: int = 0, size: int = 200):
+        """
+        Precomputed cumulative XP thresholds for one level formula.
+
+        ``threshold(level)`` is the total XP needed to reach ``level``; it is
+        evaluated once per level and cached in a sorted array, so lookups are
+        a binary search instead of powers or loops per message. The table
+        grows on demand for users beyond the precomputed range.
+
+        :param threshold: Total XP needed to reach a level, non-decreasing
+        :param first_level: Level of a user with 0 XP
+        :param size: Levels to precompute
+        """
+        self._threshold = threshold
+        self.first_level = first_level
+        self._thresholds = array('q')
+        self._extend(first_level + size)
+
+    @classmethod
+    def per_level(cls, cost: Callable[[int], int], first_level: int = 1, size: int = 200) -> "LevelTable":
+        """
+        Build from the XP needed to go from ``level`` to ``level + 1``.
+
+        :param cost: Per-level XP cost
+        :param first_level: Starting level
+        :param size: Levels to precompute
+        """
+        totals = {first_level: 0}
+
+        def threshold(level):
+            # Seviyeler sırayla hesaplandığından önceki toplam her zaman hazırdır
+            if level not in totals:
+                totals[level] = threshold(level - 1) + cost(level - 1)
+            return totals[level]
+
+        return cls(threshold, first_level, size)
+
+    def _extend(self, last_level: int):
+        for level in range(self.first_level + len(self._thresholds), last_level + 1):
+            self._thresholds.append(self._threshold(level))
+
+    def _extend_to_xp(self, total_xp: int):
+        while self._thresholds[-1] <= total_xp:
+            self._extend(self.first_level + len(self._thresholds) * 2)
+
+    def threshold(self, level: int) -> int:
+        """
+        :param level: Level
+        :return: Total XP needed to reach ``level``
+        """
+        if level <= self.first_level:
+            return 0
+        index = level - self.first_level
+        if index >= len(self._thresholds):
+            self._extend(level)
+        return self._thresholds[index]
+
+    def cost(self, level: int) -> int:
+        """
+        :param level: Current level
+        :return: XP needed to go from ``level`` to ``level + 1``
+        """
+        return self.threshold(level + 1) - self.threshold(level)
+
+    def level_for_xp(self, total_xp: int) -> int:
+        """
+        :param total_xp: Total XP
+        :return: Level reached with ``total_xp``
+        """
+        self._extend_to_xp(total_xp)
+        return self.first_level + max(bisect_right(self._thresholds, total_xp) - 1, 0)
+
+    def progress_for_xp(self, total_xp: int) -> LevelProgress:
+        """
+        :param total_xp: Total XP
+        :return: Level, XP inside that level and XP needed for the next one
+        """
+        level = self.level_for_xp(total_xp)
+        base = self.threshold(level)
+        return LevelProgress(level, total_xp - base, self.threshold(level + 1) - base)
+
+    def advance(self, level: int, xp: int) -> Tuple[int, int]:
+        """
+        Apply level-ups for profiles that store XP inside the current level.
+
+        :param level: Stored level
+        :param xp: Stored XP inside ``level``
+        :return: New level and the remaining XP inside it
+        """
+        if xp < self.cost(level):
+            return level, xp
+        total = self.threshold(level) + xp
+        new_level = self.level_for_xp(total)
+        return new_level, total - self.threshold(new_level)
+
+    def levels_for_xp(self, totals: Iterable[int]) -> List[int]:
+        """
+        Bulk :meth:`level_for_xp`, e.g. to recompute every stored level after
+        a formula change. Inputs are sorted once and matched against the
+        table in a single merge pass.
+
+        :param totals: Total XP values
+        :return: Levels in the same order as ``totals``
+        """
+        totals = list(totals)
+        if not totals:
+            return []
+        self._extend_to_xp(max(totals))
+        thresholds = self._thresholds
+        result = [0] * len(totals)
+        index = 0
+        for position in sorted(range(len(totals)), key=totals.__getitem__):
+            value = totals[position]
+            while index + 1 < len(thresholds) and thresholds[index + 1] <= value:
+                index += 1
+            result[position] = self.first_level + index
+        return result
+
+
+def _power_threshold(level: int) -> int:
+    # int(xp ** 0.4 / 4) >= level olan en küçük XP; kayan nokta sınırları düzeltilir
+    if level <= 0:
+        return 0
+    xp = math.ceil((level * 4) ** 2.5)
+    while int(xp ** 0.4 / 4) < level:
+        xp += 1
+    while xp > 0 and int((xp - 1) ** 0.4 / 4) >= level:
+        xp -= 1
+    return xp
+
+
+# main.py Profile ve cogs/leveling.py: seviye başına level * 100 XP
+LINEAR_LEVELS = LevelTable.per_level(lambda level: level * 100, first_level=1)
+# cogs/profile_cog.py: seviye başına int(100 * level ** 1.5) XP
+POWER_LEVELS = LevelTable.per_level(lambda level: int(100 * (level ** 1.5)), first_level=1)
+# cogs/profiles.py: toplam XP ile seviye = int(xp ** 0.4 / 4)
+PROFILE_LEVELS = LevelTable(_power_threshold, first_level=0)
@@ -0,0 +1,185 @@
+import os
+import gzip
+import json
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, IO, List, Optional, Tuple
+
+_COLUMNS = ('id', 'guild_id', 'event_type', 'user_id', 'target_id', 'content', 'timestamp')
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment: datetime) -> datetime:
+    return (month_start(moment) + timedelta(days=32)).replace(day=1)
+
+
+class LogArchive:
+    def __init__(self, namespace, directory: str = 'logs_archive', batch_size: int = 5000,
+                 interval: float = 6 * 3600):
+        """
+        Monthly partitions for the ``logs`` table.
+
+        ``{logs}`` only holds the current month (the hot partition), so
+        inserts and full-text searches never touch history. Earlier months
+        are moved to one gzip-compressed JSONL file per guild and month
+        (``<directory>/<guild_id>/<YYYY-MM>.jsonl.gz``), which can still be
+        searched on demand. Per-guild retention deletes both hot rows and
+        archive files older than the configured number of days.
+
+        :param namespace: Storage namespace that owns ``{logs}``
+        :param directory: Archive root directory
+        :param batch_size: Rows moved per read/delete round
+        :param interval: Seconds between background maintenance runs
+        """
+        self.namespace = namespace
+        self.directory = directory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self.retention: Optional[Callable[[], Awaitable[Dict[int, int]]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _path(self, guild_id: int, month: str) -> str:
+        return os.path.join(self.directory, str(guild_id), f"{month}.jsonl.gz")
+
+    def archive_before(self, cutoff: datetime) -> int:
+        """
+        Move every row older than ``cutoff`` into the monthly archives.
+
+        Rows are appended to the archive (as an extra gzip member) before
+        they are deleted, so a crash can at worst duplicate rows in an
+        archive, never lose them.
+
+        :param cutoff: Usually the start of the current month
+        :return: Number of archived rows
+        """
+        cutoff_text = cutoff.isoformat()
+        moved = 0
+        last_id = 0
+        while True:
+            rows = self.namespace.fetchall(
+                f"SELECT {', '.join(_COLUMNS)} FROM {{logs}} "
+                "WHERE timestamp < ? AND id > ? ORDER BY id LIMIT ?",
+                (cutoff_text, last_id, self.batch_size)
+            )
+            if not rows:
+                break
+
+            files: Dict[Tuple[int, str], IO[str]] = {}
+            try:
+                for row in rows:
+                    key = (row[1], row[6][:7])
+                    handle = files.get(key)
+                    if handle is None:
+                        path = self._path(*key)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        handle = files[key] = gzip.open(path, 'at', encoding='utf-8')
+                    handle.write(json.dumps(dict(zip(_COLUMNS, row)), ensure_ascii=False) + "\n")
+            finally:
+                for handle in files.values():
+                    handle.close()
+
+            # Yeni kayıtların id'si her zaman daha büyüktür; aralık tam olarak bu partidir
+            self.namespace.execute(
+                "DELETE FROM {logs} WHERE timestamp < ? AND id > ? AND id <= ?",
+                (cutoff_text, last_id, rows[-1][0])
+            )
+            moved += len(rows)
+            last_id = rows[-1][0]
+
+        if moved:
+            self.logger.info(f"{moved} log kaydı arşivlendi")
+        return moved
+
+    def apply_retention(self, guild_id: int, days: int, now: Optional[datetime] = None) -> int:
+        """
+        Delete a guild's logs older than ``days``.
+
+        :param guild_id: Discord guild ID
+        :param days: Days to keep
+        :param now: Current time
+        :return: Number of deleted hot rows plus removed archive files
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        removed = self.namespace.execute(
+            "DELETE FROM {logs} WHERE guild_id = ? AND timestamp < ?", (guild_id, cutoff.isoformat())
+        )
+        for month in self.archived_months(guild_id):
+            # Yalnızca tamamı süre dışında kalan aylar silinir
+            if next_month(datetime.strptime(month, "%Y-%m")) <= cutoff:
+                os.remove(self._path(guild_id, month))
+                removed += 1
+        return removed
+
+    def archived_months(self, guild_id: int) -> List[str]:
+        """
+        :param guild_id: Discord guild ID
+        :return: Archived months (``YYYY-MM``), oldest first
+        """
+        try:
+            names = os.listdir(os.path.join(self.directory, str(guild_id)))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".jsonl.gz")] for name in names if name.endswith(".jsonl.gz"))
+
+    def search(self, guild_id: int, month: str, terms: List[str], limit: int = 10) -> List[dict]:
+        """
+        Scan one archived month for rows containing every term.
+
+        :param guild_id: Discord guild ID
+        :param month: ``YYYY-MM``
+        :param terms: Case-insensitive terms matched against content and event type
+        :param limit: Maximum results
+        :return: Matching rows, newest first
+        """
+        terms = [term.lower() for term in terms]
+        matches = deque(maxlen=limit)
+        seen = set()
+        try:
+            with gzip.open(self._path(guild_id, month), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    text = f"{row['content'] or ''} {row['event_type'] or ''}".lower()
+                    if all(term in text for term in terms) and row['id'] not in seen:
+                        seen.add(row['id'])
+                        matches.append(row)
+        except FileNotFoundError:
+            return []
+        return list(reversed(matches))
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Archive closed months and apply retention, off the event loop.
+
+        :param now: Current time
+        :return: Number of archived rows
+        """
+        now = now or datetime.now()
+        moved = await asyncio.to_thread(self.archive_before, month_start(now))
+        if self.retention is not None:
+            for guild_id, days in (await self.retention()).items():
+                await asyncio.to_thread(self.apply_retention, guild_id, days, now)
+        return moved
+
+    def start(self) -> None:
+        """Start the background maintenance loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.logger.error(f"Log arşivleme başarısız: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+# Discord sınırları
+_MAX_EMBEDS = 10
+_MAX_MESSAGE_CHARS = 6000
+_MAX_DESCRIPTION = 4096
+
+
+class _ChannelBuffer:
+    __slots__ = ('channel', 'events', 'task')
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        # (olay tipi, embed, özet satırı)
+        self.events: List[Tuple[str, discord.Embed, str]] = []
+        self.task: Optional[asyncio.Task] = None
+
+
+class LogDelivery:
+    def __init__(self, window: float = 2.0, burst_threshold: int = 5):
+        """
+        Per-log-channel outbound buffer.
+
+        Events queued for a channel within ``window`` seconds are sent
+        together, up to 10 embeds per message. When one event type occurs
+        ``burst_threshold`` times or more in a window (mass deletes, raids),
+        those embeds are collapsed into a single summary embed, so delivery
+        keeps up with the burst instead of queueing hundreds of sends behind
+        the rate limit.
+
+        :param window: Seconds to collect events before sending
+        :param burst_threshold: Events of one type that trigger a summary
+        """
+        self.window = window
+        self.burst_threshold = burst_threshold
+        self.logger = logging.getLogger(__name__)
+        self._buffers: Dict[int, _ChannelBuffer] = {}
+        self.events = 0
+        self.sends = 0
+
+    def enqueue(self, channel: discord.abc.Messageable, event_type: str, embed: discord.Embed,
+                summary: str) -> None:
+        """
+        :param channel: Log channel
+        :param event_type: Event type, e.g. ``member_join``
+        :param embed: Full embed for this event
+        :param summary: One-line description used in a burst summary
+        """
+        buffer = self._buffers.get(channel.id)
+        if buffer is None:
+            buffer = self._buffers[channel.id] = _ChannelBuffer(channel)
+            buffer.task = asyncio.get_running_loop().create_task(self._send_later(channel.id))
+        buffer.events.append((event_type, embed, summary))
+        self.events += 1
+
+    async def _send_later(self, channel_id: int):
+        await asyncio.sleep(self.window)
+        await self._send(channel_id)
+
+    def _collapse(self, events: List[Tuple[str, discord.Embed, str]]) -> List[discord.Embed]:
+        counts: Dict[str, int] = {}
+        for event_type, _, _ in events:
+            counts[event_type] = counts.get(event_type, 0) + 1
+
+        embeds = []
+        summarized = set()
+        for event_type, embed, _ in events:
+            if counts[event_type] < self.burst_threshold:
+                embeds.append(embed)
+            elif event_type not in summarized:
+                # Özet, türün ilk olayının sırasına yerleşir
+                summarized.add(event_type)
+                lines = [summary for kind, _, summary in events if kind == event_type]
+                embeds.append(self._summary_embed(event_type, embed.color, lines))
+        return embeds
+
+    def _summary_embed(self, event_type: str, color, lines: List[str]) -> discord.Embed:
+        description = ""
+        shown = 0
+        for line in lines:
+            if len(description) + len(line) + 40 > _MAX_DESCRIPTION:
+                break
+            description += f"{line}\n"
+            shown += 1
+        if shown < len(lines):
+            description += f"... ve {len(lines) - shown} olay daha"
+        return discord.Embed(
+            title=f"📝 {event_type.replace('_', ' ').title()} ×{len(lines)}",
+            description=description or None,
+            color=color,
+        ).set_footer(text=f"{self.window:g} saniye içinde {len(lines)} olay")
+
+    async def _send(self, channel_id: int):
+        buffer = self._buffers.pop(channel_id, None)
+        if buffer is None or not buffer.events:
+            return
+
+        batch: List[discord.Embed] = []
+        size = 0
+        for embed in self._collapse(buffer.events):
+            embed_size = len(embed)
+            if batch and (len(batch) == _MAX_EMBEDS or size + embed_size > _MAX_MESSAGE_CHARS):
+                if not await self._deliver(buffer.channel, batch):
+                    return
+                batch, size = [], 0
+            batch.append(embed)
+            size += embed_size
+        await self._deliver(buffer.channel, batch)
+
+    async def _deliver(self, channel, embeds: List[discord.Embed]) -> bool:
+        try:
+            await channel.send(embeds=embeds)
+        except discord.Forbidden:
+            return False
+        except discord.HTTPException as e:
+            self.logger.error(f"Log mesajı gönderilemedi ({channel.id}): {e}")
+            return False
+        self.sends += 1
+        return True
+
+    async def flush(self) -> None:
+        """Send every pending buffer now."""
+        for channel_id in list(self._buffers):
+            buffer = self._buffers.get(channel_id)
+            if buffer is not None and buffer.task is not None:
+                buffer.task.cancel()
+            await self._send(channel_id)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Sequence
+
+
+class LogQueue:
+    def __init__(self, namespace, sql: str, flush_interval: float = 0.25,
+                 max_batch: int = 200, max_pending: int = 5000):
+        """
+        Buffered, batched inserts for high-volume log rows.
+
+        Rows are queued in memory and written with one ``executemany`` per
+        batch, in a worker thread so the event loop never waits on a commit.
+        A batch is written every ``flush_interval`` seconds or as soon as
+        ``max_batch`` rows are queued. Once ``max_pending`` rows are waiting,
+        :meth:`put` blocks until the next flush (backpressure).
+
+        :param namespace: Storage namespace that owns the table
+        :param sql: ``INSERT`` statement, may use ``{table}`` placeholders
+        :param flush_interval: Maximum seconds a row waits in memory
+        :param max_batch: Rows that trigger an immediate flush
+        :param max_pending: Rows queued before producers have to wait
+        """
+        self.namespace = namespace
+        self.sql = sql
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.logger = logging.getLogger(__name__)
+
+        self._rows: List[Sequence[Any]] = []
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def put(self, row: Sequence[Any]) -> None:
+        """
+        Queue one row.
+
+        :param row: Parameters for :attr:`sql`
+        """
+        while len(self._rows) >= self.max_pending:
+            self._drained.clear()
+            self._wakeup.set()
+            await self._drained.wait()
+        self._rows.append(row)
+        if len(self._rows) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Write every queued row now.
+
+        :return: Number of rows written
+        """
+        async with self._flush_lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                self._drained.set()
+                return 0
+            try:
+                await asyncio.to_thread(self.namespace.executemany, self.sql, rows)
+            except Exception as e:
+                self.logger.error(f"Log kayıtları yazılamadı ({len(rows)} satır): {e}")
+                # Sonraki denemeye bırak; sınırı aşan en eski satırlar düşer
+                self._rows = rows + self._rows
+                overflow = len(self._rows) - self.max_pending
+                if overflow > 0:
+                    del self._rows[:overflow]
+                    self.dropped += overflow
+                return 0
+            finally:
+                self._drained.set()
+
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the flush loop and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
@@ -0,0 +1,177 @@
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+# Aşama sıraları: küçük değer önce çalışır
+STAGE_MODERATION = 100
+STAGE_ANTISPAM = 200
+STAGE_XP = 300
+STAGE_ACHIEVEMENTS = 400
+
+
+class MessageContext:
+    """Per-message state shared by every pipeline stage."""
+
+    __slots__ = ('message', 'author_id', 'guild_id', 'channel_id', 'received_at',
+                 'deleted', 'halted', 'data', '_content_lower')
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.author_id = message.author.id
+        self.guild_id = message.guild.id if message.guild else None
+        self.channel_id = message.channel.id
+        self.received_at = time.monotonic()
+        self.deleted = False
+        self.halted = False
+        self.data: Dict[str, object] = {}
+        self._content_lower = None
+
+    @property
+    def content_lower(self) -> str:
+        """Lower-cased message content, computed once per message."""
+        if self._content_lower is None:
+            self._content_lower = self.message.content.lower()
+        return self._content_lower
+
+    async def delete(self) -> bool:
+        """
+        Delete the message and mark it so later stages skip XP and rewards.
+
+        :return: Whether the message was deleted by this call
+        """
+        if self.deleted:
+            return False
+        try:
+            await self.message.delete()
+        except (discord.NotFound, discord.Forbidden):
+            return False
+        self.deleted = True
+        return True
+
+    def halt(self) -> None:
+        """Stop the pipeline after the current stage."""
+        self.halted = True
+
+
+StageHandler = Callable[[MessageContext], Awaitable[None]]
+
+
+class Stage:
+    __slots__ = ('name', 'order', 'handler', 'run_on_deleted', 'run_in_dms',
+                 'calls', 'total_ns', 'max_ns', 'errors')
+
+    def __init__(self, name: str, order: int, handler: StageHandler, run_on_deleted: bool, run_in_dms: bool):
+        self.name = name
+        self.order = order
+        self.handler = handler
+        self.run_on_deleted = run_on_deleted
+        self.run_in_dms = run_in_dms
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.errors = 0
+
+
+class MessagePipeline:
+    def __init__(self, bot):
+        """
+        Single on_message dispatcher running registered stages in order.
+
+        Messages from bots never reach any stage. Direct messages only reach
+        stages registered with ``run_in_dms=True``; everything else (filters,
+        spam checks) assumes ``ctx.guild_id`` is set.
+
+        :param bot: Bot instance the listener is attached to
+        """
+        self.bot = bot
+        self.logger = logging.getLogger(__name__)
+        self._stages: List[Stage] = []
+        self.messages = 0
+        self.skipped = 0
+        bot.add_listener(self.dispatch, 'on_message')
+
+    def register(self, name: str, order: int, handler: StageHandler,
+                 run_on_deleted: bool = False, run_in_dms: bool = False) -> None:
+        """
+        Register (or replace) a stage.
+
+        :param name: Unique stage name, e.g. ``"moderation.banned_words"``
+        :param order: Position in the pipeline, see the ``STAGE_*`` constants
+        :param handler: Coroutine receiving the shared :class:`MessageContext`
+        :param run_on_deleted: Run even when an earlier stage deleted the message
+        :param run_in_dms: Also run for direct messages
+        """
+        self.unregister(name)
+        self._stages.append(Stage(name, order, handler, run_on_deleted, run_in_dms))
+        self._stages.sort(key=lambda stage: stage.order)
+
+    def unregister(self, name: str) -> None:
+        self._stages = [stage for stage in self._stages if stage.name != name]
+
+    async def dispatch(self, message: discord.Message) -> None:
+        # Ortak filtre: botlar hiçbir aşamaya girmez
+        if message.author.bot:
+            self.skipped += 1
+            return
+
+        self.messages += 1
+        ctx = MessageContext(message)
+        is_dm = ctx.guild_id is None
+        for stage in self._stages:
+            if ctx.halted:
+                break
+            if is_dm and not stage.run_in_dms:
+                continue
+            if ctx.deleted and not stage.run_on_deleted:
+                continue
+
+            started = time.perf_counter_ns()
+            try:
+                await stage.handler(ctx)
+            except Exception as e:
+                stage.errors += 1
+                self.logger.error(f"Mesaj aşaması hatası ({stage.name}): {e}")
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                stage.calls += 1
+                stage.total_ns += elapsed
+                if elapsed > stage.max_ns:
+                    stage.max_ns = elapsed
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage timing counters.
+
+        :return: Mapping of stage name to calls, errors, average and max milliseconds
+        """
+        return {
+            stage.name: {
+                "calls": stage.calls,
+                "errors": stage.errors,
+                "avg_ms": (stage.total_ns / stage.calls / 1e6) if stage.calls else 0.0,
+                "max_ms": stage.max_ns / 1e6
+            }
+            for stage in self._stages
+        }
+
+    def reset_stats(self) -> None:
+        self.messages = 0
+        self.skipped = 0
+        for stage in self._stages:
+            stage.calls = stage.total_ns = stage.max_ns = stage.errors = 0
+
+
+def get_message_pipeline(bot) -> MessagePipeline:
+    """
+    Get or create the bot's message pipeline.
+
+    :param bot: Bot instance
+    :return: MessagePipeline instance
+    """
+    pipeline: Optional[MessagePipeline] = getattr(bot, 'message_pipeline', None)
+    if pipeline is None:
+        pipeline = MessagePipeline(bot)
+        bot.message_pipeline = pipeline
+    return pipeline
@@ -0,0 +1,210 @@
+import math
+import logging
+import time
+import asyncio
+from array import array
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple
+
+DEFAULT_RAID_SETTINGS = {
+    'join_threshold': 5,  # X kişi
+    'join_interval': 10,  # Y saniye içinde
+    'message_threshold': 5,  # Z mesaj
+    'message_interval': 3,  # W saniye içinde
+    'punishment': 'kick',  # kick, ban, or mute
+    'raid_mode_duration': 30  # dakika
+}
+
+
+class GuildRaidState:
+    """Anti-raid state of one guild, kept compact for very large guilds."""
+
+    __slots__ = ('_joins', '_join_head', '_join_count', 'spam_warnings', 'raid_mode',
+                 'raid_mode_expires', 'raid_mode_channel_id', 'whitelist', 'settings')
+
+    JOIN_HISTORY = 10
+    # Bir spam uyarısının silinmesi için geçmesi gereken süre (saniye)
+    WARNING_DECAY = 600.0
+
+    def __init__(self):
+        self._joins = array('d', [0.0]) * self.JOIN_HISTORY
+        self._join_head = 0
+        self._join_count = 0
+        # user_id -> (uyarı sayısı, son uyarı zamanı)
+        self.spam_warnings: Dict[int, Tuple[float, float]] = {}
+        self.raid_mode = False
+        self.raid_mode_expires: Optional[float] = None
+        # Otomatik kapanma bildiriminin gideceği kanal (None: raid-log)
+        self.raid_mode_channel_id: Optional[int] = None
+        self.whitelist: Set[int] = set()
+        self.settings = dict(DEFAULT_RAID_SETTINGS)
+
+    def record_join(self, now: Optional[float] = None) -> None:
+        """
+        Store a join time in the fixed-size ring.
+
+        :param now: Monotonic timestamp
+        """
+        if now is None:
+            now = time.monotonic()
+        capacity = max(self.JOIN_HISTORY, self.settings['join_threshold'])
+        if len(self._joins) < capacity:
+            self._grow_joins(capacity)
+        self._joins[self._join_head] = now
+        self._join_head = (self._join_head + 1) % len(self._joins)
+        self._join_count = min(self._join_count + 1, len(self._joins))
+
+    def _grow_joins(self, capacity: int):
+        ordered = self._ordered_joins()
+        self._joins = array('d', ordered) + array('d', [0.0]) * (capacity - len(ordered))
+        self._join_head = len(ordered) % capacity
+
+    def _ordered_joins(self):
+        size = len(self._joins)
+        start = (self._join_head - self._join_count) % size
+        return [self._joins[(start + i) % size] for i in range(self._join_count)]
+
+    def join_burst(self) -> bool:
+        """
+        :return: Whether the last ``join_threshold`` joins happened within ``join_interval`` seconds
+        """
+        threshold = self.settings['join_threshold']
+        if threshold <= 0 or self._join_count < threshold:
+            return False
+        size = len(self._joins)
+        newest = self._joins[(self._join_head - 1) % size]
+        oldest = self._joins[(self._join_head - threshold) % size]
+        return newest - oldest <= self.settings['join_interval']
+
+    def add_spam_warning(self, user_id: int, now: Optional[float] = None) -> int:
+        """
+        Add a spam warning; earlier warnings decay over time.
+
+        :param user_id: Discord user ID
+        :param now: Monotonic timestamp
+        :return: Active warnings including this one
+        """
+        if now is None:
+            now = time.monotonic()
+        count = self.active_warnings(user_id, now) + 1
+        self.spam_warnings[user_id] = (count, now)
+        return math.ceil(count)
+
+    def active_warnings(self, user_id: int, now: Optional[float] = None) -> float:
+        entry = self.spam_warnings.get(user_id)
+        if entry is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        count, last = entry
+        return max(0.0, count - (now - last) / self.WARNING_DECAY)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Drop users whose warnings have fully decayed.
+
+        :param now: Monotonic timestamp
+        :return: Number of evicted users
+        """
+        if now is None:
+            now = time.monotonic()
+        idle = [user_id for user_id in self.spam_warnings if self.active_warnings(user_id, now) <= 0.0]
+        for user_id in idle:
+            del self.spam_warnings[user_id]
+        return len(idle)
+
+    def enable_raid_mode(self, minutes: float, channel_id: Optional[int] = None,
+                         now: Optional[float] = None) -> None:
+        """
+        :param minutes: Raid mode duration
+        :param channel_id: Channel notified when raid mode expires (``None`` for raid-log)
+        :param now: Monotonic timestamp
+        """
+        if now is None:
+            now = time.monotonic()
+        self.raid_mode = True
+        self.raid_mode_expires = now + minutes * 60
+        self.raid_mode_channel_id = channel_id
+
+    def disable_raid_mode(self) -> None:
+        self.raid_mode = False
+        self.raid_mode_expires = None
+        self.raid_mode_channel_id = None
+
+    def raid_mode_remaining(self, now: Optional[float] = None) -> float:
+        """
+        :return: Seconds until raid mode expires (0 when inactive)
+        """
+        if not self.raid_mode or self.raid_mode_expires is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        return max(0.0, self.raid_mode_expires - now)
+
+
+class RaidStates:
+    def __init__(self, sweep_interval: float = 30.0):
+        """
+        Guild ID -> :class:`GuildRaidState` map with background upkeep.
+
+        The sweeper evicts users whose spam warnings have decayed and turns
+        off raid modes whose deadline has passed, calling ``on_raid_mode_expired``
+        with the guild ID and notification channel so the owner can announce it.
+
+        :param sweep_interval: Seconds between sweeps
+        """
+        self.sweep_interval = sweep_interval
+        self.on_raid_mode_expired: Optional[Callable[[int, Optional[int]], Awaitable[None]]] = None
+        self._states: Dict[int, GuildRaidState] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __getitem__(self, guild_id: int) -> GuildRaidState:
+        state = self._states.get(guild_id)
+        if state is None:
+            state = self._states[guild_id] = GuildRaidState()
+        return state
+
+    def get(self, guild_id: int) -> Optional[GuildRaidState]:
+        return self._states.get(guild_id)
+
+    def items(self) -> Iterator[Tuple[int, GuildRaidState]]:
+        return iter(list(self._states.items()))
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Evict idle users and expire raid modes.
+
+        :param now: Monotonic timestamp
+        :return: Number of evicted users
+        """
+        if now is None:
+            now = time.monotonic()
+        evicted = 0
+        for guild_id, state in self.items():
+            evicted += state.evict_idle(now)
+            if state.raid_mode and state.raid_mode_expires is not None and state.raid_mode_expires <= now:
+                channel_id = state.raid_mode_channel_id
+                state.disable_raid_mode()
+                if self.on_raid_mode_expired is not None:
+                    try:
+                        await self.on_raid_mode_expired(guild_id, channel_id)
+                    except Exception as e:
+                        logging.getLogger(__name__).error(f"Raid modu bitiş bildirimi gönderilemedi: {e}")
+        return evicted
+
+    def start_sweeper(self) -> None:
+        """Start the background sweep."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop_sweeper(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
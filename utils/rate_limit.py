@@ -0,0 +1,120 @@
+import time
+import asyncio
+from typing import Dict, Hashable, NamedTuple, Optional
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float
+
+
+class Limit:
+    __slots__ = ('rate', 'per', 'interval', 'tolerance')
+
+    def __init__(self, rate: int, per: float, burst: Optional[int] = None):
+        """
+        :param rate: Events allowed per ``per`` seconds
+        :param per: Period in seconds
+        :param burst: Events allowed back to back (defaults to ``rate``)
+        """
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate ve per pozitif olmalı")
+        self.rate = rate
+        self.per = per
+        self.interval = per / rate
+        self.tolerance = self.interval * ((burst or rate) - 1)
+
+
+class RateLimiter:
+    def __init__(self, rate: int, per: float, burst: Optional[int] = None, sweep_interval: float = 60.0):
+        """
+        GCRA (generic cell rate algorithm) limiter.
+
+        Each key stores a single float, its theoretical arrival time, so memory
+        is O(1) per key. Limits can be overridden per scope (usually a guild).
+
+        :param rate: Default events allowed per ``per`` seconds
+        :param per: Default period in seconds
+        :param burst: Default burst size (defaults to ``rate``)
+        :param sweep_interval: Seconds between background evictions of idle keys
+        """
+        self.default = Limit(rate, per, burst)
+        self.sweep_interval = sweep_interval
+        self._limits: Dict[Hashable, Limit] = {}
+        self._tat: Dict[Hashable, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def set_limit(self, scope: Hashable, rate: int, per: float, burst: Optional[int] = None) -> None:
+        """
+        Override the limit for one scope, e.g. a guild ID.
+
+        :param scope: Scope passed to :meth:`hit`
+        :param rate: Events allowed per ``per`` seconds
+        :param per: Period in seconds
+        :param burst: Burst size (defaults to ``rate``)
+        """
+        self._limits[scope] = Limit(rate, per, burst)
+
+    def remove_limit(self, scope: Hashable) -> None:
+        self._limits.pop(scope, None)
+
+    def get_limit(self, scope: Hashable = None) -> Limit:
+        return self._limits.get(scope, self.default)
+
+    def hit(self, key: Hashable, scope: Hashable = None, now: Optional[float] = None) -> RateLimitResult:
+        """
+        Try to consume one event for ``key``.
+
+        :param key: e.g. a user ID or ``(guild_id, user_id)``
+        :param scope: Scope whose limit applies, ``None`` for the default
+        :param now: Monotonic timestamp, defaults to ``time.monotonic()``
+        :return: Whether the event is allowed and seconds until it would be
+        """
+        if now is None:
+            now = time.monotonic()
+        limit = self._limits.get(scope, self.default) if scope is not None else self.default
+
+        tat = self._tat.get(key, now)
+        if tat < now:
+            tat = now
+        allow_at = tat - limit.tolerance
+        if now < allow_at:
+            return RateLimitResult(False, allow_at - now)
+
+        self._tat[key] = tat + limit.interval
+        return RateLimitResult(True, 0.0)
+
+    def reset(self, key: Hashable) -> None:
+        self._tat.pop(key, None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Drop keys whose state has fully recovered (same as an unseen key).
+
+        :param now: Monotonic timestamp
+        :return: Number of evicted keys
+        """
+        if now is None:
+            now = time.monotonic()
+        idle = [key for key, tat in self._tat.items() if tat <= now]
+        for key in idle:
+            del self._tat[key]
+        return len(idle)
+
+    def start_sweeper(self) -> None:
+        """Start evicting idle keys in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop_sweeper(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def __len__(self) -> int:
+        return len(self._tat)
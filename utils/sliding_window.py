@@ -0,0 +1,102 @@
+import time
+import asyncio
+from array import array
+from typing import Dict, Hashable, Optional
+
+
+class _Ring:
+    __slots__ = ('times', 'head', 'last')
+
+    def __init__(self, capacity: int):
+        self.times = array('d', [float('-inf')]) * capacity
+        self.head = 0
+        self.last = float('-inf')
+
+
+class SlidingWindowCounter:
+    def __init__(self, limit: int, window: float, sweep_interval: Optional[float] = None):
+        """
+        Per-key event counter over a sliding time window.
+
+        Each key keeps a fixed-size ring of ``limit + 1`` monotonic timestamps,
+        which is enough to tell whether more than ``limit`` events happened in
+        the last ``window`` seconds. Keys idle for longer than the window are
+        dropped by :meth:`sweep`, so memory follows the number of active keys.
+
+        :param limit: Events allowed inside the window
+        :param window: Window length in seconds
+        :param sweep_interval: Seconds between background sweeps (defaults to the window)
+        """
+        self.limit = limit
+        self.window = window
+        self.sweep_interval = sweep_interval or window
+        self._capacity = limit + 1
+        self._rings: Dict[Hashable, _Ring] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def hit(self, key: Hashable, now: Optional[float] = None) -> int:
+        """
+        Record an event for ``key``.
+
+        :param key: e.g. a user ID
+        :param now: Monotonic timestamp, defaults to ``time.monotonic()``
+        :return: Events inside the window including this one, capped at ``limit + 1``
+        """
+        if now is None:
+            now = time.monotonic()
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _Ring(self._capacity)
+
+        ring.times[ring.head] = now
+        ring.head = (ring.head + 1) % self._capacity
+        ring.last = now
+
+        cutoff = now - self.window
+        return sum(1 for t in ring.times if t > cutoff)
+
+    def exceeded(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """
+        Record an event and report whether ``key`` went over the limit.
+
+        :param key: e.g. a user ID
+        :param now: Monotonic timestamp
+        :return: ``True`` when more than ``limit`` events fall inside the window
+        """
+        return self.hit(key, now) > self.limit
+
+    def reset(self, key: Hashable) -> None:
+        self._rings.pop(key, None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Drop keys whose last event is older than the window.
+
+        :param now: Monotonic timestamp
+        :return: Number of evicted keys
+        """
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window
+        idle = [key for key, ring in self._rings.items() if ring.last <= cutoff]
+        for key in idle:
+            del self._rings[key]
+        return len(idle)
+
+    def start_sweeper(self) -> None:
+        """Start evicting idle keys in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop_sweeper(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def __len__(self) -> int:
+        return len(self._rings)
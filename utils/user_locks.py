@@ -0,0 +1,83 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class StripedLock:
+    def __init__(self, stripes: int = 256):
+        """
+        Fixed pool of asyncio locks shared by hashing keys (usually user IDs).
+
+        Memory stays constant no matter how many users there are, and
+        different users only wait for each other when they hash to the same
+        stripe. Use it around read-modify-write sequences that ``await``
+        between the read and the write (balance checks, purchases, bets).
+
+        :param stripes: Number of locks
+        """
+        if stripes <= 0:
+            raise ValueError("stripes pozitif olmalı")
+        self._locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(stripes)]
+        self.acquisitions = 0
+        self.contended = 0
+
+    def _index(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    def stripe(self, key: Hashable) -> asyncio.Lock:
+        """
+        :param key: Lock key
+        :return: Lock guarding ``key``
+        """
+        return self._locks[self._index(key)]
+
+    @asynccontextmanager
+    async def hold(self, *keys: Hashable) -> AsyncIterator[None]:
+        """
+        Critical section for one or more keys, e.g. both sides of a transfer.
+
+        Stripes are acquired in index order, so two sections over the same
+        keys in a different order cannot deadlock.
+
+        :param keys: Lock keys
+        """
+        locks = [self._locks[i] for i in sorted({self._index(key) for key in keys})]
+        acquired = []
+        try:
+            for lock in locks:
+                self.acquisitions += 1
+                if lock.locked():
+                    self.contended += 1
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Run a read-modify-write coroutine as one critical section for ``key``.
+
+        :param key: Lock key
+        :param func: Coroutine function
+        :return: Result of ``func``
+        """
+        async with self.hold(key):
+            return await func(*args, **kwargs)
+
+
+def get_user_locks(bot) -> StripedLock:
+    """
+    Get or create the bot's per-user lock pool.
+
+    :param bot: Bot instance
+    :return: StripedLock instance
+    """
+    locks: Optional[StripedLock] = getattr(bot, 'user_locks', None)
+    if locks is None:
+        locks = StripedLock()
+        bot.user_locks = locks
+    return locks
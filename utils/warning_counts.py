@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Bu süreden eski uyarılar ceza eşiklerinde sayılmaz (geçmişte kalmaya devam eder)
+WARNING_TTL = timedelta(days=30)
+
+
+def warning_cutoff(now: Optional[datetime] = None, sql_timestamp: bool = False) -> str:
+    """
+    :param now: Current time (local for ``isoformat`` tables, UTC for ``CURRENT_TIMESTAMP`` ones)
+    :param sql_timestamp: Format like SQLite's ``CURRENT_TIMESTAMP`` instead of ``isoformat()``
+    :return: Oldest timestamp that still counts as an active warning
+    """
+    if now is None:
+        now = datetime.utcnow() if sql_timestamp else datetime.now()
+    cutoff = now - WARNING_TTL
+    return cutoff.strftime('%Y-%m-%d %H:%M:%S') if sql_timestamp else cutoff.isoformat()
+
+
+def active_warnings(namespace, user_id: int, guild_id: int, cutoff: str) -> int:
+    """
+    Active warning count of a user, normally a single primary-key lookup.
+
+    ``{warning_counts}`` is maintained by triggers on ``{warnings}`` (see
+    migrations.py), inside the same transaction as every insert. It is
+    recounted only when its oldest counted warning has expired or a
+    warning was deleted, so each warning causes at most one recount.
+
+    :param namespace: Storage namespace owning ``{warnings}`` and ``{warning_counts}``
+    :param user_id: Discord user ID
+    :param guild_id: Discord guild ID
+    :param cutoff: Result of :func:`warning_cutoff` in the table's timestamp format
+    :return: Active warnings
+    """
+    row = namespace.fetchone('''SELECT active, oldest_active, dirty FROM {warning_counts}
+                                WHERE user_id = ? AND guild_id = ?''', (user_id, guild_id))
+    if row is not None and not row[2] and (row[1] is None or row[1] >= cutoff):
+        return row[0]
+
+    with namespace.transaction() as tx:
+        active, oldest = tx.fetchone('''SELECT COUNT(*), MIN(timestamp) FROM {warnings}
+                                        WHERE user_id = ? AND guild_id = ? AND timestamp >= ?''',
+                                     (user_id, guild_id, cutoff))
+        tx.execute('''INSERT INTO {warning_counts} (user_id, guild_id, active, oldest_active, dirty)
+                      VALUES (?, ?, ?, ?, 0)
+                      ON CONFLICT(user_id, guild_id) DO UPDATE SET
+                          active = excluded.active, oldest_active = excluded.oldest_active, dirty = 0''',
+                   (user_id, guild_id, active, oldest))
+    return active
@@ -0,0 +1,114 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Türkçe harfler: str.lower() "İ" harfini "i̇" (i + birleşik nokta) yapar ve
+# "I" harfini "ı" yerine "i" yapar. İ/I/ı hepsini "i" olarak eşlemek
+# "İT", "IT", "it" ve "ıt" gibi yazımları aynı şekilde yakalar.
+_TURKISH_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+
+
+def fold_text(text: str) -> str:
+    """
+    Turkish-aware case folding used for both patterns and messages.
+
+    :param text: Raw text
+    :return: Folded text
+    """
+    return text.translate(_TURKISH_FOLD).lower()
+
+
+class BannedWordMatcher:
+    def __init__(self, words: Iterable[str], whole_words: bool = False):
+        """
+        Aho-Corasick automaton over the banned word list.
+
+        Scanning is linear in message length no matter how many words are
+        loaded; build once and rebuild only when the list changes.
+
+        :param words: Banned words
+        :param whole_words: Only match words bounded by non-alphanumerics
+        """
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[int, str], ...]] = [()]
+        self.size = 0
+
+        for word in words:
+            folded = fold_text(word.strip())
+            if folded:
+                self._insert(folded, word)
+        self._build_links()
+
+    @classmethod
+    def from_config(cls, banned_words: Dict[str, List[str]], whole_words: bool = False) -> "BannedWordMatcher":
+        """
+        Build from the ``config/banned_words.json`` layout (language -> word list).
+
+        Keys whose value is not a word list (e.g. ``"whole_words"``) are skipped.
+
+        :param banned_words: Loaded banned words dict
+        :param whole_words: Only match whole words
+        """
+        return cls((word for word_list in banned_words.values() if isinstance(word_list, list)
+                    for word in word_list), whole_words)
+
+    def _insert(self, folded: str, word: str):
+        state = 0
+        for ch in folded:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if not self._out[state]:
+            self.size += 1
+            self._out[state] = ((len(folded), word),)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Sonek eşleşmeleri de bu durumda raporlanır
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str, folded: bool = False) -> Optional[str]:
+        """
+        Find the first banned word in ``text``.
+
+        :param text: Message content
+        :param folded: ``text`` is already passed through :func:`fold_text`
+        :return: Matched banned word or ``None``
+        """
+        if not folded:
+            text = fold_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        whole_words = self.whole_words
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for length, word in out[state]:
+                    if not whole_words or self._is_bounded(text, i - length + 1, i + 1):
+                        return word
+        return None
+
+    @staticmethod
+    def _is_bounded(text: str, start: int, end: int) -> bool:
+        return ((start == 0 or not text[start - 1].isalnum()) and
+                (end == len(text) or not text[end].isalnum()))
+
+    def __contains__(self, text: str) -> bool:
+        return self.search(text) is not None
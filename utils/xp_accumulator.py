@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+
+class ProfileAccumulator:
+    def __init__(self, db, flush_interval: float = 10.0, max_dirty: int = 100, max_cached: int = 5000):
+        """
+        Write-behind cache for message XP/coin rewards.
+
+        Profiles are loaded once and kept in memory; XP and level are written
+        as absolute values, coins as folded deltas posted to the coin ledger
+        in one transaction per flush. The cached ``coins`` value is not kept
+        up to date; read balances from the ledger plus :meth:`pending_coins`.
+        Database calls go through the manager's async facade (``db.aio``) and
+        never block the event loop.
+
+        :param db: DatabaseManager instance
+        :param flush_interval: Seconds between background flushes
+        :param max_dirty: Flush early once this many users have pending changes
+        :param max_cached: Clean profiles kept in memory after a flush
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self.max_cached = max_cached
+        self.logger = logging.getLogger(__name__)
+
+        self._profiles: Dict[str, dict] = {}
+        self._pending_coins: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    async def get(self, user_id) -> dict:
+        """
+        Current profile state including unflushed rewards.
+
+        :param user_id: Discord user ID
+        :return: Profile dict (shared; mutate only through this class)
+        """
+        key = str(user_id)
+        profile = self._profiles.pop(key, None)
+        if profile is None:
+            loaded = await self.db.aio.get_profile(key)
+            # Beklerken başka bir çağrı profili yüklemiş olabilir; onunkini koru
+            profile = self._profiles.pop(key, loaded)
+        self._profiles[key] = profile  # Son kullanılan en sona
+        return profile
+
+    async def add(self, user_id, xp: int = 0, coins: int = 0) -> dict:
+        """
+        Fold an XP/coin reward into the cached profile.
+
+        The caller may adjust ``xp``/``level`` on the returned dict (level-ups)
+        before the next flush.
+
+        :param user_id: Discord user ID
+        :param xp: XP to add
+        :param coins: Coins to add
+        :return: Updated profile dict
+        """
+        key = str(user_id)
+        profile = await self.get(key)
+        profile["xp"] += xp
+        self._pending_coins[key] = self._pending_coins.get(key, 0) + coins
+        self._dirty.add(key)
+        return profile
+
+    async def store(self, user_id, data: dict) -> None:
+        """
+        Write a full profile immediately (commands such as /gunluk, /satinal).
+
+        :param user_id: Discord user ID
+        :param data: Complete profile dict, including unflushed rewards
+        """
+        key = str(user_id)
+        # Tam profil yazılacağı için bekleyen ödüller bu yazıma dahildir
+        self._profiles.pop(key, None)
+        self._profiles[key] = data
+        # Coinler bu yazıma dahil değildir; bekleyen coin ödülleri bir sonraki flush'ta yazılır
+        if key not in self._pending_coins:
+            self._dirty.discard(key)
+        await self.db.aio.update_profile(key, dict(data))
+
+    def patch(self, user_id, **fields) -> None:
+        """
+        Update fields of a cached profile that were already written elsewhere
+        (e.g. ``daily_last`` after ``claim_daily``).
+
+        :param user_id: Discord user ID
+        """
+        profile = self._profiles.get(str(user_id))
+        if profile is not None:
+            profile.update(fields)
+
+    def pending_coins(self, user_id) -> int:
+        """
+        :param user_id: Discord user ID
+        :return: Coin rewards not yet written to the ledger
+        """
+        return self._pending_coins.get(str(user_id), 0)
+
+    async def flush_if_needed(self) -> None:
+        if len(self._dirty) >= self.max_dirty:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all pending changes in a single transaction.
+
+        :return: Number of profiles written
+        """
+        if not self._dirty:
+            return 0
+
+        dirty, self._dirty = self._dirty, set()
+        pending, self._pending_coins = self._pending_coins, {}
+        rows = [
+            (self._profiles[key]["xp"], self._profiles[key]["level"], pending.get(key, 0), key)
+            for key in dirty
+        ]
+        try:
+            written = await self.db.aio.apply_profile_deltas(rows)
+        except Exception:
+            # Yazılamayan değişiklikleri bir sonraki denemeye bırak
+            self._dirty |= dirty
+            for key, coins in pending.items():
+                self._pending_coins[key] = self._pending_coins.get(key, 0) + coins
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += written
+        self._trim()
+        return written
+
+    def _trim(self):
+        excess = len(self._profiles) - self.max_cached
+        if excess <= 0:
+            return
+        for key in list(self._profiles):
+            if excess <= 0:
+                break
+            if key not in self._dirty:
+                del self._profiles[key]
+                excess -= 1
+
+    def start(self) -> None:
+        """Start the periodic background flush."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background flush and write everything that is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error(f"Profil verileri yazılamadı: {e}")